@@ -0,0 +1,24 @@
+# Repository root conftest, puts the repository root on sys.path so tests import the entsoetransparency package.
+
+import importlib
+import os
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    '''Redirects cache files of tests to a temp dir, so test runs never touch the user's home directory.'''
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+
+@pytest.fixture
+def client_module(monkeypatch):
+    '''Returns client module, imported with module dir and processes/benchmarks on sys.path as benchmarks run it.'''
+    monkeypatch.syspath_prepend(os.path.join(ROOT, 'processes', 'benchmarks'))
+    monkeypatch.syspath_prepend(os.path.join(ROOT, 'entsoetransparency'))
+    return importlib.import_module('entsoetransparency.entsoetransparency')
@@ -4,26 +4,46 @@
 
 # Local imports
 
+from src.adjacency import AreaAdjacency
+from src.chunking import WindowLimits, coalesce_windows, default_window_limits_path, split_window, window_limit_key
 from src.get_api_statics import get_api_statics
+from src.parameters_index import ParametersIndex
+from src.merge import merge_extend_equal_rows
+from src.metrics import Metrics
+from src.parsers import DOCNAMES, POINT_TAGS, TAGSNAMES, classify_response, parse_acknowledgement, parse_response_records
+from src.planner import DEFAULT_CALL_SECONDS, RequestPlan, default_workers
+from src.timeseries import expand_periods, period_timestamps, value_columns
+from src.ratelimiter import FileTokenBucket, TokenBucket
+from src.parquet_sink import ParquetSink
+from src.response_cache import ResponseCache
+from src.schema import CodeTable, coerce_numeric, typed_frame
+from src.retry import TRANSIENT_ERRORS, CircuitBreaker, RequestFailed, RetryPolicy
+from src.session import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, make_session, mount_pool
+from src.store import TimeSeriesStore
+from src.zip_parse import PARALLEL_MIN_MEMBERS, bounded_map, init_worker as init_zip_worker, iter_members, parse_member
+from src.statics_snapshot import (BUNDLED_SNAPSHOT_PATH, DEFAULT_SNAPSHOT_PATH, guide_content_hash, load_statics_snapshot,
+                                  save_statics_snapshot, snapshot_age, snapshot_is_complete, touch_statics_snapshot)
 
 
 # Lib imports
 
 from datetime import datetime, timedelta
 import datetime
-import difflib, io
+import difflib, functools, io
+import os
 import requests
 import pandas as pd
-import bs4
-from bs4 import NavigableString
 import json
-import geopandas as gpd
-import pandas as pd
 import numpy as np
-from ratelimit import limits
 import unicodedata
 import re
+import threading
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Heavy imports bs4 (api guide webscraping, soup parsing) and geopandas (areas geometry)
+# are deferred to the functions using them, keeping module import fast.
 
 
 
@@ -37,29 +57,214 @@ class EntsoeTransparencyClient():
         -Matched requests: Finds best "close-match" in available parameters from user inputs to .get_data() request.
         -Fixed requests: If possible, fixes and re-runs request if initial request gave bad response.
         -Unzip zip: Unzips zipped document response, and includes in dataframe.
+        -Fast startup: Api-statics are loaded from versioned snapshot file, and only re-scraped when the api guide content changes.
+        -Lazy loading: With lazy=True, .datasets, .parameters and .areas are loaded on first access. Needed loads run in parallel.
     
+    :Statics snapshot:
+        -statics_path: User snapshot file, defaults to ~/.cache/entsoetransparency/statics.json.gz.
+        -statics_ttl: Seconds before snapshot is re-checked against api guide content hash. None never re-checks.
+        -refresh_statics: Re-check snapshot against api guide on init.
+
+    :Rate limit:
+        -rate_limiter: Limiter all api calls wait on, defaults to 399 calls pr minute for this client.
+                       FileTokenBucket() shares one budget between all processes on host.
+
+    :Http:
+        -session: Session api calls are made on, any object with .get(url, timeout=) returning requests.Response.
+                  Defaults to pooled keep-alive requests.Session negotiating gzip.
+        -timeout: (connect, read) timeout in seconds of api calls.
+        -pool_size: Connections kept alive in default session, grown to max_workers of .get_data() if larger.
+        -retry_policy: RetryPolicy() of 429, 5xx, connection errors and timeouts, exponential backoff with jitter, honoring Retry-After.
+        -circuit_breaker: CircuitBreaker() pausing all requests of client when api fails repeatedly.
+
+    :Response cache:
+        -cache: ResponseCache() of raw response bodies checked before api calls, no cache if None.
+                Windows ended more than immutable_after_days ago never expire, recent windows expire after recent_ttl.
+
+    :Zip responses:
+        -zip_workers: Processes parsing members of zipped multi-document responses, None is cpu count, 1 parses serially.
+
+    :Request windows:
+        -window_limits: WindowLimits() table of max window of each document type, learned from bad response reasons.
+                        Requested periods are split up front in the largest allowed windows, aligned to UTC days.
+                        Default table file is default_window_limits_path(), under XDG_CACHE_HOME if set.
+
+    :Borders:
+        -all_borders: Pair single areas of flow datasets (out_Domain) with all areas, instead of only neighbouring areas in .area_adjacency.
+                      Neighbours are areas of the bundled interconnector table, or touching in .areas geometry.
+
+    :Metrics:
+        -metrics: Metrics() of pipeline stages, counters and latency histograms, shared with other clients if given.
+                  .metrics.to_prometheus() exports Prometheus text format, .metrics.add_span_callback(fn) receives stage spans.
     
     '''
     
     #####################
     # Init functions
     #####################
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, statics_path=DEFAULT_SNAPSHOT_PATH, statics_ttl=7*24*60*60, refresh_statics=False, lazy=False, rate_limiter=None,
+                 session=None, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, cache=None, window_limits=None,
+                 retry_policy=None, circuit_breaker=None, zip_workers=1, metrics=None, all_borders=False):
         self.api_key = api_key
         self.api_url = f'https://transparency.entsoe.eu/api?'
+        self.guide_url = 'https://transparency.entsoe.eu/content/static_content/Static%20content/web%20api/Guide.html'
+        self.statics_path = statics_path
+        self.statics_ttl = statics_ttl
 
-        # Getting API guide requests and parameters from
-        # Webscraping html api-guide url.
-        self.datasets, self.parameters = self._get_statics_datasets_parameters()
-        
-        self.areas = self._get_entsoe_areas()
+        # Statics and areas are filled by loaders, on init or on first access if lazy.
+        self._datasets = None
+        self._parameters = None
+        self._areas = None
+        self._parameters_index = None
+        self._code_table = None
+        self._area_adjacency = None
+        self._area_adjacency_parameters = None
+        self._refresh_statics = refresh_statics
+        self._load_lock = threading.RLock()
+
+        # Rate limiter shared by all requests of client, also when made in parallel.
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucket(calls=399, period=60, burst=10)
+
+        # Pooled session reusing connections of all api calls, or users session.
+        self.session = session if session is not None else make_session(pool_size)
+        self.timeout = timeout
+        self._owns_session = session is None
+
+        # Retries of transient failures, and circuit breaker pausing all requests while api is down.
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+
+        # Optional cache of raw responses, checked before api calls.
+        self.cache = cache
+
+        # Counters, stage latency histograms and span callbacks of request pipeline.
+        self.metrics = metrics if metrics is not None else Metrics()
+
+        # Process pool parsing members of large zipfile responses, created on first use.
+        self.zip_workers = zip_workers
+        self._zip_pool = None
+        self._zip_pool_parameters = None
+
+        # Flow datasets of a single area are requested against its neighbours, or all areas if all_borders.
+        self.all_borders = all_borders
+
+        # Max request window of each document type, learned from bad response reasons.
+        self.window_limits = window_limits if window_limits is not None else WindowLimits(default_window_limits_path())
+
+        # Getting API guide requests and parameters from snapshot, or webscraping html api-guide url if snapshot is outdated,
+        # in parallel with areas GeoDataFrame.
+        if not lazy:
+            self._ensure_loaded(['statics', 'areas'])
 
 
         return None
 
+    @property
+    def datasets(self):
+        '''Api guide datasets, loaded on first access.'''
+        if self._datasets is None:
+            self._ensure_loaded(['statics'])
+        return self._datasets
+
+    @datasets.setter
+    def datasets(self, datasets):
+        self._datasets = datasets
+
+    @property
+    def parameters(self):
+        '''Api guide parameters, loaded on first access.'''
+        if self._parameters is None:
+            self._ensure_loaded(['statics'])
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters):
+        self._parameters = parameters
+        self._parameters_index = None
+
+    @property
+    def parameters_index(self):
+        '''Lookup index of parameters codes and meanings, built on first access after parameters are set.'''
+        if self._parameters_index is None or self._parameters_index.parameters is not self.parameters:
+            self._parameters_index = ParametersIndex(self.parameters)
+        return self._parameters_index
+
+    @property
+    def code_table(self):
+        '''Categories of code columns in typed results, built on first access after parameters are set.'''
+        if self._code_table is None or self._code_table.parameters_index is not self.parameters_index:
+            self._code_table = CodeTable(self.parameters_index)
+        return self._code_table
+
+    @property
+    def areas(self):
+        '''Entsoe areas GeoDataFrame, loaded on first access.'''
+        if self._areas is None:
+            self._ensure_loaded(['areas'])
+        return self._areas
+
+    @areas.setter
+    def areas(self, areas):
+        self._areas = areas
+        self._area_adjacency = None
+
+    @property
+    def area_adjacency(self):
+        '''Index of neighbouring areas, from bundled interconnector table and areas geometry, built on first access after parameters are set.'''
+        with self._load_lock:
+            if self._area_adjacency is None or self._area_adjacency_parameters is not self.parameters:
+                with self.metrics.stage('adjacency_load'):
+                    self._area_adjacency = AreaAdjacency.from_sources(self.parameters['Areas'].keys(), areas=self._adjacency_areas())
+                self._area_adjacency_parameters = self.parameters
+        return self._area_adjacency
+
+    def _adjacency_areas(self):
+        '''Returns areas GeoDataFrame for adjacency of touching areas, None if it cannot be loaded.'''
+        try:
+            return self.areas
+        except Exception as e:
+            print(f'WARNING: Could not load areas geometry, neighbouring areas from interconnector table only. ({e})')
+            return None
+
+    def _ensure_loaded(self, names):
+        '''Run loaders for names in ['statics', 'areas'] not yet loaded, in parallel if more than one.'''
+
+        with self._load_lock:
+
+            # Find loaders still missing their data.
+            missing = []
+            if 'statics' in names and (self._datasets is None or self._parameters is None):
+                missing.append(self._load_statics_attributes)
+            if 'areas' in names and self._areas is None:
+                missing.append(self._load_areas_attribute)
+
+            # Run single loader directly.
+            if len(missing) == 1:
+                missing[0]()
+
+            # Run multiple loaders in parallel, re-raise first error.
+            elif len(missing) > 1:
+                with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                    futures = [executor.submit(loader) for loader in missing]
+                for future in futures:
+                    future.result()
+
+        return None
+
+    def _load_statics_attributes(self):
+        '''Loader for datasets and parameters attributes.'''
+        with self.metrics.stage('statics_load'):
+            self._datasets, self._parameters = self._load_statics(refresh=self._refresh_statics)
+
+    def _load_areas_attribute(self):
+        '''Loader for areas attribute.'''
+        with self.metrics.stage('areas_load'):
+            self._areas = self._get_entsoe_areas()
+
 
     def _parse_entsoe_response_to_df(self, soup_parent, start_tag="", df=pd.DataFrame([]), c_layer=0, layer_children=None):
         '''Helperfunction, recursively parse entso-e api response to pd.DataFrame.'''
+        import bs4
 
         # If input is not soup, make soup.
         if isinstance(soup_parent, str):
@@ -136,7 +341,7 @@ class EntsoeTransparencyClient():
                 elif pd.isnull(df.iloc[-1:][column].values.tolist()[0]) == False:
                 
                     # Append new empty row at end of df for storing new row of data.
-                    df = df.append(pd.Series(dtype = 'object'), ignore_index=True)
+                    df.loc[len(df.index)] = np.nan
                 
                     # Copy data from upstream level columns to upstream cells in the new empty row in loop.
                     rowidx = df.index.tolist()[-1]
@@ -164,27 +369,10 @@ class EntsoeTransparencyClient():
             df.replace("", np.nan, inplace=True)
             df.drop_duplicates(inplace=True)
 
-            # Loop on df columns.
+            # Set columns of all numeric strings as int, or float if any is not integral, checked on all rows at once.
             for column in df.columns:
+                df[column] = coerce_numeric(df[column])
 
-                # Try if column string is valid float, then set as float.
-                try:
-                    float(df.at[0, column])
-                    df[column] = df[column].astype(float)
-                
-                # If not, do nothing
-                except ValueError:
-                    None
-                
-                # Try if column string is valid integer, then set as integer.
-                try:
-                    int(df.at[0, column])
-                    df[column] = df[column].astype(int)
-                
-                # If not, do nothing
-                except ValueError:
-                    None
-                
     
         # Return one layer up.
         return df
@@ -221,16 +409,16 @@ class EntsoeTransparencyClient():
     # Backend functions ##
     ######################
 
-    @limits(calls=399, period=60) #max 400 calls pr minute or 10min ban..
     def _call_api(self, url=None, parameters_dict=None, msg=False):
-        '''Make call to api limited to , return full respons.
+        '''Make call to api limited by shared rate_limiter, return full respons.
         '''
         # if url spesified, set url directly
         if url is not None:
             get_url = url
         # if parameters spesified, construct url
         elif parameters_dict is not None:
-            get_url = self._construct_api_call_url(parameters_dict=parameters_dict)
+            with self.metrics.stage('url_build'):
+                get_url = self._construct_api_call_url(parameters_dict=parameters_dict)
         #if no url or parameters, cannot make call, return None.
         else:
             return None
@@ -238,13 +426,118 @@ class EntsoeTransparencyClient():
         if msg:
             print(f'Making request at url:\n{get_url}')
 
-        #makes request
-        response = requests.get(get_url) 
+        # Cached response, no api call.
+        if self.cache is not None and parameters_dict is not None:
+            content = self.cache.get(parameters_dict)
+            self.metrics.inc('cache_hits_total' if content is not None else 'cache_misses_total')
+            if content is not None:
+                response = requests.Response()
+                response.status_code = 200
+                response.url = get_url
+                response._content = content
+                return response, get_url
+
+        #makes request, retried with backoff on transient failures, waits for circuit breaker and rate limiter, max 400 calls pr minute or 10min ban..
+        policy = self.retry_policy
+        for attempt in range(policy.max_retries + 1):
+            time.sleep(self.circuit_breaker.wait_time())
+            with self.metrics.stage('ratelimit_wait'):
+                self.rate_limiter.acquire()
+            try:
+                t0 = time.perf_counter()
+                response = self.session.get(get_url, timeout=self.timeout)
+                status, retry_after, error = response.status_code, response.headers.get('Retry-After'), None
+                self._record_http(time.perf_counter() - t0, response.elapsed.total_seconds(), status, len(response.content))
+            except TRANSIENT_ERRORS as e:
+                response, status, retry_after, error = None, None, None, e
+                self.metrics.inc('http_errors_total', error=type(e).__name__)
+
+            # Other request errors are not transient, ex. invalid url, request fails without retries.
+            except requests.RequestException as e:
+                self.metrics.inc('http_errors_total', error=type(e).__name__)
+                self.metrics.inc('requests_failed_total')
+                raise RequestFailed(f'{e!r}, after {attempt + 1} attempts', url=get_url, attempts=attempt + 1)
+
+            if response is not None and not policy.should_retry(status):
+                self.circuit_breaker.record_success()
+                break
+
+            self.circuit_breaker.record_failure()
+            if attempt == policy.max_retries:
+                self.metrics.inc('requests_failed_total')
+                raise RequestFailed(f'{error if error is not None else f"status {status}"}, after {attempt + 1} attempts', url=get_url, status=status, attempts=attempt + 1)
+            self.metrics.inc('retries_total')
+            time.sleep(policy.delay(attempt, status, retry_after))
+
+        # Cache raw body of good response.
+        if self.cache is not None and parameters_dict is not None and response.status_code == 200:
+            self.cache.put(parameters_dict, response.content)
+
         return response, get_url
 
         #return request respons
         #return None
 
+    async def _call_api_async(self, session, url=None, parameters_dict=None, executor=None):
+        '''Make call to api async on aiohttp session, limited by shared rate_limiter. Cache is read and written in executor. Returns response content and url.'''
+        import asyncio
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+
+        # If url spesified, set url directly, else construct url from parameters.
+        with self.metrics.stage('url_build'):
+            get_url = url if url is not None else self._construct_api_call_url(parameters_dict=parameters_dict)
+
+        # Cached response, no api call. Sqlite cache is read off the event loop.
+        if self.cache is not None and parameters_dict is not None:
+            content = await loop.run_in_executor(executor, self.cache.get, parameters_dict)
+            self.metrics.inc('cache_hits_total' if content is not None else 'cache_misses_total')
+            if content is not None:
+                return content, get_url
+
+        # Makes request, retried with backoff on transient failures, waits for circuit breaker and rate limiter without blocking event loop.
+        policy = self.retry_policy
+        for attempt in range(policy.max_retries + 1):
+            await asyncio.sleep(self.circuit_breaker.wait_time())
+            with self.metrics.stage('ratelimit_wait'):
+                await self.rate_limiter.acquire_async()
+            try:
+                t0 = time.perf_counter()
+                async with session.get(get_url) as response:
+                    ttfb = time.perf_counter() - t0
+                    content = await response.read()
+                    status, retry_after, error = response.status, response.headers.get('Retry-After'), None
+                self._record_http(time.perf_counter() - t0, ttfb, status, len(content))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                content, status, retry_after, error = None, None, None, e
+                self.metrics.inc('http_errors_total', error=type(e).__name__)
+
+            if content is not None and not policy.should_retry(status):
+                self.circuit_breaker.record_success()
+                break
+
+            self.circuit_breaker.record_failure()
+            if attempt == policy.max_retries:
+                self.metrics.inc('requests_failed_total')
+                raise RequestFailed(f'{error if error is not None else f"status {status}"}, after {attempt + 1} attempts', url=get_url, status=status, attempts=attempt + 1)
+            self.metrics.inc('retries_total')
+            await asyncio.sleep(policy.delay(attempt, status, retry_after))
+
+        # Cache raw body of good response.
+        if self.cache is not None and parameters_dict is not None and status == 200:
+            await loop.run_in_executor(executor, self.cache.put, parameters_dict, content)
+
+        return content, get_url
+
+    def _record_http(self, seconds, ttfb, status, n_bytes):
+        '''Records time to first byte and download time of api response, its status and bytes.'''
+        end_time = time.time()
+        self.metrics.record_stage('http_ttfb', ttfb, end_time=end_time - (seconds - ttfb), status=status)
+        self.metrics.record_stage('http_download', max(seconds - ttfb, 0.), end_time=end_time, status=status, bytes=n_bytes)
+        self.metrics.inc('http_responses_total', status=status)
+        self.metrics.inc('bytes_downloaded_total', n_bytes)
+
     def _construct_api_call_url(self, parameters_dict, api_key=None, baseurl=None):
         '''Constructs api call url from baseurl, api_key and parameters_dict.
         '''
@@ -266,21 +559,88 @@ class EntsoeTransparencyClient():
         #return call_url
         return call_url
 
-    def _get_statics_guide_soup(self, setasattr=True):
+    def _get_statics_guide_html(self):
+        '''Request api guide url, return html content.'''
+        response = self.session.get(self.guide_url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def _get_statics_guide_soup(self, setasattr=True, guide_html=None):
         '''Scrape url statics guide html, return 'static-content' as soup object.'''
-        statics_soup = bs4.BeautifulSoup(requests.get('https://transparency.entsoe.eu/content/static_content/Static%20content/web%20api/Guide.html').text, "lxml").find(id="static-content")
+        import bs4
+        if guide_html is None:
+            guide_html = self._get_statics_guide_html()
+        statics_soup = bs4.BeautifulSoup(guide_html, "lxml").find(id="static-content")
         if setasattr:
             setattr(self, 'statics_soup', statics_soup)
         return statics_soup
+
+    def _load_statics(self, refresh=False, force=False):
+        '''
+        Load datasets and parameters from statics snapshot.
+        Re-scrapes the api guide only when snapshot is missing, or when refresh/ttl finds changed guide content.
+        '''
+
+        # Use user snapshot, else snapshot shipped with package if any.
+        snapshot = load_statics_snapshot(self.statics_path)
+        if not snapshot_is_complete(snapshot):
+            snapshot = load_statics_snapshot(BUNDLED_SNAPSHOT_PATH)
+        complete = snapshot_is_complete(snapshot)
+
+        # If snapshot is complete and not outdated, use it directly.
+        if complete and not refresh and not force:
+            if self.statics_ttl is None or snapshot_age(snapshot) < self.statics_ttl:
+                return snapshot['datasets'], snapshot['parameters']
+
+        # Get api guide content.
+        try:
+            guide_html = self._get_statics_guide_html()
+
+        # If api guide is unavailable, fall back on existing snapshot.
+        except requests.RequestException as e:
+            if complete:
+                print(f'WARNING: Could not check api guide, using statics snapshot from {snapshot["created"]}. ({e})')
+                return snapshot['datasets'], snapshot['parameters']
+            raise
+
+        # If api guide content is unchanged, keep snapshot and mark it as checked.
+        guide_hash = guide_content_hash(guide_html)
+        if complete and not force and snapshot.get('guide_sha256') == guide_hash:
+            self._save_statics(touch_statics_snapshot, snapshot, self.statics_path)
+            return snapshot['datasets'], snapshot['parameters']
+
+        # Else re-scrape api guide, and store as new snapshot.
+        datasets, parameters = self._get_statics_datasets_parameters(guide_html=guide_html)
+        self._save_statics(save_statics_snapshot, datasets, parameters, self.statics_path, guide_hash=guide_hash, guide_url=self.guide_url)
+
+        return datasets, parameters
+
+    def _save_statics(self, save_function, *args, **kwargs):
+        '''Save statics snapshot, warn instead of failing if snapshot path is not writable.'''
+        if self.statics_path is None:
+            return None
+        try:
+            return save_function(*args, **kwargs)
+        except OSError as e:
+            print(f'WARNING: Could not save statics snapshot to {self.statics_path}. ({e})')
+            return None
+
+    def refresh_statics(self, force=False):
+        '''
+        Re-check statics snapshot against the api guide, re-scrape if guide content changed.
+        force: Re-scrape api guide even if guide content is unchanged.
+        '''
+        self.datasets, self.parameters = self._load_statics(refresh=True, force=force)
+        return None
     
-    def _get_statics_datasets_parameters(self):
+    def _get_statics_datasets_parameters(self, guide_html=None):
         '''
         Getting entsoe api service statics from the api guide webpage using webscraping.
         API guide url: https://transparency.entsoe.eu/content/static_content/Static%20content/web%20api/Guide.html
         '''
 
         # Extract part of html content containing the static content.
-        content_soup = self._get_statics_guide_soup().find(id="content")
+        content_soup = self._get_statics_guide_soup(guide_html=guide_html).find(id="content")
         
         # Finding all headers. TODO: missing 1.4. Parameters due du it being nested in ulist. Content included in 1.3.
         headers = content_soup.find_all(lambda x: x.name in ['h2', 'h3', 'h4'] and len(x.string) > 2)
@@ -532,14 +892,6 @@ class EntsoeTransparencyClient():
         ######################################
         ######################################    
           
-    def _reason_fix_request(self, reason_str): #TODO: not created yet.
-        '''Fixes request if possible based on text in reason'''
-
-        # If requested to many days:
-        if 'allowed: ' in reason_str:
-            val_unit = reason_str.split('allowed: ')[-1].split(',')[0].split(' ')
-            print(f'ALLOWED: {val_unit[0]} in unit {val_unit[-1]}')
-    
     def _get_dataset_mandatorys_dict(self, dataset):
         '''Creates dictionary of parameters to be included in request.'''
 
@@ -742,29 +1094,57 @@ class EntsoeTransparencyClient():
         return d
     
 
+    def _zipfile2records(self, zipf):
+        '''Extract data from zipfile, parse all files into one list of records. Files parsed in process pool if zip_workers is not 1.'''
+
+        # Create list for storing zipfile content.
+        records = []
+
+        with self.metrics.stage('zip', members=len(zipf.namelist())):
+
+            # Parse files as raw bytes, in order, in process pool for large zipfiles.
+            executor = self._zip_executor() if len(zipf.namelist()) >= PARALLEL_MIN_MEMBERS else None
+            if executor is None:
+                parsed = (self._response_xml_to_records(content) for content in iter_members(zipf))
+            else:
+                parsed = bounded_map(executor, parse_member, iter_members(zipf), window=2*(self.zip_workers or os.cpu_count() or 1))
+
+            # Loop on files in zipfile.
+            for file_records, reason in parsed:
+
+                # Reason record if bad response.
+                if reason is not None:
+                    file_records = [{'reason': reason}]
+
+                # Add to main list.
+                records.extend(file_records)
+
+        # Return zipfile content in one list.
+        return records
+
+    def _zip_executor(self):
+        '''Returns process pool parsing zipfile members, None if zip_workers is 1. Pool is rebuilt if parameters change.'''
+
+        if self.zip_workers == 1:
+            return None
+
+        with self._load_lock:
+            if self._zip_pool is None or self._zip_pool_parameters is not self.parameters:
+                if self._zip_pool is not None:
+                    self._zip_pool.shutdown(wait=False)
+                self._zip_pool = ProcessPoolExecutor(max_workers=self.zip_workers, initializer=init_zip_worker, initargs=(self.parameters,))
+                self._zip_pool_parameters = self.parameters
+
+        return self._zip_pool
+
     def _zipfile2df(self, zipf):
         '''Extract data from zipfile, parse all files into one df.'''
-    
-        # Create dataframe for storing zipfile content.
-        df = pd.DataFrame()
-    
-        # Loop on files in zipfile.
-        for filename in zipf.namelist():
-        
-            # Extract file xml content.
-            xml_content = zipf.read(filename).decode("utf-8") 
-        
-            # Parse into df.
-            df1 = self._response_xml_to_df(xml_content)
-        
-            # Append to main df.
-            df = df.append(df1).reset_index(drop=True)
-
-        # Return zipfile content in full df.
-        return df
+        return pd.DataFrame(self._zipfile2records(zipf))
     
     def _get_entsoe_areas(self):
         '''Get entsoe areas GeoDataFrame'''
+        import geopandas as gpd
+
         # Retrieving entsoeapi areas GeoDataFrame
         areas = gpd.read_file("https://raw.githubusercontent.com/ocrj/entsoeapi/main/data/areas/areas.geojson")
         
@@ -775,111 +1155,8 @@ class EntsoeTransparencyClient():
         return areas
     
     def _merge_extend_equal_rows(self, o_df, extends=['quantity', 'start', 'end']):
-        '''Combines equal rows in df.'''
-        
-        # Create new list.
-        ex = []
-
-        # Loop on spesified extends.
-        for e in extends:
-
-            # If extend exist in o_df.columns.
-            if e in o_df.columns:
-
-                # Append it to new list.
-                ex.append(e)
-
-        # Set extends to new filtered list.
-        extends = ex
-
-        # If list is now empty.
-        if len(extends) == 0:
-
-            # Return original df.
-            return o_df
-        
-        
-        # Create new df.
-        n_df = []
-        o_df = o_df.reset_index(drop=True)
-        # Loop on old dataframe.
-        for o_idx, o_row in o_df.iterrows():
-        
-            # If this is first.
-            if len(n_df) == 0:
-            
-                # Make new df of this first row in old df.
-                n_df = pd.DataFrame(o_df.iloc[o_idx]).T.reset_index(drop=True)
-            
-            # Else not first
-            else:
-            
-                # Set initial flag to add this row to new df.
-                add_flag = True
-            
-                # Loop on columns in new df.
-                for n_idx, n_row in n_df.iterrows():
-            
-                    # If all columns in old equals new, except for qxtend columns.
-                    if (o_df.iloc[o_idx].drop(extends) == n_df.iloc[n_idx].drop(extends)).all():
-                        # Found matching row to extend data into, reset flag to append full row.
-                        add_flag = False
-                    
-                        # Loop on extends.
-                        for exd in extends:
-                        
-                            # If start.
-                            if 'start' in exd:
-                            
-                                # Unwrap if in list:
-                                if isinstance(o_df.at[o_idx, exd], list):
-                                    o_df.at[o_idx, exd] = o_df.at[o_idx, exd][0]
-                                if isinstance(n_df.at[n_idx, exd], list):
-                                    n_df.at[n_idx, exd] = n_df.at[n_idx, exd][0]
-                                    
-                                
-                                # If extenting start is less than existing start, add as start.
-                                ext_s = datetime.datetime.strptime(o_df.at[o_idx, exd], '%Y-%m-%dT%H:%MZ')
-                                exi_s = datetime.datetime.strptime(n_df.at[n_idx, exd], '%Y-%m-%dT%H:%MZ')
-                                if ext_s < exi_s:
-                                    n_df.at[n_idx, exd] = o_df.at[o_idx, exd]
-                            
-                            elif 'end' in exd:
-
-                                # Unwrap if in list:
-                                if isinstance(o_df.at[o_idx, exd], list):
-                                    o_df.at[o_idx, exd] = o_df.at[o_idx, exd][0]
-                                if isinstance(n_df.at[n_idx, exd], list):
-                                    n_df.at[n_idx, exd] = n_df.at[n_idx, exd][0]
-                            
-                                # If extenting end is larger than existing end, add as end
-                                ext_e = datetime.datetime.strptime(o_df.at[o_idx, exd], '%Y-%m-%dT%H:%MZ')
-                                exi_e = datetime.datetime.strptime(n_df.at[n_idx, exd], '%Y-%m-%dT%H:%MZ')
-                                if ext_s > exi_s:
-                                    n_df.at[n_idx, exd] = o_df.at[o_idx, exd]
-                                
-                            else:
-                            
-                                # Ensure cell is list
-                                if isinstance(n_df.at[n_idx, exd], list) is False:
-                                    n_df.at[n_idx, exd] = [n_df.at[n_idx, exd]]
-                        
-
-                                # Extend value_s to cell list.
-                                n_df.at[n_idx, exd].extend(o_df.at[o_idx, exd])
-                    
-                        # Extended data into existing row in new df, break loop.
-                        break
-                
-                # If not added in existing.
-                if add_flag:
-                    
-                    # Append as new row to new df.
-                    n_df = n_df.append(o_df.iloc[o_idx]).reset_index(drop=True)
-                
-    
-        # Return merged new df.
-        return n_df
+        '''Combines equal rows in df, grouped on hashed columns not in extends.'''
+        return merge_extend_equal_rows(o_df, extends=extends)
     
     def find_dataset_match(self, dataset, n_matches=1, accuray_matches=0.4):
         ''' Finds closest match in avaialable api_requests, returns match.
@@ -903,106 +1180,34 @@ class EntsoeTransparencyClient():
             return None
     
     def _remap_codes2meanings(self, code, name):
-        '''Remaps codes to meanings'''
+        '''Remaps codes to meanings by exact lookup in parameters index, returns code if no meaning is found.'''
+        return self.parameters_index.remap(code, name)
     
-        # Set initialy meaning as code
-        meaning = code
-    
-        # Get list of parameters and fix.
-        param_list = list(self.parameters.keys())
-        param_list.pop(-1)
-        param_list.append('domain')
-
-        # Loop on list idx.
-        for idx in range(len(param_list)):
-        
-            # If fixed param name in value name.
-            if param_list[idx].lower().replace('.','').replace('_','') in name:
-            
-             # Get parameter type
-                paratype = list(self.parameters.keys())[idx]
+    def _response_xml_to_records(self, response, docnames=DOCNAMES, tagsnames=TAGSNAMES):
+        '''Parse response into records, one per TimeSeries Period. Returns records, reason (None if not bad response).'''
 
-                # Look for remapped value.
-                meaning_code = self.find_parameters_match(code, paratype)
-            
-                # If found, set at meaning.
-                if meaning_code[0] is not None:
-                    meaning = meaning_code[0]
-    
-        # Return meaning.
-        return meaning
-    
-    def _response_xml_to_df(self, response, docnames=['type', 'created', 'domain'], tagsnames=['domain', 'resource', 'type', 'start', 'end', 'resolution', 'quantity', 'amount', 'name', 'voltage', 'nominalp']):
-        '''Create dataframe from response'''
-    
-        
-        # Create dataframe for storing response content.
-        df = pd.DataFrame()
-    
         # If input response is request.Response object.
         if isinstance(response, requests.Response):
 
             # Extract response content.
             response = response.content
-        
-        
-        # Make soup
-        soup = bs4.BeautifulSoup(response,'lxml')
 
-        # Find content body tag.
-        body = soup.find_all('body')[0]
-    
-        # If no body in response.
-        if body is None:
+        # Parse response in one streaming pass, remapping codes to meanings of tags named as parameter types.
+        index = self.parameters_index
+        with self.metrics.stage('parse', bytes=len(response)):
+            return parse_response_records(response, remap=index.remap, docnames=docnames, tagsnames=tagsnames, remap_tag=index.types_for_tag)
 
-            # Return empty df.
-            return pd.DataFrame()
-        
-        # If bad response.
-        if body.find('reason') is not None:
-            if len(body.find_all('text')) > 0:
-        
-                # Return dataframe om reason for bad response.        
-                return pd.DataFrame([body.find_all('text')[0].string], columns=['reason'])
-        
-        # Try to look data in document data.
-
-        docdict = {}
-        doctag = body
-        # Store document data in dict.
-        if doctag is not None:
-            for dname in docnames:
-                doctag = doctag.find_next(re.compile(dname))
-
-                if doctag is not None:
-                    docdict[doctag.name] = self._remap_codes2meanings(doctag.string, doctag.name)
+    def _response_xml_to_df(self, response, docnames=DOCNAMES, tagsnames=TAGSNAMES):
+        '''Create dataframe from response, one row per TimeSeries Period.'''
 
-        # Loop on response timeseries.
-        for ts in body.find_all('timeseries'):
-        
-            a = docdict.copy()
-            # Create new dictionary for storing timeserie content
-            d = {}
-
-            # Add dict from before timeseries.
-        
-            # Add timeserie contents to dictionary
-            d = self._add_tags2dict(d, ts, tagsnames)
-    
-            for key, val in d.items():
-                a[key] = val
-            
-            # Create df2 from dict
-            df2 = pd.DataFrame([a])
-        
-            # Append df2 to main df.
-            df = df.append(df2).reset_index(drop=True)
+        records, reason = self._response_xml_to_records(response, docnames=docnames, tagsnames=tagsnames)
 
+        # If bad response, return dataframe om reason for bad response.
+        if reason is not None:
+            return pd.DataFrame([reason], columns=['reason'])
 
-        
-        
         # Return dataframe.
-        return df
+        return pd.DataFrame(records)
 
     def _seq2sets(self, start, end, quantitys=[]):
         '''
@@ -1071,8 +1276,8 @@ class EntsoeTransparencyClient():
                     # Apply remapping
                     meaning = self._remap_codes2meanings(tag.string, tag.name)
                 
-                    # If measured data, allow duplicates.
-                    if tag.name in ['quantity', 'position']:
+                    # If point data, allow duplicates.
+                    if tag.name in POINT_TAGS or tag.parent.name == 'point':
                         d[tag.name].append(meaning)
                 
                     # Else, append if not already in list.
@@ -1088,254 +1293,369 @@ class EntsoeTransparencyClient():
     #######################
 
     def _ensure_from_to_all(self, mandatorys_dict, from_to_codes):
-        '''Adds all available areas in (from, to) and (to, from) if from is not spesified.'''
+        '''
+        Adds (from, to) and (to, from) of neighbouring areas if to is not spesified, of all available areas if all_borders or no neighbours are known.
+        Adds (to, from) if (from, to) is spesified. Returns new list, from_to_codes is not changed.
+        '''
+
+        # If input from_to_codes is list of single values, wrap as from_area in list.
+        if isinstance(from_to_codes, list) and isinstance(from_to_codes[0], (list, tuple)) is False:
+            from_to_codes = [[a, None] for a in from_to_codes]
 
+        # If to_area is not part of mandatory parameters, return unique from_to_codes.
+        if not any('out_domain' in m.lower() or 'acquiring' in m.lower() for m in mandatorys_dict):
+            return self._unique_from_to(from_to_codes)
+
+        # Loop on spesified from_to_codes.
         from_to_fix = []
-        
-        #if isinstance(from_to_codes, str):
-            #from_to_codes = [(from_to_codes, None)]
-        #elif isinstance(from_to_codes, tuple):
-            #from_to_codes = [from_to_codes]
-        
-        # If input from_to_codes is list.
-        if isinstance(from_to_codes, list):
+        for from_to in from_to_codes:
+            from_code, to_code = from_to[0], from_to[-1]
 
-            # If first value is not list or tuple.
-            if isinstance(from_to_codes[0], list) is False and isinstance(from_to_codes[0], tuple) is False:
+            # If a to_area is not spesified, pair from_area with its neighbours both ways.
+            if to_code is None or len(to_code) == 0:
+                for x in self._border_areas(from_code):
+                    from_to_fix.extend([[from_code, x], [x, from_code]])
 
-                # Wrap all single values in list as from_area in list tuple.
-                l = []
-                for a in from_to_codes:
-                    l.append((a, None))
-                from_to_codes = l
-        
+            # Else (from, to) and (to, from).
+            else:
+                from_to_fix.extend([[from_code, to_code], [to_code, from_code]])
 
-        
-        
-        
-        # Loop on mandatory parameters names.
-        for m in list(mandatorys_dict.keys()):
-            k = m.lower()
+        return self._unique_from_to(from_to_fix)
 
-            # If to_area is part of mandatory parameters.
-            if 'out_domain' in k or 'acquiring' in k:
-                    
-                # Loop on spesified from_to_codes.
-                for idx in range(len(from_to_codes)):
+    def _unique_from_to(self, from_to_codes):
+        '''Returns from_to_codes as lists without duplicates, in order.'''
+        return [list(x) for x in dict.fromkeys(tuple(x) for x in from_to_codes)]
 
-                    # If a to_area is not spesified.
-                    if from_to_codes[idx][-1] is None or len(from_to_codes[idx][-1]) == 0:
+    def _border_areas(self, code):
+        '''Returns area codes to pair area code with in flow datasets, neighbours of area, or all other areas if all_borders or none are known.'''
 
-                        # Store this from_code:
-                        from_code = from_to_codes[idx][0]
+        neighbours = [] if self.all_borders else self.area_adjacency.neighbours(code)
+        if len(neighbours) == 0:
+            neighbours = [x for x in self.parameters['Areas'].keys() if x != code]
 
-                        # Pop old instance
-                        #from_to_codes.pop(idx-1)
+        return neighbours
 
-                        # Get list of all available area codes.
-                        all_to_codes = [x for x in list(self.parameters['Areas'].keys()) if x != from_code]
 
-                        # Create list for storing new combinations.
-                        nlist = []
+    def _request_data(self, tasks, msg, max_workers=1, executor=None):
+        '''Requesting data of planned tasks, requests made on executor or thread pool of max_workers. Records are in order of requests.'''
 
-                        # Extend list with all combinations of from_to and to_from.
-                        nlist.extend([[from_code, x] for x in all_to_codes])
-                        nlist.extend([[x, from_code] for x in all_to_codes])
+        # Make requests.
+        if 'print' in msg:
+            print(f'Planned {len(tasks)} requests.')
+        self._size_session_pool(max_workers)
+        results = self._request_tasks(tasks, msg, max_workers=max_workers, executor=executor)
 
-                        # Insert all new combinations into main list. 
-                        [from_to_codes.append(x) for x in nlist]
+        # Return requested data in one dataframe.
+        return self._results2df(results)
 
-                    # Else (from, to) is spesified.
-                    else:
-                        
-                        # If not (to, from) is spesified.
-                        from_to = [from_to_codes[idx][-1], from_to_codes[idx][0]]
-                        if from_to not in from_to_codes:
+    def _request_tasks(self, tasks, msg, max_workers=1, executor=None, rounds=3):
+        '''Makes requests of tasks, tasks over allowed window are retried in learned windows up to rounds times. Returns results in order of tasks.'''
 
-                            # Insert after (to, from) in list.
-                            from_to_codes.insert((idx+1), from_to)
+        results = self._map_requests(tasks, msg, max_workers=max_workers, executor=executor)
 
-           # else:
+        # If reason spesifies max allowed query window, retry request in windows within it.
+        retry = self._allowed_retries(tasks, results)
+        if len(retry) > 0 and rounds > 0:
+            retry_results = self._request_tasks([t for idx in retry for t in retry[idx]], msg, max_workers=max_workers, executor=executor, rounds=rounds-1)
+            results = self._merge_retries(results, retry, retry_results)
 
-        # Else not list in input:
-        #else:
+        return results
 
-        # remove possible duplicates in list.
-        #from_to_codes = list(dict.fromkeys(from_to_codes))
-        res = []
-        for i in from_to_codes:
-            if i not in res:
-                res.append(i)
-        from_to_codes = res
+    async def _request_data_async(self, datasets, from_to_codes, start_end_times, msg, session, semaphore, executor=None):
+        '''Requesting data async, like _request_data. Records are in order of requests.'''
+        import asyncio
 
-        # Ensure (from, to) and (to, from)
-        
-        return from_to_codes
+        async def request_tasks(tasks, rounds=3):
+            results = list(await asyncio.gather(*[self._request_task_async(task, msg, session, semaphore, executor) for task in tasks]))
 
+            # If reason spesifies max allowed query window, retry request in windows within it.
+            retry = self._allowed_retries(tasks, results)
+            if len(retry) > 0 and rounds > 0:
+                retry_results = await request_tasks([t for idx in retry for t in retry[idx]], rounds=rounds-1)
+                results = self._merge_retries(results, retry, retry_results)
 
-    def _request_data(self, datasets, from_to_codes, start_end_times, msg):
-        '''Requesting data'''
+            return results
 
-        response = {}
+        # Make requests, planned in executor as window limits and statics may be loaded from disk.
+        tasks = await asyncio.get_running_loop().run_in_executor(executor, self._plan_requests, datasets, from_to_codes, start_end_times)
+        if 'print' in msg:
+            print(f'Planned {len(tasks)} requests.')
+        results = await request_tasks(tasks)
 
-        # Create dataframe for storing dataset total data response.
-        df = pd.DataFrame()
-        
-        # Loop on datasets:
-        for dataset in datasets:
+        # Return requested data in one dataframe.
+        return self._results2df(results)
+
+    def _plan_requests(self, datasets, from_to_codes, start_end_times):
+        '''Returns list of request tasks (dataset, mandatorys_dict, from_to_code, start_end_time), in order of datasets, from_to_codes and start_end_times.'''
+        return self._make_plan(datasets, from_to_codes, start_end_times).tasks
 
+    def _make_plan(self, datasets, from_to_codes, start_end_times, check_cache=False, max_workers=1):
+        '''
+        Returns RequestPlan() of deduplicated request tasks, windows coalesced and split in largest windows allowed for each dataset.
+        Tasks with response in .cache are listed as cached if check_cache. Runtime is estimated at .rate_limiter and max_workers.
+        '''
+
+        # Merge overlapping and adjacent windows, so they are requested in the largest allowed windows.
+        start_end_times = list(start_end_times)
+        windows_fix = coalesce_windows(start_end_times)
+
+        tasks, parameters, keys = [], [], set()
+        duplicates = 0
+        for dataset in datasets:
 
             # Get requesting dataset url parameters.
             mandatorys_dict = self._get_dataset_mandatorys_dict(dataset=dataset)
-        
+
             # If out_area is part of mandatory parameters but is missing in a spesified from_to_codes:
             # Adds (from, to) and (to, from) for that are to all available areas.
             from_to_codes_fix = self._ensure_from_to_all(mandatorys_dict, from_to_codes)
 
-            
+            # Split start_end_times in largest windows allowed for dataset document type.
+            limit = self._window_limit(mandatorys_dict)
+            windows = [w for start_end_time in windows_fix for w in split_window(start_end_time, limit)]
 
-            # Loop on from_to_areas_list
             for from_to_code in from_to_codes_fix:
+                for start_end_time in windows:
+                    task = (dataset, mandatorys_dict, from_to_code, start_end_time)
 
+                    # Skip task with same url parameters as a planned task, ex. same area pair in from_to of several areas.
+                    parameters_dict = self._task_parameters_dict(task)
+                    key = tuple(sorted((str(k), str(v)) for k, v in parameters_dict.items()))
+                    if key in keys:
+                        duplicates += 1
+                        continue
+                    keys.add(key)
 
-                # Assume start_end_time is ok.
-                bad_start_end_flag = True
-                w = 0
-                while bad_start_end_flag and w < 2:
-                    w += 1
+                    tasks.append(task)
+                    parameters.append(parameters_dict)
 
-                
-                    # Loop on start_end_times_list.
-                    for start_end_time in start_end_times:
+        cached = []
+        if check_cache and self.cache is not None:
+            cached = [idx for idx, parameters_dict in enumerate(parameters) if self.cache.contains(parameters_dict)]
 
-                        # While not error in response:
-                    
-                        if 'print' in msg:
-                            # Making request
-                            print('\n********************************')
-                            print('REQUEST:')
-                            print(f'dataset = "{dataset}"')
-                            print(f'from_to = {from_to_code}')
-                            print(f'start_end = {start_end_time}')
-                        
-        
-                        parameters_dict = self._fill_mandatory_parameters_dict(mandatorys_dict, from_to_code, start_end_time)
+        return RequestPlan(tasks, parameters, duplicates=duplicates, coalesced=len(start_end_times) - len(windows_fix), cached=cached,
+                           rate_limiter=self.rate_limiter, max_workers=max_workers, call_seconds=self._call_seconds())
 
+    def _call_seconds(self):
+        '''Returns mean seconds of api calls made by client, time to first byte and download, default if none made.'''
 
-                        response, url = self._call_api(parameters_dict=parameters_dict)
+        summary = self.metrics.summary()
+        if 'http_ttfb' not in summary:
+            return DEFAULT_CALL_SECONDS
 
-                        if 'url' in msg:
-                                print(f'url = {url}')
-                    
-                    
-                        # Try if response is zipfile.
-                        zipfileflag = False
-                        try:
-                            # Create zipfile.
-                            zipf = zipfile.ZipFile(io.BytesIO(response.content))
-
-                            # If try success, set zipfile flag true.
-                            zipfileflag = True
-                        
-                            # Parse content in zipfile into df.
-                            df1 = self._zipfile2df(zipf)
-
-                            # Add dataset name to response.
-                            df1.insert(0, 'dataset', dataset)
-                            df1.insert(1, 'success', True)
-                            df1.insert(2, 'parameters', str(parameters_dict))
-                            if 'reason' not in df1.columns:
-                                df1.insert(3, 'reason', '')
-                        
-                        # Except error if not zipfile.
-                        except (zipfile.BadZipFile):
-                            None
-        
-                        # If bad response with reason text.
-                        if 'text' in response.text and not zipfileflag:
-                            reason_str = bs4.BeautifulSoup(response.content, 'lxml').find('text').string
-                        
-                            # Print msg.
-                            if 'print' in msg:
-                                print("RESPONSE:")
-                                #print('status = ERROR, bad request.')
-                                print(f'reason = {reason_str}')
-                                #print(f'url = {url}')
+        return summary['http_ttfb']['mean'] + summary.get('http_download', {'mean': 0.})['mean']
+
+    def _window_limit(self, mandatorys_dict):
+        '''Returns max request window of dataset mandatorys, one day if dataset is requested by date.'''
 
-                                
-                                # If spesified query days max in reason.
-                                if 'allowed: ' in reason_str:
-                                    val_unit = reason_str.split('allowed: ')[-1].split(',')[0].split(' ')
-                                    print(f'ALLOWED: {val_unit[0]} in unit {val_unit[-1]}')
+        keys = [k.lower() for k in mandatorys_dict.keys()]
+        if any('date' in k for k in keys) and not any('start' in k for k in keys):
+            return datetime.timedelta(days=1)
 
-                                    start = datetime.datetime.strptime(start_end_time[0], '%Y%m%d%H%M')
-                                    end = datetime.datetime.strptime(start_end_time[-1], '%Y%m%d%H%M')
+        return self.window_limits.get(window_limit_key(mandatorys_dict))
 
-                                    new_start_end = []
-                                    while start < end:
+    def _allowed_retries(self, tasks, results):
+        '''Returns dict of index of tasks with reason spesifying max allowed query window, and their retry tasks in windows within it. Learns the limit.'''
 
-                                        start_str = start.strftime('%Y%m%d%H%M')
+        retry = {}
+        for idx, (task, (response_records, reason_str)) in enumerate(zip(tasks, results)):
+            if reason_str is None:
+                continue
 
-                                        start = start+datetime.timedelta(days=1)
+            # Learn limit of document type, retry if window is split.
+            dataset, mandatorys_dict, from_to_code, start_end_time = task
+            limit = self.window_limits.learn(window_limit_key(mandatorys_dict), reason_str)
+            if limit is None:
+                continue
 
-                                        end_str = (start).strftime('%Y%m%d%H%M')
+            windows = split_window(start_end_time, limit)
+            if len(windows) > 1:
+                retry[idx] = [task[:3] + (w,) for w in windows]
 
-                                        new_start_end.append((start_str, end_str))
+        return retry
 
-                                    start_end_times = new_start_end
+    def _merge_retries(self, results, retry, retry_results):
+        '''Returns results with results of retried tasks replaced by records of their retry results.'''
 
+        results = list(results)
+        retry_results = iter(retry_results)
+        for idx, retry_tasks in retry.items():
+            response_records = []
+            for _ in retry_tasks:
+                response_records.extend(next(retry_results)[0])
+            results[idx] = (response_records, None)
 
+        return results
 
+    def _results2df(self, results):
+        '''Returns records of all request results in one dataframe.'''
 
-                                    break
-                                else:
-                                    bad_start_end_flag = False
+        records = []
+        for response_records, _ in results:
+            records.extend(response_records)
 
-                            # Try to fix new request from bad response reason.
-                            fix_msg = self._reason_fix_request(reason_str) #TODO: not implemented.
+        if len(records) == 0:
+            return pd.DataFrame(columns=['dataset', 'success', 'parameters', 'reason'])
+        return pd.DataFrame(records)
 
+    def _size_session_pool(self, n_workers):
+        '''Grows connection pool of own session to n_workers, None is thread pool default, so parallel requests each keep a connection alive.'''
 
-                            # Add dataset name and reason to parameters_dict
-                            d = {}
-                            d['dataset'] = dataset
-                            d['success'] = False
-                            d['parameters'] = str(parameters_dict)
-                            d['reason'] = reason_str
+        n_workers = default_workers(n_workers)
+        if self._owns_session and n_workers > getattr(self.session, 'pool_size', DEFAULT_POOL_SIZE):
+            mount_pool(self.session, n_workers)
 
+    def _map_requests(self, tasks, msg, max_workers=1, executor=None):
+        '''Makes requests of tasks on executor, on thread pool of max_workers or serially. Returns results in order of tasks.'''
 
-                            # Make this the bad response dataframe.
-                            df1 = pd.DataFrame([d])
+        def request(task):
+            return self._request_task(task, msg)
 
-                        # Else good response.
-                        elif not zipfileflag:
+        # User executor.
+        if executor is not None:
+            return list(executor.map(request, tasks))
 
-                            # Create dataframe from this response.
-                            df1 = self._response_xml_to_df(response)
+        # Thread pool, None is default number of workers.
+        if (max_workers is None or max_workers > 1) and len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                return list(pool.map(request, tasks))
 
-                            # Add dataset name to response.
-                            df1.insert(0, 'dataset', dataset)
-                            df1.insert(1, 'success', True)
-                            df1.insert(2, 'parameters', str(parameters_dict))
-                            if 'reason' not in df1.columns:
-                                df1.insert(3, 'reason', '')
+        return [request(task) for task in tasks]
 
+    def _task_parameters_dict(self, task):
+        '''Returns url parameters of request task.'''
+        dataset, mandatorys_dict, from_to_code, start_end_time = task
 
-                        if 'print' in msg:
-                            print('**********************************')
+        # Fill copy, mandatorys_dict is shared by all requests of dataset.
+        return self._fill_mandatory_parameters_dict(dict(mandatorys_dict), from_to_code, start_end_time)
 
-                        # Append this dataframe response dataframe to total dataframe.
-                        df = df.append(df1).reset_index(drop=True)
-        
+    def _request_task(self, task, msg):
+        '''Makes request of task (dataset, mandatorys_dict, from_to_code, start_end_time), returns records and bad response reason, None if good.'''
 
-        # Return requested data.
-        return df
+        parameters_dict = self._task_parameters_dict(task)
+        try:
+            response, url = self._call_api(parameters_dict=parameters_dict)
+        except RequestFailed as e:
+            return self._failed_task_result(task, parameters_dict, e, msg)
+
+        return self._parse_task_response(task, parameters_dict, response.content, url, msg)
+
+    async def _request_task_async(self, task, msg, session, semaphore, executor=None):
+        '''Makes request of task async, parsing response in executor. Returns records and bad response reason, None if good.'''
+        import asyncio
+
+        parameters_dict = self._task_parameters_dict(task)
+        try:
+            async with semaphore:
+                content, url = await self._call_api_async(session, parameters_dict=parameters_dict, executor=executor)
+        except RequestFailed as e:
+            return self._failed_task_result(task, parameters_dict, e, msg)
+
+        # Parse off the event loop, large responses would stall it.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._parse_task_response, task, parameters_dict, content, url, msg)
+
+    def _failed_task_result(self, task, parameters_dict, error, msg):
+        '''Returns bad response record of request task failed after retries, with structured failure, and reason.'''
+
+        dataset, mandatorys_dict, from_to_code, start_end_time = task
+        reason_str = f'Request failed: {error}'
+        failure = {'dataset': dataset, 'from_to': tuple(from_to_code), 'start_end': tuple(start_end_time), 'parameters': dict(parameters_dict),
+                   'status': error.status, 'attempts': error.attempts, 'error': str(error)}
+
+        if 'print' in msg:
+            print('\n'.join(['\n********************************', 'REQUEST FAILED:', f'dataset = "{dataset}"', f'from_to = {from_to_code}',
+                             f'start_end = {start_end_time}', f'reason = {reason_str}', '**********************************']))
+
+        return [self._response_record(dataset, parameters_dict, {'reason': reason_str, 'failure': failure})], reason_str
+
+    def _parse_task_response(self, task, parameters_dict, content, url, msg):
+        '''
+        Parse response content of request task into records, returns records and bad response reason, None if good.
+        Content is classified from its first bytes, and parsed once by the parser of its kind, never decoded to str.
+        '''
+
+        dataset, mandatorys_dict, from_to_code, start_end_time = task
+
+        # Msg lines are printed at once, not mixed with other requests.
+        lines = []
+        if 'print' in msg:
+            # Making request
+            lines.extend(['\n********************************', 'REQUEST:', f'dataset = "{dataset}"', f'from_to = {from_to_code}', f'start_end = {start_end_time}'])
+
+        if 'url' in msg:
+            lines.append(f'url = {url}')
+
+        reason_str = None
+
+        # Zip magic or root element of response.
+        kind, root = classify_response(content)
+
+        # Zipfile of documents, parse content in zipfile into records, add dataset name to records.
+        if kind == 'zip':
+            try:
+                response_records = [self._response_record(dataset, parameters_dict, r) for r in self._zipfile2records(zipfile.ZipFile(io.BytesIO(content)))]
+            except zipfile.BadZipFile as e:
+                reason_str = f'Invalid zip response: {e}'
+
+        # Bad response with reason text.
+        elif kind == 'acknowledgement':
+            reason_str = parse_acknowledgement(content)
+            if reason_str is None:
+                reason_str = 'Acknowledgement without reason'
+
+        # Good response, create records from this response, add dataset name to records.
+        elif kind == 'document':
+            response_records, reason_str = self._response_xml_to_records(content)
+            response_records = [self._response_record(dataset, parameters_dict, r) for r in response_records]
+
+        # Empty, not xml or not an api document.
+        else:
+            reason_str = f'Unrecognised response, root element <{root}>' if root is not None else f'Unrecognised response of {len(content)} bytes'
+
+        if reason_str is not None:
+
+            # Print msg.
+            if 'print' in msg:
+                lines.append('RESPONSE:')
+                lines.append(f'reason = {reason_str}')
+
+                # If spesified query days max in reason.
+                if 'allowed: ' in reason_str:
+                    val_unit = reason_str.split('allowed: ')[-1].split(',')[0].split(' ')
+                    lines.append(f'ALLOWED: {val_unit[0]} in unit {val_unit[-1]}')
+
+            # Make this the bad response record.
+            response_records = [self._response_record(dataset, parameters_dict, {'reason': reason_str})]
+
+        if 'print' in msg:
+            lines.append('**********************************')
+        if len(lines) > 0:
+            print('\n'.join(lines))
+
+        # Count responses and parsed points.
+        self.metrics.inc('responses_total', kind='reason' if reason_str is not None else 'zip' if kind == 'zip' else 'xml')
+        self.metrics.inc('points_parsed_total', sum(len(r.get('position', r.get('quantity', ()))) for r in response_records))
+
+        return response_records, reason_str
+
+    def _response_record(self, dataset, parameters_dict, record):
+        '''Returns parsed record with dataset, success, parameters and reason first.'''
+
+        d = {'dataset': dataset, 'success': True, 'parameters': str(parameters_dict), 'reason': ''}
+        d.update(record)
+        if len(str(d['reason'])) > 0:
+            d['success'] = False
+
+        return d
     
 
     def set_apikey(self, api_key):
         '''Setting entsoe-t api_key'''
         self.api_key = api_key
 
-    def get_data(self, dataset, from_to, start_end=None, msg=['print']):
+    def get_data(self, dataset, from_to, start_end=None, msg=['print'], long=False, max_workers=1, executor=None, sink=None, typed=False, float_dtype='float64',
+                 dry_run=False):
         '''
         Main frontend function for getting data from Entsoe-t platform.
         
@@ -1343,15 +1663,225 @@ class EntsoeTransparencyClient():
             -dataset: Name of dataset. Name is "close-matched" against list of available datasets in .datasets['names']
             -from_to: ('from_area', 'to_area') in request. "Close-matched" against available areas in .parameters['Areas']
             -start_stop: ('start_time','end_time') "format=yyyyddmmHHMM" in request.
+            -long: Return good responses in long format, one row per point indexed by tz-aware timestamp.
+            -max_workers: Requests made in parallel on thread pool of max_workers, None is pool default. All requests share .rate_limiter.
+            -executor: concurrent.futures.Executor to make requests on, instead of thread pool. Pass its number of workers as max_workers.
+            -sink: ParquetSink() good responses are also written to in typed long format.
+            -typed: Return long format with compact types, code columns as categoricals sharing categories of .code_table.
+            -float_dtype: "float64" or "float32" of quantity and price.amount columns if typed.
+            -dry_run: Return RequestPlan() of request, with estimated api calls and runtime, without making requests.
         
         :Outputs:
-            -df: Response content in pandas.DataFrame.
+            -df: Response content in pandas.DataFrame. Points of each row in lists, with 'timestamp' arrays, unless long or typed.
+                 Requests failed after retries are bad responses, and listed in df.attrs['failures'].
+                 RequestPlan() if dry_run, made later by .execute_plan().
 
         :Info:
             -
 
         '''
 
+        # Check api_key, match datasets and areas, fix time formats.
+        inputs = self._get_data_inputs(dataset, from_to, start_end)
+        if inputs is None:
+            return None
+
+        # Compile deduplicated request units, only returned if dry run.
+        plan = self._make_plan(*inputs, check_cache=dry_run, max_workers=max_workers)
+        if dry_run:
+            if 'print' in msg:
+                print(plan)
+            return plan
+
+        return self.execute_plan(plan, msg=msg, long=long, max_workers=max_workers, executor=executor, sink=sink, typed=typed, float_dtype=float_dtype)
+
+    def execute_plan(self, plan, msg=['print'], long=False, max_workers=1, executor=None, sink=None, typed=False, float_dtype='float64'):
+        '''
+        Makes requests of RequestPlan() from .get_data(dry_run=True), returns result as .get_data().
+
+        :Inputs:
+            -plan: RequestPlan() of request.
+            -msg, long, max_workers, executor, sink, typed, float_dtype: As in .get_data().
+
+        :Outputs:
+            -df: As in .get_data().
+        '''
+
+        # Requesting data.
+        df = self._request_data(plan.tasks, msg=msg, max_workers=max_workers, executor=executor)
+
+        # Write long format to sink, reused as result if long.
+        if sink is not None:
+            long_df = self._fix_response_df(df, long=True)
+            with self.metrics.stage('sink_write', rows=len(long_df)):
+                sink.write(long_df)
+            if typed:
+                return self._typed_df(long_df, float_dtype)
+            if long:
+                return long_df
+
+        # Return fixed df.
+        return self._fix_response_df(df, long=long, typed=typed, float_dtype=float_dtype)
+
+    async def get_data_async(self, dataset, from_to, start_end=None, msg=['print'], long=False, max_concurrency=8, session=None, executor=None, timeout=60,
+                             typed=False, float_dtype='float64'):
+        '''
+        Async counterpart of .get_data(), requests made concurrently on aiohttp session without blocking the event loop.
+
+        :Inputs:
+            -dataset, from_to, start_end, msg, long, typed, float_dtype: As in .get_data().
+            -max_concurrency: Max requests in flight, also connection pool size of created session.
+            -session: aiohttp.ClientSession to make requests on, created and closed per call if None.
+            -executor: concurrent.futures.Executor inputs are fixed, cache is read and written, and responses are parsed in, loop default executor if None.
+            -timeout: Seconds before request times out, for created session.
+
+        :Outputs:
+            -df: As in .get_data(). All requests share .rate_limiter with sync requests.
+
+        '''
+        import asyncio
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+
+        # Check api_key, match datasets and areas, fix time formats. Off the event loop, as statics and areas may be loaded from disk or api guide.
+        inputs = await loop.run_in_executor(executor, self._get_data_inputs, dataset, from_to, start_end)
+        if inputs is None:
+            return None
+        datasets_fix, from_to_codes_fix, start_end_times_fix = inputs
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Requesting data, on pooled session.
+        if session is None:
+            connector = aiohttp.TCPConnector(limit=max_concurrency)
+            async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+                df = await self._request_data_async(datasets_fix, from_to_codes_fix, start_end_times_fix, msg, session, semaphore, executor=executor)
+        else:
+            df = await self._request_data_async(datasets_fix, from_to_codes_fix, start_end_times_fix, msg, session, semaphore, executor=executor)
+
+        # Fix df off the event loop, like parsing.
+        return await loop.run_in_executor(executor, functools.partial(self._fix_response_df, df, long=long, typed=typed, float_dtype=float_dtype))
+
+    def iter_data(self, dataset, from_to, start_end=None, msg=['print'], typed=True, float_dtype='float64', max_workers=1, executor=None):
+        '''
+        Generator counterpart of .get_data(), yields result of each request (dataset, from_to, window) as soon as it is fetched and parsed.
+        Only responses in flight and not yet yielded are held in memory, at most 2 x max_workers, not all responses of request.
+
+        :Inputs:
+            -dataset, from_to, start_end, msg, max_workers, executor: As in .get_data().
+            -typed, float_dtype: Chunks typed as .get_data(typed=True), else long format as .get_data(long=True).
+
+        :Outputs:
+            -df: Points of each request in order of .plan_data(), with request in df.attrs 'dataset', 'from_to' and 'start_end',
+                 bad response reason in df.attrs['reason'] (None if good) and failures in df.attrs['failures'].
+                 Requests over allowed window are retried in learned windows, and yielded as one chunk.
+        '''
+
+        # Check api_key, match datasets and areas, fix time formats.
+        inputs = self._get_data_inputs(dataset, from_to, start_end)
+        if inputs is None:
+            return
+
+        tasks = self._plan_requests(*inputs)
+        if 'print' in msg:
+            print(f'Planned {len(tasks)} requests.')
+
+        def request(task):
+            return task, self._request_tasks([task], msg)[0]
+
+        # Requests made serially, or on executor or thread pool with bounded number of results ahead of consumer.
+        pool = None
+        if executor is None and (max_workers is None or max_workers > 1) and len(tasks) > 1:
+            executor = pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            if executor is None:
+                results = (request(task) for task in tasks)
+            else:
+                self._size_session_pool(max_workers)
+                results = bounded_map(executor, request, tasks, window=2*default_workers(max_workers))
+
+            for task, result in results:
+                df = self._fix_response_df(self._results2df([result]), long=True, typed=typed, float_dtype=float_dtype)
+                df.attrs.update({'dataset': task[0], 'from_to': tuple(task[2]), 'start_end': tuple(task[3]), 'reason': result[1]})
+                yield df
+
+        # Pending requests are cancelled if consumer stops early.
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def get_data_incremental(self, dataset, from_to, start_end=None, store=None, revisable_days=3, msg=['print'], max_workers=1, executor=None):
+        '''
+        Incremental .get_data(), only windows not in local store, or recent enough to be revised, are requested.
+        Fetched points are merged into store, and requested points are returned from store.
+
+        :Inputs:
+            -dataset, from_to, start_end, msg, max_workers, executor: As in .get_data().
+            -store: TimeSeriesStore() of fetched points and windows, default store if None.
+            -revisable_days: Windows ending less than revisable_days before they were fetched are fetched again.
+
+        :Outputs:
+            -df: Stored points of request in long format, as .get_data(long=True), in time order.
+        '''
+
+        store = store if store is not None else TimeSeriesStore()
+
+        # Check api_key, match datasets and areas, fix time formats.
+        inputs = self._get_data_inputs(dataset, from_to, start_end)
+        if inputs is None:
+            return None
+
+        # Windows of planned requests missing in store.
+        tasks = self._plan_requests(*inputs)
+        fetch = []
+        for task in tasks:
+            for window in store.missing(task[0], task[2][0], task[2][-1], task[3], revisable_days=revisable_days):
+                fetch.append(task[:3] + (window,))
+
+        if 'print' in msg:
+            print(f'Requesting {len(fetch)} of {len(tasks)} planned windows missing in store.')
+
+        # Make requests.
+        self._size_session_pool(max_workers)
+        results = self._request_tasks(fetch, msg, max_workers=max_workers, executor=executor)
+
+        # Merge points of good responses into store, mark windows fetched if response had data or no data.
+        for task, (response_records, reason_str) in zip(fetch, results):
+            good = [r for r in response_records if len(str(r.get('reason', ''))) == 0]
+            bad = [r['reason'] for r in response_records if len(str(r.get('reason', ''))) > 0]
+            if len(good) > 0:
+                store.merge(task[0], task[2][0], task[2][-1], expand_periods(pd.DataFrame(good)))
+            if all('no matching data' in str(x).lower() for x in bad):
+                store.add_coverage(task[0], task[2][0], task[2][-1], task[3])
+
+        # Return requested points from store.
+        keys = list(dict.fromkeys((task[0], task[2][0], task[2][-1]) for task in tasks))
+        parts = [store.read(dset, from_code, to_code, start_end_time) for dset, from_code, to_code in keys for start_end_time in inputs[2]]
+        parts = [x for x in parts if len(x) > 0]
+        if len(parts) == 0:
+            return pd.DataFrame()
+        return pd.concat(parts).sort_index(kind='stable')
+
+    def plan_data(self, dataset, from_to, start_end=None):
+        '''
+        Returns planned requests of .get_data() with same inputs, without making them.
+
+        :Outputs:
+            -df: One row per request, columns dataset, from_to, start, end and cached (made from .cache without api call).
+                 More calls are made only if a smaller window limit is learned.
+        '''
+
+        # Check api_key, match datasets and areas, fix time formats.
+        inputs = self._get_data_inputs(dataset, from_to, start_end)
+        if inputs is None:
+            return None
+
+        return self._make_plan(*inputs, check_cache=True).to_frame()
+
+    def _get_data_inputs(self, dataset, from_to, start_end):
+        '''Returns matched datasets, from_to codes and fixed start_end times of get_data inputs, None if api_key is missing or no dataset match.'''
+
         # Check if api_key is missing.
         if self.api_key is None:
 
@@ -1362,7 +1892,8 @@ class EntsoeTransparencyClient():
             return None
         
         # Finds dataset match in datasets, area match in parameters and fix time formats.
-        datasets_fix, from_to_areas_fix, from_to_codes_fix, start_end_times_fix = self._fix_get_inputs(dataset, from_to, start_end)
+        with self.metrics.stage('fix_inputs'):
+            datasets_fix, from_to_areas_fix, from_to_codes_fix, start_end_times_fix = self._fix_get_inputs(dataset, from_to, start_end)
 
         
         # Loop on matched datasets.
@@ -1377,13 +1908,19 @@ class EntsoeTransparencyClient():
                 # Return None.
                 return None
 
-        
-        # Requesting data.
-        df = self._request_data(datasets_fix, from_to_codes_fix, start_end_times_fix, msg=msg)
+        return datasets_fix, from_to_codes_fix, start_end_times_fix
+
+    def _fix_response_df(self, df, long=False, typed=False, float_dtype='float64'):
+        '''Returns requested df with bad responses combined into first row, timestamps added and equal rows merged, or long format if long, typed if typed.'''
 
+        # Requests failed after retries, as structured list returned in df.attrs['failures'].
+        failures = []
+        if 'failure' in df.columns:
+            failures = [x for x in df['failure'] if isinstance(x, dict)]
+            df = df.drop(columns=['failure'])
 
-        # Create dataframe for storing fixed df response.
-        df_fix = pd.DataFrame()
+        # Create list for storing fixed df response parts.
+        df_fix = []
 
         # Combine all bad_responses into one row in dataframe.
         bad_df = df[df['reason'].apply(lambda x: len(str(x)) != 0)]
@@ -1397,38 +1934,66 @@ class EntsoeTransparencyClient():
             bad_d['success'] = bad_df['success'].values.tolist()
             bad_d['parameters'] = bad_df['parameters'].values.tolist()
             bad_d['reason'] = bad_df['reason'].values.tolist()
-            df_fix = df_fix.append(pd.DataFrame([bad_d])).reset_index(drop=True)
+            df_fix.append(pd.DataFrame([bad_d]))
         
         # Extract good responses.
-        good_df = df[df['reason'].apply(lambda x: len(str(x)) == 0)]
+        good_df = df[df['reason'].apply(lambda x: len(str(x)) == 0)].reset_index(drop=True)
+
+        # Malformed Periods, with point and value counts not matching, are skipped and listed in failures.
+        errors = []
+
+        # If long format, return one row per point indexed by timestamp.
+        if long or typed:
+            with self.metrics.stage('expand', rows=len(good_df)):
+                long_df = expand_periods(good_df, errors=errors)
+            long_df.attrs['failures'] = failures + self._malformed_failures(good_df, errors)
+            return self._typed_df(long_df, float_dtype) if typed else long_df
+
+        # Add timestamps of each Period from start, resolution and positions.
+        if 'start' in good_df.columns and len(value_columns(good_df.columns)) > 0:
+            with self.metrics.stage('timestamps', rows=len(good_df)):
+                good_df['timestamp'] = period_timestamps(good_df, errors=errors)
+            failures = failures + self._malformed_failures(good_df, errors)
+            good_df = good_df.drop(index=[row for row, _ in errors]).reset_index(drop=True)
 
-        # Combine rows 'quantity', 'start' and 'end' if rest is equal.
-        good_df_fix = self._merge_extend_equal_rows(good_df, extends=['parameters', 'createddatetime', 'quantity', 'start', 'end'])
+        # Combine rows value columns ('quantity', 'price.amount', ...), 'position', 'timestamp', 'start' and 'end' if rest is equal.
+        with self.metrics.stage('merge', rows=len(good_df)):
+            good_df_fix = self._merge_extend_equal_rows(good_df, extends=['parameters', 'createddatetime'] + value_columns(good_df.columns) + ['position', 'timestamp', 'start', 'end'])
         
-        # Append good_df to fixed df.
-        df_fix = df_fix.append(good_df_fix).reset_index(drop=True)
+        # Concat bad responses row and good_df into fixed df.
+        df_fix.append(good_df_fix)
+        df_fix = pd.concat(df_fix, ignore_index=True)
 
         # Unpack single values wrapped in lists.
         for col in df_fix.columns:
             df_fix[col] = [x[0] if isinstance(x,list) and len(x) == 1 else x for x in df_fix[col]]
 
-        # Fix timestring to datetime and add timestamps
-        if 'start' in df_fix.columns and 'end' in df_fix.columns and 'quantity' in df_fix.columns:
-            df_fix['timestamp'] = ''
-            for idx, row in df_fix.iterrows():
-
-                # If quantity is not np.na
-                try:
-                    if isinstance(df_fix.at[idx, 'quantity'], list) or isinstance(df_fix.at[idx, 'quantity'], int):
-                        start, end, df_fix.at[idx, 'timestamp'] = self._seq2sets(df_fix.at[idx, 'start'], df_fix.at[idx, 'end'], df_fix.at[idx, 'quantity'])
-                except(ValueError, TypeError):
-                    None
-        
+        df_fix.attrs['failures'] = failures
+
         # Return fixed df.
         return df_fix
-        
+
+    def _malformed_failures(self, good_df, errors):
+        '''Returns failures of malformed Periods in errors, (row, reason) of good_df, with dataset, parameters, Period start and error.'''
+
+        failures = []
+        for row, reason in errors:
+            start = good_df.at[row, 'start'] if 'start' in good_df.columns else None
+            failures.append({'dataset': good_df.at[row, 'dataset'], 'parameters': good_df.at[row, 'parameters'],
+                             'start': start[0] if isinstance(start, list) and len(start) > 0 else start, 'error': reason})
+
+        return failures
+
+    def _typed_df(self, long_df, float_dtype='float64'):
+        '''Returns long format df with compact types, code columns categoricals of .code_table.'''
+        with self.metrics.stage('typing', rows=len(long_df)):
+            return typed_frame(long_df, code_table=self.code_table, float_dtype=float_dtype)
+
     def get_areas(self):
         '''Returns available areas as GeoDataFrame.'''
+
+        # Load parameters and areas in parallel if not yet loaded.
+        self._ensure_loaded(['statics', 'areas'])
         
         # Get available areas from api statics.
         codes = self.parameters['Areas'].keys()
@@ -1437,9 +2002,7 @@ class EntsoeTransparencyClient():
 
         # Merge available api areas and available areas geometries.
         gdf = self.areas
-        for idx in df.index:
-            if df.at[idx, 'Meaning'] not in gdf['Meaning'].tolist():
-                gdf = gdf.append(df.iloc[idx])
+        gdf = pd.concat([gdf, df[~df['Meaning'].isin(gdf['Meaning'])]])
 
         # Return available api areas as GeoDataFrame.
         return gdf
@@ -1464,8 +2027,8 @@ class EntsoeTransparencyClient():
         # Extract toc and toc title.
         toc = statics_soup.find(id="toc")
         
-        # Create DataFrame for storing toc.
-        df = pd.DataFrame([], columns=["sectlevel1", "sectlevel2"])
+        # Create list for storing toc rows.
+        rows = []
         
         # Get sectlevel1 elements.
         sectlevel1 = toc.find(class_="sectlevel1")
@@ -1486,112 +2049,32 @@ class EntsoeTransparencyClient():
                 for sectlevel2_name in sectlevel2.find_all("a"):
 
                     # Append combination of sectlevel1 and sectlevel2 to DataFrame.
-                    df = df.append({'sectlevel1': str(sectlevel1_name), 'sectlevel2': str(sectlevel2_name.string)}, ignore_index=True)
+                    rows.append({'sectlevel1': str(sectlevel1_name), 'sectlevel2': str(sectlevel2_name.string)})
 
             # If sectlevel2 is empty.
             else:
                 
                 # Append combination of sectlevel1 for both locations levelcolumns in DataFrame.
-                df = df.append({'sectlevel1': str(sectlevel1_name), 'sectlevel2': str(sectlevel1_name)}, ignore_index=True)
+                rows.append({'sectlevel1': str(sectlevel1_name), 'sectlevel2': str(sectlevel1_name)})
 
-        return df
+        # Create DataFrame of toc.
+        return pd.DataFrame(rows, columns=["sectlevel1", "sectlevel2"])
     
 
     def _find_parameters_type_match(self, parameter_type, n_matches=1, accuracy_matches=0.4):
-        ''' Finds closest match in available parameters types.
+        ''' Finds closest match in available parameters types. Matches are memoized in parameters index.
         '''
-        #fix remove spaces and set all capital letters to lower
-        parameter_type_lower = parameter_type.replace(' ','_')
-        parameter_type_lower = parameter_type.lower()
-        parameter_type_list = list(self.parameters.keys())
-        parameter_type_list_lower = [each_string.lower() for each_string in parameter_type_list]
-
-        #make search for request match in available parameter types
-        match = difflib.get_close_matches(parameter_type_lower, parameter_type_list_lower, n=n_matches, cutoff=accuracy_matches)
-
-        # if match: return single match or list of multiple matches, else: return None
-        if len(match) == 1:
-            return parameter_type_list[parameter_type_list_lower.index(match[0])] #return match from original list
-        elif len(match) > 1:
-            return match
-        else:
-            return None
+        return self.parameters_index.find_type_match(parameter_type, n_matches, accuracy_matches)
 
     def find_parameters_match(self, parameter, parameter_type, n_matches=1, accuracy_matches=0.9):
         ''' 
-        Finds closest match in available parameters.
+        Finds closest match in available parameters. Matches are memoized in parameters index.
 
         Input: parameter, parameter_type
         Output: matched_parameter_value, matched_parameter_code
 
         '''
-        
-        # Initially search for match on existance of spesified parameter type in entsoeapi.
-        parameter_type_match = self._find_parameters_type_match(parameter_type=parameter_type)
-        
-        # If not found match on spesified parameter type.
-        if parameter_type_match is None:
-
-            # Return None.
-            return None, None
-        
-        # Fix searchstring with removed spaces and all lowered letters.
-        parameter_lower = parameter.replace(' ','_')
-        parameter_lower = parameter.lower()
-        
-        # Store list of available parameter values in original and lowered form.
-        parameter_values_list = list(self.parameters[parameter_type_match].values())
-        parameter_values_list_lower = [each_string.lower() for each_string in parameter_values_list]
-        
-        # Store list of available parameter codes in original and lowered form.
-        parameter_keys_list = list(self.parameters[parameter_type_match].keys())
-        parameter_keys_list_lower = [each_string.lower() for each_string in parameter_keys_list]
-
-        # Make search for match in parameter_values:
-        match = difflib.get_close_matches(parameter_lower, parameter_values_list_lower, n=n_matches, cutoff=accuracy_matches)
-        
-        # If not loose match on string, check if whole parameter word in string
-        # If not match in full string search.
-        if len(match) < 1:
-
-            # Loop on available parameters list,
-            match = []
-            for c in range(len(parameter_values_list_lower)):
-                
-                # Fix and split parameter values into list of substrings.
-                b = parameter_values_list_lower[c].replace(",","")
-                b = b.split(" ")
-
-                # Search for match in list of parameter substrings.
-                if parameter_lower in b:
-                    
-                    # If match is found, add to matchlist.
-                    match.append(parameter_values_list_lower[c])
-        
-        # If match is found in parameter type values.
-        if len(match) == 1:
-
-            # Return matched value and code and parametertype.
-            value = parameter_values_list[parameter_values_list_lower.index(match[0])]
-            code = parameter_keys_list[parameter_values_list_lower.index(match[0])]
-            return value, code
-        
-        # If not found match in values, search for match in keys:
-        match = difflib.get_close_matches(parameter_lower, parameter_keys_list_lower, n=n_matches, cutoff=accuracy_matches)
-            
-        # If match is found in parameter type codes.
-        if len(match) == 1:
-
-            # Return matched value and code and parametertype
-            value = parameter_values_list[parameter_keys_list_lower.index(match[0])]
-            code = parameter_keys_list[parameter_keys_list_lower.index(match[0])]
-            return value, code 
-
-        # If no match found in either parameter type values or codes
-        else:
-
-            # Return None
-            return None, None
+        return self.parameters_index.find_match(parameter, parameter_type, n_matches, accuracy_matches)
 
 
 
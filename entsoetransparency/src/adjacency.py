@@ -0,0 +1,94 @@
+# Adjacency index of areas that interconnect, so flow datasets of a single area are only requested against its neighbours.
+# Built from a bundled interconnector table (land borders and sea cables), plus areas touching in the areas GeoDataFrame.
+
+import csv
+import os
+
+
+# Interconnector table shipped with the package, one row per border of two area codes.
+BUNDLED_INTERCONNECTORS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'interconnectors.csv')
+
+
+def load_interconnectors(path=BUNDLED_INTERCONNECTORS_PATH):
+    '''Returns list of (code_a, code_b) borders in interconnector table csv.'''
+    with open(path, newline='') as f:
+        return [(row['code_a'], row['code_b']) for row in csv.DictReader(f)]
+
+
+def code_column(areas, codes):
+    '''Returns column of areas GeoDataFrame holding most of codes, None if no column holds any.'''
+
+    best, best_count = None, 0
+    for column in areas.columns:
+        if column == areas.geometry.name:
+            continue
+        count = areas[column].astype(str).isin(codes).sum()
+        if count > best_count:
+            best, best_count = column, count
+
+    return best
+
+
+def touching_pairs(areas, codes, tolerance=0.05, max_overlap=0.2):
+    '''
+    Returns list of (code_a, code_b) of areas in GeoDataFrame within tolerance (in geometry units) of each other, found on spatial index.
+    Pairs where one area mostly covers the other (ex. bidding zone inside control area) are nested, not borders, and skipped.
+    '''
+
+    column = code_column(areas, codes)
+    if column is None:
+        return []
+
+    areas = areas[areas[column].astype(str).isin(codes) & areas.geometry.notna() & ~areas.geometry.is_empty].reset_index(drop=True)
+    geometries = areas.geometry.values
+    area_codes = areas[column].astype(str).values
+
+    # Candidate pairs from one bulk query of buffered geometries against spatial index.
+    left, right = areas.sindex.query(areas.geometry.buffer(tolerance), predicate='intersects')
+
+    pairs = []
+    for i, j in zip(left, right):
+        if i >= j or area_codes[i] == area_codes[j]:
+            continue
+        smaller = min(geometries[i].area, geometries[j].area)
+        if smaller > 0 and geometries[i].intersection(geometries[j]).area / smaller > max_overlap:
+            continue
+        pairs.append((area_codes[i], area_codes[j]))
+
+    return pairs
+
+
+class AreaAdjacency():
+    '''Symmetric index of neighbouring area codes.'''
+
+    def __init__(self, pairs=()):
+        self._neighbours = {}
+        self.add_pairs(pairs)
+
+    def add_pairs(self, pairs):
+        for a, b in pairs:
+            if a == b:
+                continue
+            self._neighbours.setdefault(a, set()).add(b)
+            self._neighbours.setdefault(b, set()).add(a)
+
+    def neighbours(self, code):
+        '''Returns sorted list of neighbours of area code, empty if unknown.'''
+        return sorted(self._neighbours.get(code, ()))
+
+    def __contains__(self, code):
+        return code in self._neighbours
+
+    def __len__(self):
+        return len(self._neighbours)
+
+    @classmethod
+    def from_sources(cls, codes, areas=None, interconnectors_path=BUNDLED_INTERCONNECTORS_PATH, tolerance=0.05):
+        '''Returns adjacency of codes from interconnector table, and touching geometries of areas GeoDataFrame if given.'''
+
+        codes = set(codes)
+        adjacency = cls(p for p in load_interconnectors(interconnectors_path) if p[0] in codes and p[1] in codes)
+        if areas is not None:
+            adjacency.add_pairs(touching_pairs(areas, codes, tolerance=tolerance))
+
+        return adjacency
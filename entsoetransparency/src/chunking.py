@@ -0,0 +1,185 @@
+# Planning of request time windows, split in the largest windows the api allows each document type.
+# Limits are learned from bad response reasons ("Max allowed: 1 D, ...") and kept in a persistent table.
+
+import datetime
+import json
+import os
+import re
+import threading
+
+
+TIMEFORMAT = '%Y%m%d%H%M'
+
+
+# Api guide max query window of most document types, used until a smaller limit is learned.
+DEFAULT_WINDOW_LIMIT = datetime.timedelta(days=365)
+
+# Limits of whole multiples of a year are split in calendar years.
+YEAR = datetime.timedelta(days=365)
+
+# Origin of the window grid of limits other than whole years, a UTC midnight.
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Seconds of units in reason strings. Years and months rounded down, so windows never exceed the limit.
+UNIT_SECONDS = {
+    'y': 365*24*60*60, 'year': 365*24*60*60,
+    'm': 28*24*60*60, 'month': 28*24*60*60,
+    'w': 7*24*60*60, 'week': 7*24*60*60,
+    'd': 24*60*60, 'day': 24*60*60,
+    'h': 60*60, 'hour': 60*60,
+    'min': 60, 'minute': 60,
+    }
+
+_ALLOWED_REGEX = re.compile(r'allowed:?\s*(\d+)\s*([a-z]+)', re.IGNORECASE)
+
+
+def default_window_limits_path():
+    '''Returns path of learned limits table, under XDG_CACHE_HOME if set, else ~/.cache. Read when called, so tests can redirect it.'''
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'entsoetransparency', 'window_limits.json')
+
+
+def parse_allowed(reason_str):
+    '''Returns max allowed window in reason string as timedelta, ex. "Max allowed: 1 D, requested 3 D" -> 1 day. None if not found.'''
+
+    if reason_str is None:
+        return None
+
+    match = _ALLOWED_REGEX.search(reason_str)
+    if match is None:
+        return None
+
+    unit = match.group(2).lower()
+    seconds = UNIT_SECONDS.get(unit, UNIT_SECONDS.get(unit.rstrip('s')))
+    if seconds is None:
+        return None
+
+    # Zero windows are no usable limit.
+    if int(match.group(1)) <= 0:
+        return None
+
+    return datetime.timedelta(seconds=int(match.group(1)) * seconds)
+
+
+def window_limit_key(parameters_dict):
+    '''Returns key of document type in parameters, ex. "documentType=A75&processType=A16".'''
+    return '&'.join(f'{k}={v}' for k, v in sorted(parameters_dict.items()) if ('type' in k.lower()) and v is not None)
+
+
+def _next_boundary(time, limit):
+    '''
+    Returns first boundary after time on the fixed window grid of limit.
+    Limits of whole years (365 days) step calendar years from 1 January, other limits step from EPOCH, so grid boundaries never depend on the request.
+    '''
+
+    years, rest = divmod(limit, YEAR)
+    if years > 0 and not rest:
+        return datetime.datetime((time.year // years + 1) * years, 1, 1)
+
+    return time + (limit - (time - EPOCH) % limit)
+
+
+def split_window(start_end_time, limit):
+    '''
+    Splits (start, end) time strings into windows no longer than limit, as list of (start, end) time strings.
+    Start is floored and end is ceiled to UTC midnight, and windows are cut at boundaries of a fixed grid of limit (see _next_boundary()).
+    Overlapping requests so get the same interior windows, and the same cache entries.
+    '''
+
+    if limit <= datetime.timedelta(0):
+        raise ValueError(f'Window limit must be positive, got {limit}')
+
+    start = datetime.datetime.strptime(start_end_time[0], TIMEFORMAT)
+    end = datetime.datetime.strptime(start_end_time[-1], TIMEFORMAT)
+
+    # Empty window is requested as is.
+    if start >= end:
+        return [start_end_time]
+
+    # Bounds on UTC days.
+    start = start.replace(hour=0, minute=0)
+    end_day = end.replace(hour=0, minute=0)
+    end = end_day if end == end_day else end_day + datetime.timedelta(days=1)
+
+    windows = []
+    while start < end:
+        w_end = min(_next_boundary(start, limit), end)
+        windows.append((start.strftime(TIMEFORMAT), w_end.strftime(TIMEFORMAT)))
+        start = w_end
+
+    return windows
+
+
+def coalesce_windows(start_end_times):
+    '''
+    Returns (start, end) time strings sorted by start, with overlapping and adjacent windows merged into one.
+    Merged windows are split again by split_window(), so requests of adjacent windows are made in the largest allowed windows.
+    Windows not in TIMEFORMAT are returned as is.
+    '''
+
+    try:
+        windows = sorted((datetime.datetime.strptime(x[0], TIMEFORMAT), datetime.datetime.strptime(x[-1], TIMEFORMAT)) for x in start_end_times)
+    except (TypeError, ValueError):
+        return list(start_end_times)
+
+    merged = []
+    for start, end in windows:
+        if len(merged) > 0 and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return [(start.strftime(TIMEFORMAT), end.strftime(TIMEFORMAT)) for start, end in merged]
+
+
+class WindowLimits():
+    '''
+    Persistent table of max window of each document type key, learned from bad response reasons.
+
+    :Inputs:
+        -path: Json table file, read on init and written when a limit is learned. None keeps table in memory only.
+        -default: Limit of keys not in table.
+    '''
+
+    def __init__(self, path=None, default=DEFAULT_WINDOW_LIMIT):
+        self.path = path
+        self.default = default
+        self._lock = threading.Lock()
+        self.limits = {}
+
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.limits = {k: datetime.timedelta(seconds=v) for k, v in json.load(f).items() if v > 0}
+            except (OSError, ValueError):
+                self.limits = {}
+
+    def get(self, key):
+        '''Returns limit of key.'''
+        return self.limits.get(key, self.default)
+
+    def learn(self, key, reason_str):
+        '''Stores limit in reason string for key if smaller than known, returns learned limit or None if reason has none.'''
+
+        limit = parse_allowed(reason_str)
+        if limit is None:
+            return None
+
+        with self._lock:
+            if limit < self.limits.get(key, self.default):
+                self.limits[key] = limit
+                self._save()
+
+        return limit
+
+    def _save(self):
+        '''Writes table to path, atomic so other processes never read partial file.'''
+
+        if self.path is None:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({k: v.total_seconds() for k, v in self.limits.items()}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
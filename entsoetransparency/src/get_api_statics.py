@@ -6,16 +6,39 @@
 
 
 import requests
-import bs4
 import pandas as pd
 import re
 
+from .statics_snapshot import guide_content_hash, save_statics_snapshot
+
+
+def get_example_parameters(get_str):
+    '''Returns mandatory parameter names and constant "name=value" parameters of a GET request example in the api guide.'''
+
+    param_str = get_str.split('?')[-1]
+    para_str = param_str.split('&')
+    constants = [x for x in para_str if 'Type' in x and not 'psr' in x]
+    mandatorys = [x.split('=')[0] for x in para_str if 'psr' not in x and 'classification' not in x]
+
+    # Replace timeinveral with PeriodStart and PeriodEnd.
+    x = []
+    for a in mandatorys:
+        if a == 'TimeInterval':
+            x.append('periodStart')
+            x.append('periodEnd')
+        else:
+            x.append(a)
+
+    return x, constants
+
 
 def get_api_statics(savepath = '',guide_url='https://transparency.entsoe.eu/content/static_content/Static%20content/web%20api/Guide.html'):
-    '''Webscraper for Entso-E Transparency Platform api guide'''
+    '''Webscraper for Entso-E Transparency Platform api guide. If savepath, datasets and parameters are saved as statics snapshot.'''
+    import bs4
 
     # Request guide html content from url.
     response = requests.get(guide_url)
+    response.raise_for_status()
 
     # Create BeautifulSoup object, go to content tag.
     content_soup = bs4.BeautifulSoup(response.text, "lxml").find(id="static-content").find(id="content")
@@ -103,21 +126,7 @@ def get_api_statics(savepath = '',guide_url='https://transparency.entsoe.eu/cont
         datasets['names'].append(d.string.replace('\xa0','').replace('\u2009',''))
         get_str = d.find_next(text=re.compile("documentType="))
         datasets['get'].append(get_str)
-        param_str = get_str.split('?')[-1]
-        para_str = param_str.split('&')
-        constants = [x for x in para_str if 'Type' in x and not 'psr' in x]
-        mandatorys = [x.split('=')[0] for x in para_str if 'psr' not in x and 'classification' not in x]
-
-        # Replace timeinveral with PeriodStart and PeriodEnd.
-        x = []
-        for a in mandatorys:
-            if a == 'TimeInterval':
-                x.append('periodStart')
-                x.append('periodEnd')
-            else:
-                x.append(a)
-        mandatorys = x
-
+        mandatorys, constants = get_example_parameters(get_str)
 
         datasets['get_constants'].append(constants)
         datasets['get_mandatorys'].append(mandatorys)
@@ -259,6 +268,9 @@ def get_api_statics(savepath = '',guide_url='https://transparency.entsoe.eu/cont
                 df_dict[keys] = values
             parameters[name] = df_dict
                 
+    # Save as statics snapshot, with hash of guide content as the client hashes it, so clients only re-scrape when the guide changes.
+    if len(savepath) > 0:
+        save_statics_snapshot(datasets, parameters, path=savepath, guide_hash=guide_content_hash(response.text), guide_url=guide_url)
 
     return datasets, parameters
 
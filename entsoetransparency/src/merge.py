@@ -0,0 +1,112 @@
+# Merge of equal rows in response DataFrame, linear in row count.
+# Rows equal in all columns except extends are grouped on hashed key columns, extends are combined per group.
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+PERIOD_TIMEFORMAT = '%Y-%m-%dT%H:%MZ'
+
+# Hashable stand-in for missing values, so missing values are equal when grouping.
+_MISSING = ('__missing__',)
+
+
+def _hashable(value):
+    '''Returns value as hashable, lists and arrays as tuples.'''
+    if isinstance(value, (list, np.ndarray)):
+        return tuple(_hashable(x) for x in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return _MISSING
+    return value
+
+
+def _unwrap(value):
+    '''Returns first value of list, value itself if not list.'''
+    if isinstance(value, list):
+        return value[0] if len(value) > 0 else None
+    return value
+
+
+def group_equal_rows(df, columns):
+    '''Returns array of group number of each row, rows with equal values in columns get same group. Groups numbered in order of first row.'''
+
+    if len(columns) == 0:
+        return np.zeros(len(df), dtype=np.int64)
+
+    # Factorize each column on hashable values, missing values are equal.
+    codes = {}
+    for column in columns:
+        values = pd.Series([_hashable(x) for x in df[column]], dtype=object)
+        codes[column] = pd.factorize(values)[0]
+
+    return pd.DataFrame(codes).groupby(list(columns), sort=False).ngroup().values
+
+
+def _combine(values, group_idx):
+    '''Returns values of group concatenated, arrays as array, others as list.'''
+
+    cells = [values[i] for i in group_idx]
+    if all(isinstance(x, np.ndarray) for x in cells):
+        return np.concatenate(cells)
+
+    return list(itertools.chain.from_iterable(x if isinstance(x, list) else [x] for x in cells))
+
+
+def merge_extend_equal_rows(o_df, extends=['quantity', 'start', 'end']):
+    '''
+    Combines rows equal in all columns except extends, in order of first row.
+    Of extends, start columns keep earliest start, end columns keep latest end, others are concatenated.
+    '''
+
+    # Keep extends that exist in o_df.columns.
+    extends = [e for e in extends if e in o_df.columns]
+
+    # If list is now empty, return original df.
+    if len(extends) == 0 or len(o_df) == 0:
+        return o_df
+
+    o_df = o_df.reset_index(drop=True)
+    keys = [x for x in o_df.columns if x not in extends]
+
+    # Group equal rows, first row of each group is kept.
+    group = group_equal_rows(o_df, keys)
+    n_groups = group.max() + 1
+    first = np.full(n_groups, len(o_df), dtype=np.int64)
+    np.minimum.at(first, group, np.arange(len(o_df)))
+
+    # Row indexes of each group, groups of single rows are kept as is.
+    order = np.argsort(group, kind='stable')
+    counts = np.bincount(group, minlength=n_groups)
+    groups_idx = np.split(order, np.cumsum(counts)[:-1])
+    merged = np.flatnonzero(counts > 1)
+
+    n_df = o_df.take(first).reset_index(drop=True)
+
+    for exd in extends:
+        values = o_df[exd].values
+        column = np.empty(len(n_df), dtype=object)
+        for g, value in enumerate(n_df[exd].values):
+            column[g] = value
+
+        # Start and end, earliest start and latest end of group.
+        if 'start' in exd or 'end' in exd:
+            times = pd.to_datetime(pd.Series([_unwrap(x) for x in values], dtype=object), format=PERIOD_TIMEFORMAT, errors='coerce')
+            times = times.fillna(pd.Timestamp.max if 'start' in exd else pd.Timestamp.min).values
+            for g in merged:
+                idx = groups_idx[g]
+                pick = idx[np.argmin(times[idx])] if 'start' in exd else idx[np.argmax(times[idx])]
+                column[g] = _unwrap(values[pick])
+
+        # Else, concatenate values of group.
+        else:
+            for g in merged:
+                column[g] = _combine(values, groups_idx[g])
+
+        n_df[exd] = column
+
+    # Return merged new df.
+    return n_df
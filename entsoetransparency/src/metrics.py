@@ -0,0 +1,214 @@
+# Metrics of request pipeline stages: counters, latency histograms and span callbacks.
+# Exported in Prometheus text format, spans are sent to callbacks as OpenTelemetry-style start and end events.
+
+import contextlib
+import threading
+import time
+
+
+PREFIX = 'entsoetransparency'
+
+# Upper bounds in seconds of latency histogram buckets.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30., 60., 300.)
+
+HELP = {
+    'stage_seconds': 'Seconds spent in each pipeline stage.',
+    'stage_errors_total': 'Pipeline stages ended by an exception.',
+    'http_responses_total': 'Api responses by http status.',
+    'http_errors_total': 'Api calls failed by connection errors and timeouts.',
+    'retries_total': 'Api calls retried.',
+    'requests_failed_total': 'Requests failed after all retries.',
+    'bytes_downloaded_total': 'Bytes of api response bodies.',
+    'responses_total': 'Parsed responses by kind, xml, zip or reason.',
+    'points_parsed_total': 'Points parsed from responses.',
+    'cache_hits_total': 'Responses served from response cache.',
+    'cache_misses_total': 'Response cache lookups without cached response.',
+    }
+
+
+class Span():
+    '''
+    Timed pipeline stage, passed to span callbacks when started and ended.
+    Times are epoch seconds, like OpenTelemetry spans in nanoseconds.
+    '''
+
+    __slots__ = ['name', 'attributes', 'start_time', 'end_time', 'status', 'error']
+
+    def __init__(self, name, attributes=None, start_time=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time() if start_time is None else start_time
+        self.end_time = None
+        self.status = 'ok'
+        self.error = None
+
+    @property
+    def duration(self):
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __repr__(self):
+        return f'Span({self.name!r}, {self.attributes}, duration={self.duration}, status={self.status!r})'
+
+
+def _labels_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if len(items) == 0:
+        return ''
+    escaped = [(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in items]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+class Metrics():
+    '''
+    Thread-safe counters and latency histograms of pipeline stages, shared by all requests of a client.
+
+    :Inputs:
+        -buckets: Upper bounds in seconds of latency histogram buckets.
+        -prefix: Prefix of exported metric names.
+    '''
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix=PREFIX):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._callbacks = []
+
+    def add_span_callback(self, callback):
+        '''Adds callback(event, span) called with event "start" and "end" of each stage span.'''
+        self._callbacks.append(callback)
+
+    def remove_span_callback(self, callback):
+        self._callbacks.remove(callback)
+
+    def _notify(self, event, span):
+        for callback in list(self._callbacks):
+            callback(event, span)
+
+    def inc(self, name, value=1, **labels):
+        '''Adds value to counter name with labels.'''
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        '''Adds observation value to histogram name with labels.'''
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0., 0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][idx] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextlib.contextmanager
+    def stage(self, name, **attributes):
+        '''Context manager timing stage name into stage_seconds histogram, yields span sent to span callbacks.'''
+
+        span = Span(name, attributes)
+        self._notify('start', span)
+        t0 = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status, span.error = 'error', repr(e)
+            self.inc('stage_errors_total', stage=name)
+            raise
+        finally:
+            seconds = time.perf_counter() - t0
+            span.end_time = span.start_time + seconds
+            self.observe('stage_seconds', seconds, stage=name)
+            self._notify('end', span)
+
+    def record_stage(self, name, seconds, end_time=None, **attributes):
+        '''Records stage timed elsewhere, ex. time to first byte of response, as if timed by stage().'''
+
+        end_time = time.time() if end_time is None else end_time
+        span = Span(name, attributes, start_time=end_time - seconds)
+        self._notify('start', span)
+        span.end_time = end_time
+        self.observe('stage_seconds', seconds, stage=name)
+        self._notify('end', span)
+
+    def value(self, name, **labels):
+        '''Returns counter value, or histogram count, of name with labels. 0 if not recorded.'''
+        key = (name, _labels_key(labels))
+        with self._lock:
+            if key in self._histograms:
+                return self._histograms[key][2]
+            return self._counters.get(key, 0)
+
+    def summary(self):
+        '''Returns dict of stage to count, total and mean seconds, sorted by total seconds.'''
+
+        with self._lock:
+            stages = {dict(labels)['stage']: (h[2], h[1]) for (name, labels), h in self._histograms.items() if name == 'stage_seconds'}
+
+        ordered = sorted(stages.items(), key=lambda x: -x[1][1])
+        return {stage: {'count': count, 'seconds': total, 'mean': total / count} for stage, (count, total) in ordered}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_prometheus(self):
+        '''Returns all metrics in Prometheus text exposition format.'''
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, (list(h[0]), h[1], h[2])) for k, h in self._histograms.items())
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# HELP {self.prefix}_{name} {HELP.get(name, name)}')
+                lines.append(f'# TYPE {self.prefix}_{name} {kind}')
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f'{self.prefix}_{name}{_format_labels(labels)} {value}')
+
+        for (name, labels), (counts, total, count) in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.prefix}_{name}_bucket{_format_labels(labels, [("le", repr(float(bound)))])} {cumulative}')
+            lines.append(f'{self.prefix}_{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{self.prefix}_{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{self.prefix}_{name}_count{_format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def opentelemetry_callback(tracer):
+    '''
+    Returns span callback exporting ended spans to opentelemetry tracer, ex. trace.get_tracer(__name__).
+    Spans are exported when ended, with their start and end times.
+    '''
+
+    def callback(event, span):
+        if event != 'end':
+            return
+        otel_span = tracer.start_span(span.name, start_time=int(span.start_time * 1e9), attributes={k: str(v) for k, v in span.attributes.items()})
+        if span.error is not None:
+            otel_span.set_attribute('error', span.error)
+        otel_span.end(end_time=int(span.end_time * 1e9))
+
+    return callback
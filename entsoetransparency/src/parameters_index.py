@@ -0,0 +1,158 @@
+# Precomputed lookup index of the api guide parameters (codes and meanings).
+# Response data is remapped with exact dict lookups, fuzzy matching is only used on user inputs and is memoized.
+
+import difflib
+import functools
+
+
+# Max number of memoized fuzzy matches of user inputs.
+FUZZY_CACHE_SIZE = 1024
+
+
+def normalize_parameter_type(parameter_type):
+    '''Returns parameter type name as found in response tag names, ex. "Contract_MarketAgreement.Type" -> "contract_marketagreementtype".'''
+    return parameter_type.lower().replace('.', '').replace('_', '')
+
+
+class ParametersIndex():
+    '''
+    Index of api guide parameters, built once from client.parameters.
+
+    :Indexes:
+        -codes: {parameter_type: {code_lower: meaning}}
+        -meanings: {parameter_type: {meaning_lower: code}}
+        -normalized_types: {normalized parameter_type: parameter_type}, last parameter type is indexed as "domain".
+        -tag_types: {tag_name: (parameter_type, ...)}, filled on first lookup of each tag name.
+    '''
+
+    def __init__(self, parameters, fuzzy_cache_size=FUZZY_CACHE_SIZE):
+        self.parameters = parameters
+
+        # Lists of parameter types in original and lowered form, used for fuzzy matching.
+        self.types_list = list(parameters.keys())
+        self.types_list_lower = [each_string.lower() for each_string in self.types_list]
+
+        # Exact code->meaning and meaning->code dicts per parameter type.
+        self.codes = {}
+        self.meanings = {}
+        for paratype, codes_meanings in parameters.items():
+            self.codes[paratype] = {}
+            self.meanings[paratype] = {}
+            for code, meaning in codes_meanings.items():
+                self.codes[paratype].setdefault(str(code).lower(), meaning)
+                self.meanings[paratype].setdefault(str(meaning).lower(), code)
+
+        # Normalized parameter type names as found in tag names. Areas (last type) are found in tags named "*domain*".
+        normalized = [normalize_parameter_type(x) for x in self.types_list]
+        if len(normalized) > 0:
+            normalized[-1] = 'domain'
+        self.normalized_types = dict(zip(normalized, self.types_list))
+
+        # Tag name to parameter types, filled on lookup.
+        self.tag_types = {}
+
+        # Memoized fuzzy matching of user inputs.
+        self.find_type_match = functools.lru_cache(maxsize=fuzzy_cache_size)(self._find_type_match)
+        self.find_match = functools.lru_cache(maxsize=fuzzy_cache_size)(self._find_match)
+
+    def types_for_tag(self, tag_name):
+        '''Returns tuple of parameter types whose normalized name is part of tag_name.'''
+
+        types = self.tag_types.get(tag_name)
+        if types is None:
+            types = tuple(paratype for name, paratype in self.normalized_types.items() if name in tag_name)
+            self.tag_types[tag_name] = types
+
+        return types
+
+    def remap(self, code, tag_name):
+        '''Returns meaning of response code in tag_name, or code if not found.'''
+
+        if code is None:
+            return code
+
+        # Last matching parameter type takes precedence.
+        code_lower = code.lower()
+        for paratype in reversed(self.types_for_tag(tag_name)):
+            meaning = self.codes[paratype].get(code_lower)
+            if meaning is not None:
+                return meaning
+
+        return code
+
+    def _find_type_match(self, parameter_type, n_matches=1, accuracy_matches=0.4):
+        '''Finds closest match in available parameters types.'''
+
+        # Exact match.
+        parameter_type_lower = parameter_type.lower()
+        if parameter_type_lower in self.types_list_lower:
+            return self.types_list[self.types_list_lower.index(parameter_type_lower)]
+
+        # Make search for match in available parameter types.
+        match = difflib.get_close_matches(parameter_type_lower, self.types_list_lower, n=n_matches, cutoff=accuracy_matches)
+
+        # If match: return single match or list of multiple matches, else: return None
+        if len(match) == 1:
+            return self.types_list[self.types_list_lower.index(match[0])]
+        elif len(match) > 1:
+            return match
+        else:
+            return None
+
+    def _find_match(self, parameter, parameter_type, n_matches=1, accuracy_matches=0.9):
+        '''
+        Finds closest match in available parameters.
+
+        Input: parameter, parameter_type
+        Output: matched_parameter_value, matched_parameter_code
+        '''
+
+        # Initially search for match on existance of spesified parameter type.
+        parameter_type_match = self.find_type_match(parameter_type)
+
+        # If not found match on spesified parameter type.
+        if parameter_type_match is None or isinstance(parameter_type_match, list):
+            return None, None
+
+        parameter_lower = parameter.lower()
+        meanings = self.meanings[parameter_type_match]
+        codes = self.codes[parameter_type_match]
+
+        # Exact match on meaning or code.
+        if parameter_lower in meanings:
+            code = meanings[parameter_lower]
+            return self.parameters[parameter_type_match][code], code
+        if parameter_lower in codes:
+            code = self._original_code(parameter_type_match, parameter_lower)
+            return codes[parameter_lower], code
+
+        # Make search for match in parameter values.
+        match = difflib.get_close_matches(parameter_lower, list(meanings.keys()), n=n_matches, cutoff=accuracy_matches)
+
+        # If not loose match on string, check if whole parameter word in string.
+        if len(match) < 1:
+            match = [value for value in meanings.keys() if parameter_lower in value.replace(",", "").split(" ")]
+
+        # If match is found in parameter type values, return matched value and code.
+        if len(match) == 1:
+            code = meanings[match[0]]
+            return self.parameters[parameter_type_match][code], code
+
+        # If not found match in values, search for match in codes.
+        match = difflib.get_close_matches(parameter_lower, list(codes.keys()), n=n_matches, cutoff=accuracy_matches)
+        if len(match) == 1:
+            return codes[match[0]], self._original_code(parameter_type_match, match[0])
+
+        # If no match found in either parameter type values or codes.
+        return None, None
+
+    def _original_code(self, parameter_type, code_lower):
+        '''Returns code in original form from lowered code.'''
+        for code in self.parameters[parameter_type].keys():
+            if code.lower() == code_lower:
+                return code
+        return None
+
+    def cache_info(self):
+        '''Returns lru cache info of fuzzy matching of parameter types and parameters.'''
+        return {'find_type_match': self.find_type_match.cache_info(), 'find_match': self.find_match.cache_info()}
@@ -0,0 +1,163 @@
+# Partitioned Parquet sink of long format results, typed columns instead of lists in object cells.
+# Files are written under root/dataset=.../area=.../month=YYYY-MM/, each write adds new files atomically.
+
+import os
+import urllib.parse
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .timeseries import is_value_column
+
+
+PARTITION_COLUMNS = ['dataset', 'area', 'month']
+
+# Integer columns, and columns dropped as only meaningful for bad responses. Point value columns (see is_value_column()) are float.
+INTEGER_COLUMNS = ['position']
+DROPPED_COLUMNS = ['success', 'reason']
+
+
+def area_column(columns):
+    '''Returns name of area column of long format df, first in domain column, None if without domain columns.'''
+    domains = [x for x in columns if 'domain' in x.lower()]
+    for prefix in ['in', 'biddingzone', 'controlarea', 'area', '']:
+        for column in domains:
+            if column.lower().startswith(prefix):
+                return column
+    return None
+
+
+def _partition_dir(root, values):
+    '''Returns hive style partition directory of partition values, values uri encoded.'''
+    parts = [f'{name}={urllib.parse.quote(str(value), safe="")}' for name, value in zip(PARTITION_COLUMNS, values)]
+    return os.path.join(root, *parts)
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.HivePartitioning(pa.schema([(x, pa.string()) for x in PARTITION_COLUMNS]), segment_encoding='uri')
+
+
+def to_arrow(long_df):
+    '''
+    Returns pyarrow Table of long format df (as .get_data(long=True)), with typed columns:
+    timestamp[ns, UTC], float64 values, int32 positions and dictionary-encoded strings of all other columns.
+    '''
+    import pyarrow as pa
+
+    arrays = {'timestamp': pa.array(long_df.index.tz_convert('UTC'), type=pa.timestamp('ns', tz='UTC'))}
+    for column in long_df.columns:
+        if column in DROPPED_COLUMNS:
+            continue
+
+        values = long_df[column]
+        if is_value_column(column):
+            arrays[column] = pa.array(pd.to_numeric(values, errors='coerce').values, type=pa.float64())
+        elif column in INTEGER_COLUMNS:
+            arrays[column] = pa.array(values.values, type=pa.int32())
+        else:
+            strings = [None if x is None or (isinstance(x, float) and np.isnan(x)) else str(x) for x in values]
+            arrays[column] = pa.array(strings, type=pa.string()).dictionary_encode()
+
+    return pa.table(arrays)
+
+
+class ParquetSink():
+    '''
+    Parquet dataset of long format results, partitioned by dataset, area and year-month of timestamp.
+
+    :Inputs:
+        -root: Dataset directory, shared by concurrent writers.
+        -compression: Parquet compression codec.
+    '''
+
+    def __init__(self, root, compression='zstd'):
+        self.root = root
+        self.compression = compression
+
+    def write(self, long_df):
+        '''Appends long format df to dataset, one new file per partition. Returns list of written paths.'''
+        import pyarrow.parquet as pq
+
+        if len(long_df) == 0:
+            return []
+
+        # Partition values of each point.
+        column = area_column(long_df.columns)
+        area = long_df[column].astype(str).values if column is not None else np.full(len(long_df), '')
+        month = long_df.index.tz_convert('UTC').strftime('%Y-%m')
+        dataset = long_df['dataset'].astype(str).values if 'dataset' in long_df.columns else np.full(len(long_df), '')
+
+        frame = long_df.drop(columns=[x for x in ['dataset'] if x in long_df.columns])
+        keys = pd.DataFrame({'dataset': dataset, 'area': area, 'month': month})
+
+        paths = []
+        for values, idx in keys.groupby(PARTITION_COLUMNS, sort=True).indices.items():
+            table = to_arrow(frame.iloc[np.sort(idx)])
+
+            # Written to hidden temp file then renamed, readers never see partial files and writers never collide.
+            directory = _partition_dir(self.root, values)
+            os.makedirs(directory, exist_ok=True)
+            name = f'part-{uuid.uuid4().hex}.parquet'
+            tmp_path = os.path.join(directory, f'.{name}.tmp')
+            pq.write_table(table, tmp_path, compression=self.compression)
+            os.replace(tmp_path, os.path.join(directory, name))
+            paths.append(os.path.join(directory, name))
+
+        return paths
+
+    def dataset(self):
+        '''Returns pyarrow dataset of all written files, with schema unified over files.'''
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self.root, format='parquet', partitioning=_partitioning())
+        schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+        if len(schemas) > 1:
+            schema = pa.unify_schemas(schemas + [_partitioning().schema])
+            dataset = ds.dataset(self.root, format='parquet', partitioning=_partitioning(), schema=schema)
+
+        return dataset
+
+    def read(self, dataset=None, areas=None, start=None, end=None, columns=None):
+        '''
+        Returns points as long format df indexed by timestamp, filtered on dataset, areas and [start, end) before reading.
+        Partitions of other datasets, areas and months are skipped, row groups outside start and end are skipped on statistics.
+        '''
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(self.root):
+            return pd.DataFrame()
+
+        expression = None
+
+        def add(condition):
+            nonlocal expression
+            expression = condition if expression is None else expression & condition
+
+        if dataset is not None:
+            add(ds.field('dataset') == dataset)
+        if areas is not None:
+            add(ds.field('area').isin([areas] if isinstance(areas, str) else list(areas)))
+        if start is not None:
+            start = pd.Timestamp(start, tz='UTC') if pd.Timestamp(start).tzinfo is None else pd.Timestamp(start).tz_convert('UTC')
+            add(ds.field('month') >= start.strftime('%Y-%m'))
+            add(ds.field('timestamp') >= pa.scalar(start.value, type=pa.timestamp('ns', tz='UTC')))
+        if end is not None:
+            end = pd.Timestamp(end, tz='UTC') if pd.Timestamp(end).tzinfo is None else pd.Timestamp(end).tz_convert('UTC')
+            add(ds.field('month') <= end.strftime('%Y-%m'))
+            add(ds.field('timestamp') < pa.scalar(end.value, type=pa.timestamp('ns', tz='UTC')))
+
+        if columns is not None and 'timestamp' not in columns:
+            columns = ['timestamp'] + list(columns)
+
+        table = self.dataset().to_table(filter=expression, columns=columns)
+        df = table.to_pandas()
+        if len(df) == 0:
+            return df
+
+        return df.set_index('timestamp').sort_index(kind='stable')
@@ -1,4 +1,326 @@
-# XML parser from 
+# XML parser from
 # ref url: https://transparency.entsoe.eu/content/static_content/download?path=/Static%20content/knowledge%20base/entso-e-transparency-xml-schema-use-1-0.pdf
 
+# Streaming, namespace-aware parser of entso-e api response documents, built on lxml.etree.iterparse.
+# Parses response bytes in one pass, and clears each TimeSeries when parsed so memory stays flat.
 
+import heapq
+import io
+import re
+
+from .timeseries import VALUE_COLUMNS
+
+
+# Default names searched for in document header and in TimeSeries tag names.
+DOCNAMES = ['type', 'created', 'domain']
+TAGSNAMES = ['domain', 'resource', 'type', 'start', 'end', 'resolution', 'quantity', 'amount', 'name', 'voltage', 'nominalp', 'position']
+
+# Tags with one value per point, repeated values are kept. Any other child of a Point element is a point tag too.
+POINT_TAGS = ['position'] + VALUE_COLUMNS
+POINT_ELEMENT = 'point'
+
+# Magic bytes of zip archives, local file header or empty archive.
+ZIP_MAGICS = (b'PK\x03\x04', b'PK\x05\x06')
+
+# Bytes of response searched for root element, before any parse.
+SNIFF_BYTES = 4096
+
+# Root element of bad responses, with reason code and text.
+ACKNOWLEDGEMENT_ROOT = 'acknowledgement_marketdocument'
+
+# Xml declaration, processing instructions, comments and doctype before root element, and root element name.
+_PROLOG_REGEX = re.compile(rb'\s*(?:<\?.*?\?>|<!--.*?-->|<!DOCTYPE[^>\[]*(?:\[.*?\])?\s*>)', re.DOTALL | re.IGNORECASE)
+_ROOT_REGEX = re.compile(rb'\s*<(?:[A-Za-z_][\w.\-]*:)?([A-Za-z_][\w.\-]*)')
+
+
+def local_name(tag):
+    '''Returns lowered tag name without namespace, ex. "{urn:...}inBiddingZone_Domain.mRID" -> "inbiddingzone_domain.mrid".'''
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def element_string(elem):
+    '''Returns text of element like bs4 tag.string, None if element has mixed or multiple children.'''
+
+    # Leaf element, its text.
+    if len(elem) == 0:
+        return elem.text
+
+    # Element with single child and no text around it, the child's string.
+    if len(elem) == 1 and elem.text is None and elem[0].tail is None:
+        return element_string(elem[0])
+
+    return None
+
+
+def response_root(content, n_bytes=SNIFF_BYTES):
+    '''Returns lowered local name of root element of xml bytes, searched in first n_bytes only. None if not found.'''
+
+    head = bytes(content[:n_bytes])
+    pos = 3 if head.startswith(b'\xef\xbb\xbf') else 0
+
+    # Skip prolog before root element.
+    match = _PROLOG_REGEX.match(head, pos)
+    while match is not None:
+        pos = match.end()
+        match = _PROLOG_REGEX.match(head, pos)
+
+    match = _ROOT_REGEX.match(head, pos)
+    return None if match is None else match.group(1).decode('ascii').lower()
+
+
+def classify_response(content):
+    '''
+    Classify response body from its first bytes, without parsing or decoding it.
+
+    :Outputs:
+        -kind: "zip" (archive of documents), "acknowledgement" (bad response with reason), "document" (*_MarketDocument)
+               or "unknown" (empty, not xml, or other root element, ex. html error page).
+        -root: Lowered local name of root element, None if zip or not xml.
+    '''
+
+    if bytes(content[:4]) in ZIP_MAGICS:
+        return 'zip', None
+
+    root = response_root(content)
+    if root == ACKNOWLEDGEMENT_ROOT:
+        return 'acknowledgement', root
+    if root is not None and root.endswith('_marketdocument'):
+        return 'document', root
+
+    return 'unknown', root
+
+
+def parse_acknowledgement(source):
+    '''Returns reason text of acknowledgement document, reason code if without text, None if without reason or not xml.'''
+    from lxml import etree
+
+    try:
+        root = etree.fromstring(bytes(source))
+    except etree.XMLSyntaxError:
+        return None
+
+    for tag in ['{*}text', '{*}code']:
+        for elem in root.iter(tag):
+            string = element_string(elem)
+            if string is not None:
+                return string
+
+    return None
+
+
+def parse_response_records(source, remap=None, docnames=DOCNAMES, tagsnames=TAGSNAMES, remap_tag=None):
+    '''
+    Parse entso-e api response document into records, one per TimeSeries Period.
+
+    :Inputs:
+        -source: Response xml as bytes, str or file-like object.
+        -remap: Function(code, tag_name) returning meaning of code, defaults to no remapping.
+        -docnames: Names searched for in sequence from document start, stored in all records.
+        -tagsnames: Names searched for in TimeSeries tag names, values stored as lists.
+        -remap_tag: Function(tag_name) returning False if values of tag_name are never remapped, defaults to remap all.
+
+    :Outputs:
+        -records: List of dicts, one per Period of each TimeSeries (one per TimeSeries if without Periods).
+        -reason: Reason text if response is a bad response with reason, else None.
+    '''
+    from lxml import etree
+
+    if remap is None:
+        remap = lambda code, name: code
+
+    # Ensure file-like bytes source.
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    state = _ParseState(remap, docnames, tagsnames, remap_tag)
+    ts_records = []
+    parent = None
+
+    try:
+        # Only TimeSeries ends are reported, each TimeSeries is then walked in document order.
+        context = etree.iterparse(source, events=('end',), tag='{*}TimeSeries', remove_comments=True, remove_pis=True)
+        for _, ts in context:
+
+            # Ancestors of first TimeSeries, in document order.
+            if parent is None:
+                for ancestor in reversed(list(ts.iterancestors())):
+                    state.visit(ancestor)
+
+            # Elements before TimeSeries not yet walked, earlier ones are removed.
+            parent = ts.getparent()
+            for child in parent:
+                if child is ts:
+                    break
+                for elem in child.iter():
+                    state.visit(elem)
+
+            # TimeSeries records.
+            ts_records.extend(state.timeseries_records(ts))
+
+            # Remove parsed TimeSeries and its preceding siblings.
+            while ts.getprevious() is not None:
+                del parent[0]
+            parent.remove(ts)
+
+        # Elements after last TimeSeries, or whole document if without TimeSeries.
+        if parent is None:
+            for elem in context.root.iter():
+                state.visit(elem)
+        else:
+            for child in parent:
+                for elem in child.iter():
+                    state.visit(elem)
+
+    # Not xml, nothing to parse.
+    except etree.XMLSyntaxError:
+        return [], None
+
+    # If bad response with reason.
+    if state.has_reason and state.reason_text is not None:
+        return [], state.reason_text
+
+    # Add document data to all records.
+    records = []
+    for d in ts_records:
+        a = state.docdict.copy()
+        for key, val in d.items():
+            a[key] = val
+        records.append(a)
+
+    return records, None
+
+
+class _ParseState():
+    '''Document data, bad response reason and memoized tag name lookups of a document being parsed.'''
+
+    def __init__(self, remap, docnames, tagsnames, remap_tag):
+        self.remap = remap
+        self.remap_tag = remap_tag
+        self.docnames_regex = [re.compile(x) for x in docnames]
+        self.tagsnames_regex = [re.compile(x) for x in tagsnames]
+
+        # Document data, found in sequence like bs4 find_next.
+        self.docdict = {}
+
+        # Root element name, and bad response reason flags. Reasons are only read in acknowledgement documents,
+        # market documents (outages, unavailability) carry a Reason in each TimeSeries.
+        self.root = None
+        self.has_reason = False
+        self.reason_text = None
+
+        # Local name of each tag, and of each name the matched tagsnames indexes and if values are remapped.
+        self.names = {}
+        self.name_matches = {}
+        self.name_remaps = {}
+
+        # Names of tags found as children of Point elements, with one value per point.
+        self.point_names = set(POINT_TAGS)
+
+    def name(self, tag):
+        '''Returns memoized local name of tag.'''
+        name = self.names.get(tag)
+        if name is None:
+            name = self.names[tag] = local_name(tag)
+        return name
+
+    def matches(self, name):
+        '''Returns memoized indexes of tagsnames found in name.'''
+        matches = self.name_matches.get(name)
+        if matches is None:
+            matches = self.name_matches[name] = [idx for idx, regex in enumerate(self.tagsnames_regex) if regex.search(name)]
+            self.name_remaps[name] = self.remap_tag is None or bool(self.remap_tag(name))
+        return matches
+
+    def visit(self, elem, name=None):
+        '''Search element for next document data and bad response reason, elements must be visited in document order.'''
+
+        if not isinstance(elem.tag, str):
+            return
+        if name is None:
+            name = self.name(elem.tag)
+        if self.root is None:
+            self.root = name
+
+        # Search for next document data name.
+        doc_idx = len(self.docdict)
+        if doc_idx < len(self.docnames_regex) and self.docnames_regex[doc_idx].search(name):
+            self.docdict[name] = self.remap(element_string(elem), name)
+
+        # Bad response reason and text.
+        if self.root != ACKNOWLEDGEMENT_ROOT:
+            return
+        if name == 'reason':
+            self.has_reason = True
+        elif name == 'text' and self.reason_text is None:
+            self.reason_text = element_string(elem)
+
+    def timeseries_records(self, ts):
+        '''Walk TimeSeries in document order, returns its records.'''
+
+        ts_buckets = [[] for _ in self.tagsnames_regex]
+        period_buckets = []
+        buckets = ts_buckets
+
+        order = 0
+        for elem in ts.iter():
+            if elem is ts or not isinstance(elem.tag, str):
+                continue
+            order += 1
+            name = self.name(elem.tag)
+            self.visit(elem, name)
+
+            # Children of TimeSeries start a Period, or are TimeSeries tags.
+            if elem.getparent() is ts:
+                if name.endswith('period'):
+                    buckets = [[] for _ in self.tagsnames_regex]
+                    period_buckets.append(buckets)
+                else:
+                    buckets = ts_buckets
+
+            # Store tag in buckets of matched tagsnames.
+            string = element_string(elem)
+            if string is not None:
+                matches = self.matches(name)
+                if len(matches) > 0 and name not in self.point_names and self.name(elem.getparent().tag) == POINT_ELEMENT:
+                    self.point_names.add(name)
+                for idx in matches:
+                    buckets[idx].append((order, name, string))
+
+        return _timeseries_records(ts_buckets, period_buckets, self.remap, self.name_remaps, self.point_names)
+
+
+def _timeseries_records(ts_buckets, period_buckets, remap, name_remaps, point_names):
+    '''Returns list of record dicts of TimeSeries, one per Period. Values of point_names keep duplicates.'''
+
+    # TimeSeries without Periods is one record.
+    if len(period_buckets) == 0:
+        period_buckets = [[[] for _ in ts_buckets]]
+
+    records = []
+    for buckets in period_buckets:
+
+        # Tags by tagsnames, then in doc order of TimeSeries and Period tags.
+        d = {}
+        for ts_bucket, bucket in zip(ts_buckets, buckets):
+            tags = heapq.merge(ts_bucket, bucket) if len(ts_bucket) > 0 and len(bucket) > 0 else ts_bucket or bucket
+            for _, name, string in tags:
+
+                # If tag.name is not already in dict keys, add to keys with empty list.
+                values = d.get(name)
+                if values is None:
+                    values = d[name] = []
+
+                # Apply remapping.
+                meaning = remap(string, name) if name_remaps[name] else string
+
+                # If point data, allow duplicates, else append if not already in list.
+                if name in point_names:
+                    values.append(meaning)
+                elif string not in values:
+                    values.append(meaning)
+
+        records.append(d)
+
+    return records
@@ -0,0 +1,75 @@
+# Plan of get_data requests, compiled from inputs into deduplicated request units before any api call is made.
+# Estimates api calls and runtime of the plan at the rate limit of the client, so large requests can be checked in a dry run.
+
+import os
+
+import pandas as pd
+
+
+# Seconds of one api call, until measured by client metrics.
+DEFAULT_CALL_SECONDS = 1.
+
+
+def default_workers(max_workers):
+    '''Returns number of workers of thread pool of max_workers, pool default if None.'''
+    return max_workers if max_workers is not None else min(32, (os.cpu_count() or 1) + 4)
+
+
+def estimate_seconds(calls, rate_limiter=None, max_workers=1, call_seconds=DEFAULT_CALL_SECONDS):
+    '''
+    Returns estimated seconds of making calls, bound by rate limiter refill after its burst, or by call latency over workers.
+
+    :Inputs:
+        -rate_limiter: TokenBucket() or limiter with burst and rate (calls per second), not bound by rate if None.
+        -max_workers: Calls made in parallel.
+        -call_seconds: Seconds of one call, time to first byte and download.
+    '''
+
+    rate = getattr(rate_limiter, 'rate', None)
+    burst = getattr(rate_limiter, 'burst', 0)
+    rate_bound = max(calls - burst, 0) / rate if rate else 0.
+    latency_bound = calls * call_seconds / max(default_workers(max_workers), 1)
+
+    return max(rate_bound, latency_bound)
+
+
+class RequestPlan():
+    '''
+    Deduplicated request units of a .get_data() call, one api call each. Returned by .get_data(dry_run=True), made by .execute_plan().
+
+    :Inputs:
+        -tasks: Request units (dataset, mandatorys_dict, from_to_code, start_end_time), in request order.
+        -parameters: Url parameters of each task.
+        -duplicates: Planned units dropped, as same url parameters as a unit in tasks.
+        -coalesced: Input windows merged into overlapping or adjacent windows.
+        -cached: Indices of tasks with response in response cache, made without api call.
+        -rate_limiter, max_workers, call_seconds: As estimate_seconds(), of estimated_seconds.
+
+    :Outputs:
+        -calls: Api calls of plan. More calls are made only if a smaller window limit is learned, or requests are retried.
+        -estimated_seconds: Estimated seconds of making plan.
+    '''
+
+    def __init__(self, tasks, parameters, duplicates=0, coalesced=0, cached=(), rate_limiter=None, max_workers=1, call_seconds=DEFAULT_CALL_SECONDS):
+        self.tasks = list(tasks)
+        self.parameters = list(parameters)
+        self.duplicates = duplicates
+        self.coalesced = coalesced
+        self.cached = set(cached)
+        self.calls = len(self.tasks) - len(self.cached)
+        self.estimated_seconds = estimate_seconds(self.calls, rate_limiter, max_workers, call_seconds)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __repr__(self):
+        return (f'RequestPlan({len(self.tasks)} requests, {self.calls} api calls, {len(self.cached)} cached, {self.duplicates} duplicates removed, '
+                f'{self.coalesced} windows coalesced, estimated {self.estimated_seconds:.1f} s)')
+
+    def to_frame(self):
+        '''Returns df of one row per request, columns dataset, from_to, start, end and cached.'''
+        return pd.DataFrame([[task[0], tuple(task[2]), task[3][0], task[3][-1], idx in self.cached] for idx, task in enumerate(self.tasks)],
+                            columns=['dataset', 'from_to', 'start', 'end', 'cached'])
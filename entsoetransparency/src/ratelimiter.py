@@ -0,0 +1,182 @@
+# Rate limiters of api calls, shared by all threads making calls from a client, or by all processes on a host.
+# Entso-e api allows max 400 calls pr minute, exceeding gives a 10 min ban.
+
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+# State file of host-wide rate limit budget, shared by all processes using it.
+DEFAULT_RATELIMIT_PATH = os.path.join(tempfile.gettempdir(), 'entsoetransparency-ratelimit.json')
+
+
+def _take_token(tokens, updated, now, burst, rate):
+    '''Refills tokens since updated and takes one. Returns tokens left (negative for waiting callers) and seconds to wait.'''
+
+    tokens = min(burst, tokens + max(now - updated, 0.) * rate) - 1
+
+    # Enough tokens, no wait, else wait until refilled to this callers token.
+    if tokens >= 0:
+        return tokens, 0.
+    return tokens, -tokens / rate
+
+
+class TokenBucket():
+    '''
+    Thread-safe token bucket, acquire() sleeps and acquire_async() awaits until a call is allowed instead of raising.
+
+    :Inputs:
+        -calls: Max calls in any period.
+        -period: Seconds of period.
+        -burst: Calls allowed back-to-back before calls are spaced out. Refill rate is (calls - burst) / period,
+                so burst and refill together never exceed calls in any period.
+    '''
+
+    def __init__(self, calls=399, period=60, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if not 0 < burst < calls:
+            raise ValueError(f'burst must be between 0 and calls, got burst={burst}, calls={calls}')
+
+        self.calls = calls
+        self.period = period
+        self.burst = burst
+        self.rate = (calls - burst) / period
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+        # Times calls were let through, for utilisation.
+        self._log = collections.deque()
+
+    def _reserve(self):
+        '''Takes one token, returns seconds to wait before it may be used.'''
+
+        with self._lock:
+            now = self._clock()
+            self._tokens, wait = _take_token(self._tokens, self._updated, now, self.burst, self.rate)
+            self._updated = now
+            self._log.append(now + wait)
+            while self._log[0] <= now - self.period:
+                self._log.popleft()
+
+        return wait
+
+    def _call_times(self):
+        '''Returns times calls are let through, past and reserved.'''
+        with self._lock:
+            return list(self._log)
+
+    def utilisation(self):
+        '''Returns calls let through in the last period as fraction of calls, above 1 if callers are waiting.'''
+        now = self._clock()
+        times = self._call_times()
+        return sum(1 for t in times if t > now - self.period) / self.calls
+
+    def acquire(self):
+        '''Blocks until a call is allowed, returns seconds waited. Callers are let through in order of arrival.'''
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        '''Awaits until a call is allowed without blocking event loop, returns seconds waited. Shares budget with acquire().'''
+        import asyncio
+
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FileTokenBucket(TokenBucket):
+    '''
+    Token bucket with state in a locked file, one budget shared by all processes on a host using the same path.
+
+    :Inputs:
+        -path: State file, created if missing.
+        -calls, period, burst: As TokenBucket. All processes sharing path should use the same values.
+    '''
+
+    def __init__(self, path=DEFAULT_RATELIMIT_PATH, calls=399, period=60, burst=1, sleep=time.sleep):
+        super().__init__(calls=calls, period=period, burst=burst, clock=time.time, sleep=sleep)
+        self.path = path
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dirname, exist_ok=True)
+
+    def _locked(self, update):
+        '''Runs update(state) on state of file holding file lock, writes state back and returns result of update.'''
+
+        # Thread lock first, file locks are not guaranteed to exclude threads of same process.
+        with self._lock:
+            with open(self.path, 'a+') as f:
+                _lock_file(f)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read())
+                    except ValueError:
+                        state = {}
+
+                    result = update(state)
+
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    _unlock_file(f)
+
+        return result
+
+    def _reserve(self):
+        '''Takes one token from file state, returns seconds to wait before it may be used.'''
+
+        def update(state):
+            now = self._clock()
+            tokens, wait = _take_token(state.get('tokens', float(self.burst)), state.get('updated', now), now, self.burst, self.rate)
+            state['tokens'] = tokens
+            state['updated'] = now
+            state['log'] = [t for t in state.get('log', []) if t > now - self.period] + [now + wait]
+            return wait
+
+        return self._locked(update)
+
+    def _call_times(self):
+        '''Returns times calls are let through by all processes, past and reserved.'''
+        return self._locked(lambda state: list(state.get('log', [])))
+
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock_file(f):
+        '''Blocks until exclusive lock on file.'''
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(f):
+        '''Blocks until exclusive lock on file.'''
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
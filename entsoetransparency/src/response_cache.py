@@ -0,0 +1,168 @@
+# On-disk cache of raw api response bodies, keyed by the request parameters.
+# Windows ended long ago are immutable and kept until evicted, recent windows are revised by the platform and expire.
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+# Cache database, next to the statics snapshot.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'entsoetransparency', 'responses.sqlite')
+
+# Parameters not part of the request content.
+IGNORED_PARAMETERS = ['securitytoken']
+
+
+def normalized_parameters(parameters_dict):
+    '''Returns request parameters as sorted list of (name, value), without security token.'''
+    return sorted((str(k), str(v)) for k, v in parameters_dict.items() if str(k).lower() not in IGNORED_PARAMETERS)
+
+
+def parameters_key(parameters_dict):
+    '''Returns sha256 hexdigest of normalized request parameters.'''
+    return hashlib.sha256(json.dumps(normalized_parameters(parameters_dict)).encode('utf-8')).hexdigest()
+
+
+def window_end(parameters_dict):
+    '''Returns end of requested window as utc datetime, None if not found in parameters.'''
+
+    end = None
+    for key, val in parameters_dict.items():
+        k = str(key).lower()
+        try:
+            if 'end' in k:
+                end = datetime.datetime.strptime(str(val), '%Y%m%d%H%M')
+            elif 'date' in k and end is None:
+                end = datetime.datetime.strptime(str(val), '%Y-%m-%d') + datetime.timedelta(days=1)
+        except ValueError:
+            continue
+
+    return end
+
+
+class ResponseCache():
+    '''
+    Size-bounded LRU cache of compressed raw response bodies (xml or zip), in a sqlite file shared by processes.
+
+    :Inputs:
+        -path: Sqlite cache file, created if missing.
+        -max_bytes: Max size of stored compressed bodies, least recently used are evicted beyond it.
+        -immutable_after_days: Windows ended more than this many days ago never expire.
+        -recent_ttl: Seconds before responses of more recent windows, or windows without end, expire.
+    '''
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=2**30, immutable_after_days=7, recent_ttl=60*60):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.immutable_after_days = immutable_after_days
+        self.recent_ttl = recent_ttl
+
+        # Counters of this cache object.
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, parameters TEXT, body BLOB, size INTEGER, stored REAL, accessed REAL, expires REAL)')
+            con.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+    def _connect(self):
+        '''Returns new connection, one per operation so cache is usable from any thread.'''
+        return sqlite3.connect(self.path, timeout=60)
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def expires(self, parameters_dict, now=None):
+        '''Returns time response of parameters expires, None if window is immutable.'''
+        now = time.time() if now is None else now
+
+        end = window_end(parameters_dict)
+        if end is not None:
+            age = datetime.datetime.fromtimestamp(now, datetime.timezone.utc).replace(tzinfo=None) - end
+            if age > datetime.timedelta(days=self.immutable_after_days):
+                return None
+
+        return now + self.recent_ttl
+
+    def get(self, parameters_dict):
+        '''Returns cached response body of parameters, None if missing or expired.'''
+
+        key = parameters_key(parameters_dict)
+        now = time.time()
+        with self._connect() as con:
+            row = con.execute('SELECT body, expires FROM responses WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                self._count('misses')
+                return None
+
+            body, expires = row
+            if expires is not None and expires < now:
+                con.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._count('expired')
+                self._count('misses')
+                return None
+
+            con.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+
+        self._count('hits')
+        return zlib.decompress(body)
+
+    def contains(self, parameters_dict):
+        '''Returns True if response of parameters is cached and not expired, without reading body or counting hits.'''
+
+        now = time.time()
+        with self._connect() as con:
+            row = con.execute('SELECT expires FROM responses WHERE key = ?', (parameters_key(parameters_dict),)).fetchone()
+
+        return row is not None and (row[0] is None or row[0] >= now)
+
+    def put(self, parameters_dict, content):
+        '''Stores response body of parameters, then evicts least recently used beyond max_bytes.'''
+
+        key = parameters_key(parameters_dict)
+        body = zlib.compress(content, 6)
+        now = time.time()
+        with self._connect() as con:
+            con.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (key, json.dumps(normalized_parameters(parameters_dict)), body, len(body), now, now, self.expires(parameters_dict, now)))
+            self._evict(con)
+
+    def _evict(self, con):
+        '''Deletes least recently used responses until stored size is within max_bytes.'''
+
+        total = con.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        keys = []
+        for key, size in con.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            if total <= self.max_bytes:
+                break
+            keys.append((key,))
+            total -= size
+
+        con.executemany('DELETE FROM responses WHERE key = ?', keys)
+        self._count('evictions', len(keys))
+
+    def clear(self):
+        '''Deletes all cached responses.'''
+        with self._connect() as con:
+            con.execute('DELETE FROM responses')
+
+    def stats(self):
+        '''Returns dict of hits, misses, expired and evictions counters, and stored entries and bytes.'''
+        with self._connect() as con:
+            entries, size = con.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+
+        return {'hits': self.hits, 'misses': self.misses, 'expired': self.expired, 'evictions': self.evictions, 'entries': entries, 'bytes': size}
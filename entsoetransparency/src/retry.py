@@ -0,0 +1,126 @@
+# Retry policy and circuit breaker of api calls.
+# Transient failures (429, 5xx, connection resets, timeouts) are retried with exponential backoff,
+# and all callers pause while the api is down.
+
+import email.utils
+import random
+import threading
+import time
+
+import requests
+
+
+# Exceptions of transient failures of requests calls, retried. Includes connections reset while the body is downloaded.
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)
+
+
+class RequestFailed(Exception):
+    '''Api call failed after all retries, or while circuit breaker is open.'''
+
+    def __init__(self, message, url=None, status=None, attempts=0):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+        self.attempts = attempts
+
+
+def retry_after_seconds(value, now=None):
+    '''Returns seconds of Retry-After header value, in seconds or as http date. None if not parsable.'''
+
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    now = time.time() if now is None else now
+    return max(date.timestamp() - now, 0.)
+
+
+class RetryPolicy():
+    '''
+    Exponential backoff with jitter between retries of failed api calls.
+
+    :Inputs:
+        -max_retries: Retries after first attempt.
+        -backoff: Seconds before first retry, doubled each retry.
+        -max_backoff: Max seconds between retries, also cap of Retry-After.
+        -jitter: Fraction of backoff randomized, spreads retries of parallel requests.
+        -retry_statuses: Http statuses retried, Retry-After is honored for 429 and 503.
+    '''
+
+    def __init__(self, max_retries=5, backoff=1., max_backoff=120., jitter=0.5, retry_statuses=(429, 500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+
+    def should_retry(self, status):
+        '''Returns True if response status is retried.'''
+        return status in self.retry_statuses
+
+    def delay(self, attempt, status=None, retry_after=None):
+        '''Returns seconds to wait before retry after attempt (0 is first attempt).'''
+
+        if status in (429, 503):
+            seconds = retry_after_seconds(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_backoff)
+
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+        return delay * (1 - self.jitter * random.random())
+
+
+class CircuitBreaker():
+    '''
+    Thread-safe circuit breaker shared by all callers of a client.
+    After failure_threshold failures in a row, the circuit opens and all callers wait reset_timeout before trying again.
+
+    :Inputs:
+        -failure_threshold: Failures in a row opening the circuit.
+        -reset_timeout: Seconds circuit stays open before a call is tried again.
+    '''
+
+    def __init__(self, failure_threshold=10, reset_timeout=60., clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened = None
+
+    @property
+    def state(self):
+        '''Returns "closed", "open" or "half-open".'''
+        with self._lock:
+            if self.opened is None:
+                return 'closed'
+            if self._clock() - self.opened < self.reset_timeout:
+                return 'open'
+            return 'half-open'
+
+    def wait_time(self):
+        '''Returns seconds caller must wait before call, 0 if circuit is closed or half-open.'''
+        with self._lock:
+            if self.opened is None:
+                return 0.
+            return max(self.opened + self.reset_timeout - self._clock(), 0.)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+
+    def record_failure(self):
+        '''Counts failure, opens circuit at threshold, reopens it if failing while half-open.'''
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened = self._clock()
@@ -0,0 +1,137 @@
+# Compact typed schema of long format results, instead of strings and lists in object columns.
+# Code columns are categoricals over a code table shared by all requests of a client, values are float and positions int32.
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .timeseries import PERIOD_TIMEFORMAT, is_value_column
+
+
+INTEGER_COLUMNS = ['position']
+BOOLEAN_COLUMNS = ['success']
+DATETIME_COLUMNS = ['start', 'end']
+FLOAT_DTYPES = ['float64', 'float32']
+
+
+def coerce_numeric(values):
+    '''Returns values as int64 (if all integral) or float64 Series if all non-missing values are numeric, else values unchanged.'''
+
+    numeric = pd.to_numeric(values, errors='coerce')
+    if (numeric.notna() != values.notna()).any():
+        return values
+
+    if numeric.notna().all() and np.array_equal(numeric, np.floor(numeric)):
+        return numeric.astype(np.int64)
+    return numeric.astype(np.float64)
+
+
+class CodeTable():
+    '''
+    Categories of code columns from client parameters, meanings and codes of parameter types matched on column name.
+    Values outside the parameters are added to the table when first typed, so categories of a column only grow.
+    Typed frames of all requests of a client concatenate as categoricals with .concat().
+    '''
+
+    def __init__(self, parameters_index):
+        self.parameters_index = parameters_index
+        self._categories = {}
+        self._known = {}
+        self._lock = threading.Lock()
+
+    def categories(self, column):
+        '''Returns list of categories of parameter types in column name, None if column is not a code column.'''
+
+        with self._lock:
+            if column not in self._categories:
+                types = self.parameters_index.types_for_tag(column.lower())
+                categories = None
+                if len(types) > 0:
+                    parameters = self.parameters_index.parameters
+                    categories = list(dict.fromkeys(str(x) for t in types for pair in parameters[t].items() for x in reversed(pair)))
+                self._categories[column] = categories
+                self._known[column] = set(categories) if categories is not None else None
+
+        return self._categories[column]
+
+    def dtype(self, column, values):
+        '''Returns CategoricalDtype of column values, values outside code table are first added to it. None if not a code column.'''
+
+        if self.categories(column) is None:
+            return None
+
+        with self._lock:
+            known = self._known[column]
+            extra = sorted(str(x) for x in pd.unique(values.dropna()) if str(x) not in known)
+            if len(extra) > 0:
+                self._categories[column] = self._categories[column] + extra
+                known.update(extra)
+            categories = self._categories[column]
+
+        return pd.CategoricalDtype(categories)
+
+    def concat(self, frames):
+        '''
+        Returns typed frames concatenated, categorical columns kept categorical.
+        Code columns get the current categories of the table, a superset of categories of frames typed before, other categoricals the union of categories.
+        '''
+
+        frames = list(frames)
+        columns = list(dict.fromkeys(c for df in frames for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)))
+
+        for column in columns:
+            categories = self.categories(column)
+            if categories is None:
+                categories = list(dict.fromkeys(x for df in frames if column in df.columns for x in pd.unique(df[column].dropna())))
+            dtype = pd.CategoricalDtype(categories)
+            frames = [df.astype({column: dtype}) if column in df.columns else df for df in frames]
+
+        return pd.concat(frames)
+
+
+def typed_frame(long_df, code_table=None, float_dtype='float64'):
+    '''
+    Returns long format df (as .get_data(long=True)) with compact typed columns.
+
+    :Inputs:
+        -code_table: CodeTable() of code column categories, categories inferred from values of each frame if None.
+        -float_dtype: "float64" or "float32" of value columns.
+
+    :Outputs:
+        -df: Value columns float_dtype, position int32, success bool, start and end datetime64[ns, UTC], other columns category,
+             columns of unhashable values left as object. Index datetime64[ns, UTC].
+    '''
+
+    if float_dtype not in FLOAT_DTYPES:
+        raise ValueError(f'float_dtype must be one of {FLOAT_DTYPES}, not {float_dtype!r}')
+
+    if len(long_df.columns) == 0:
+        return long_df
+
+    columns = {}
+    for column in long_df.columns:
+        values = long_df[column]
+        if is_value_column(column):
+            columns[column] = pd.to_numeric(values, errors='coerce').astype(float_dtype)
+        elif column in INTEGER_COLUMNS:
+            columns[column] = values.astype(np.int32)
+        elif column in BOOLEAN_COLUMNS:
+            columns[column] = values.astype(bool)
+        elif column in DATETIME_COLUMNS and values.dtype == object:
+            columns[column] = pd.to_datetime(values, format=PERIOD_TIMEFORMAT, utc=True, errors='coerce')
+        elif values.dtype == object:
+            try:
+                dtype = code_table.dtype(column, values) if code_table is not None else None
+                columns[column] = values.astype(dtype if dtype is not None else 'category')
+            except TypeError:
+                columns[column] = values
+        else:
+            columns[column] = values
+
+    df = pd.DataFrame(columns, index=long_df.index)
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_convert('UTC')
+    df.attrs = dict(long_df.attrs)
+
+    return df
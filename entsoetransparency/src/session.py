@@ -0,0 +1,38 @@
+# Pooled http session of client, reusing connections to transparency.entsoe.eu across api calls.
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Connect and read timeout in seconds of api calls.
+DEFAULT_TIMEOUT = (10, 120)
+
+# Connections kept alive, matches default number of parallel requests.
+DEFAULT_POOL_SIZE = 10
+
+
+def make_session(pool_size=DEFAULT_POOL_SIZE):
+    '''Returns requests.Session with keep-alive connection pool of pool_size, negotiating gzip compressed responses.'''
+
+    session = requests.Session()
+    mount_pool(session, pool_size)
+    session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+
+    return session
+
+
+def mount_pool(session, pool_size):
+    '''Mounts http and https adapters with connection pool of pool_size on session, replaced adapters are closed.'''
+
+    old = [session.adapters[prefix] for prefix in ['https://', 'http://'] if prefix in session.adapters]
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.pool_size = pool_size
+
+    # Close pooled connections of replaced adapters, connections in use are closed when released.
+    for replaced in {id(x): x for x in old}.values():
+        replaced.close()
+
+    return session
@@ -0,0 +1,128 @@
+# Versioned on-disk snapshot of the api guide statics (datasets and parameters).
+# Lets the client start from file in milliseconds instead of webscraping the api guide on every init.
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+
+# Bump when the layout of datasets/parameters in the snapshot changes, older snapshots are then ignored.
+STATICS_SNAPSHOT_VERSION = 1
+
+# Snapshot shipped with the package, used when no user snapshot exists yet.
+BUNDLED_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'statics.json.gz')
+
+# User snapshot, written by the client after each guide refresh.
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'entsoetransparency', 'statics.json.gz')
+
+
+def guide_content_hash(guide_html):
+    '''Returns sha256 hexdigest of api guide html content.'''
+
+    # Hash on bytes.
+    if isinstance(guide_html, str):
+        guide_html = guide_html.encode('utf-8')
+
+    return hashlib.sha256(guide_html).hexdigest()
+
+
+def save_statics_snapshot(datasets, parameters, path=DEFAULT_SNAPSHOT_PATH, guide_hash=None, guide_url=None):
+    '''Saves datasets and parameters as gzipped json snapshot, returns saved snapshot dict.'''
+
+    now = _utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    snapshot = {
+        'version': STATICS_SNAPSHOT_VERSION,
+        'created': now,
+        'checked': now,
+        'guide_url': guide_url,
+        'guide_sha256': guide_hash,
+        'datasets': datasets,
+        'parameters': parameters,
+        }
+
+    _write_snapshot(snapshot, path)
+
+    return snapshot
+
+
+def touch_statics_snapshot(snapshot, path=DEFAULT_SNAPSHOT_PATH):
+    '''Marks snapshot as checked against api guide now, and saves it to path.'''
+
+    snapshot = dict(snapshot)
+    snapshot['checked'] = _utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    _write_snapshot(snapshot, path)
+
+    return snapshot
+
+
+def load_statics_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    '''Loads snapshot from path, returns None if missing, unreadable or of other version.'''
+
+    # If no snapshot at path.
+    if path is None or not os.path.isfile(path):
+        return None
+
+    # Read plain or gzipped json.
+    try:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Ignore snapshots written by other layout versions.
+    if not isinstance(snapshot, dict) or snapshot.get('version') != STATICS_SNAPSHOT_VERSION:
+        return None
+
+    return snapshot
+
+
+def snapshot_is_complete(snapshot):
+    '''Returns True if snapshot holds both datasets and parameters.'''
+
+    if snapshot is None:
+        return False
+
+    datasets = snapshot.get('datasets') or {}
+    parameters = snapshot.get('parameters') or {}
+
+    return len(datasets.get('names', [])) > 0 and len(parameters) > 0
+
+
+def snapshot_age(snapshot):
+    '''Returns seconds since snapshot was last checked against api guide.'''
+
+    checked = datetime.datetime.strptime(snapshot['checked'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
+
+    return (_utcnow() - checked).total_seconds()
+
+
+def _utcnow():
+    '''Returns timezone aware utc now.'''
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _write_snapshot(snapshot, path):
+    '''Atomically writes snapshot to path, so concurrent readers never see a partial file.'''
+
+    # Ensure snapshot folder exists.
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+
+    # Write to temporary file in same folder, then replace.
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            data = json.dumps(snapshot, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            if path.endswith('.gz'):
+                data = gzip.compress(data)
+            raw.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
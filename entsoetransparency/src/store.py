@@ -0,0 +1,173 @@
+# Local store of fetched time series points, and of the request windows already fetched.
+# Lets repeated requests fetch only windows missing in the store, or windows recent enough to still be revised.
+
+import datetime
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from .timeseries import value_columns
+
+
+TIMEFORMAT = '%Y%m%d%H%M'
+
+# Store database, next to the statics snapshot.
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'entsoetransparency', 'store.sqlite')
+
+# Columns of long format rows not part of series identity.
+NON_SERIES_COLUMNS = ['dataset', 'success', 'parameters', 'reason', 'createddatetime', 'start', 'end', 'position', 'timestamp']
+
+
+def subtract_intervals(start, end, intervals):
+    '''Returns parts of [start, end) not covered by intervals, as sorted list of (start, end).'''
+
+    missing = []
+    for i_start, i_end in sorted(intervals):
+        if i_end <= start or i_start >= end:
+            continue
+        if i_start > start:
+            missing.append((start, i_start))
+        start = max(start, i_end)
+        if start >= end:
+            break
+
+    if start < end:
+        missing.append((start, end))
+
+    return missing
+
+
+def _code(code):
+    '''Returns area code of request key, '' if None, as NULLs are never equal in sqlite keys.'''
+    return '' if code is None else code
+
+
+def _day_floor(dt):
+    return datetime.datetime(dt.year, dt.month, dt.day)
+
+
+def _day_ceil(dt):
+    floor = _day_floor(dt)
+    return floor if floor == dt else floor + datetime.timedelta(days=1)
+
+
+class TimeSeriesStore():
+    '''
+    Sqlite store of long format points by request key (dataset, from area code, to area code) and series attributes
+    (domains, business type, psr type, resolution, ...), with fetched windows of each request key.
+
+    :Inputs:
+        -path: Sqlite store file, created if missing.
+    '''
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS coverage (dataset TEXT, from_code TEXT, to_code TEXT, start TEXT, end TEXT, fetched REAL)')
+            con.execute('CREATE INDEX IF NOT EXISTS coverage_key ON coverage (dataset, from_code, to_code)')
+            con.execute('CREATE TABLE IF NOT EXISTS points (dataset TEXT, from_code TEXT, to_code TEXT, series TEXT, timestamp INTEGER, '
+                        'value_column TEXT, value REAL, position INTEGER, createddatetime TEXT, '
+                        'PRIMARY KEY (dataset, from_code, to_code, series, timestamp))')
+
+    def _connect(self):
+        '''Returns new connection, one per operation so store is usable from any thread.'''
+        return sqlite3.connect(self.path, timeout=60)
+
+    def missing(self, dataset, from_code, to_code, start_end_time, revisable_days=3):
+        '''
+        Returns windows of start_end_time not fetched, as list of (start, end) time strings on UTC day bounds.
+        Fetched windows ending less than revisable_days before they were fetched may since be revised, and are missing.
+        '''
+
+        start = _day_floor(datetime.datetime.strptime(start_end_time[0], TIMEFORMAT))
+        end = _day_ceil(datetime.datetime.strptime(start_end_time[-1], TIMEFORMAT))
+
+        with self._connect() as con:
+            rows = con.execute('SELECT start, end, fetched FROM coverage WHERE dataset = ? AND from_code IS ? AND to_code IS ?',
+                               (dataset, _code(from_code), _code(to_code))).fetchall()
+
+        final = []
+        for c_start, c_end, fetched in rows:
+            c_end = datetime.datetime.strptime(c_end, TIMEFORMAT)
+            if c_end <= datetime.datetime.fromtimestamp(fetched, datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(days=revisable_days):
+                final.append((datetime.datetime.strptime(c_start, TIMEFORMAT), c_end))
+
+        return [(s.strftime(TIMEFORMAT), e.strftime(TIMEFORMAT)) for s, e in subtract_intervals(start, end, final)]
+
+    def add_coverage(self, dataset, from_code, to_code, start_end_time, fetched=None):
+        '''Marks start_end_time fetched now, replacing coverage inside it.'''
+
+        fetched = time.time() if fetched is None else fetched
+        with self._connect() as con:
+            con.execute('DELETE FROM coverage WHERE dataset = ? AND from_code IS ? AND to_code IS ? AND start >= ? AND end <= ?',
+                        (dataset, _code(from_code), _code(to_code), start_end_time[0], start_end_time[-1]))
+            con.execute('INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?)', (dataset, _code(from_code), _code(to_code), start_end_time[0], start_end_time[-1], fetched))
+
+    def merge(self, dataset, from_code, to_code, long_df):
+        '''Inserts points of long format df of request key in time order, revised points replace stored points.'''
+
+        if len(long_df) == 0:
+            return 0
+
+        columns = value_columns(list(long_df.columns))
+        if len(columns) == 0:
+            return 0
+        series_columns = [x for x in long_df.columns if x not in NON_SERIES_COLUMNS and x not in columns]
+
+        # Value of each point from first value column with a value, as Periods of mixed frames have values in one column only.
+        values = long_df[columns].astype(float).values
+        first = np.argmax(~np.isnan(values), axis=1)
+        point_values = values[np.arange(len(values)), first]
+        point_columns = [columns[idx] for idx in first]
+
+        series = [json.dumps(dict(zip(series_columns, [str(x) for x in row])), sort_keys=True) for row in long_df[series_columns].itertuples(index=False)]
+        timestamps = long_df.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').astype(np.int64)
+        positions = long_df['position'].values if 'position' in long_df.columns else np.zeros(len(long_df), dtype=np.int64)
+        created = long_df['createddatetime'].astype(str).values if 'createddatetime' in long_df.columns else [None] * len(long_df)
+
+        rows = sorted(zip([dataset] * len(long_df), [_code(from_code)] * len(long_df), [_code(to_code)] * len(long_df), series, timestamps.tolist(),
+                          point_columns, point_values.tolist(), [int(x) for x in positions], created),
+                      key=lambda row: (row[4], row[3]))
+
+        with self._connect() as con:
+            con.executemany('INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+        return len(rows)
+
+    def read(self, dataset, from_code, to_code, start_end_time, tz='UTC'):
+        '''Returns long format df of stored points of request key in start_end_time, in time order, indexed by tz-aware timestamp.'''
+
+        start = np.datetime64(datetime.datetime.strptime(start_end_time[0], TIMEFORMAT), 'ns').astype(np.int64)
+        end = np.datetime64(datetime.datetime.strptime(start_end_time[-1], TIMEFORMAT), 'ns').astype(np.int64)
+
+        with self._connect() as con:
+            rows = con.execute('SELECT series, timestamp, value_column, value, position, createddatetime FROM points '
+                               'WHERE dataset = ? AND from_code IS ? AND to_code IS ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp, series',
+                               (dataset, _code(from_code), _code(to_code), int(start), int(end))).fetchall()
+
+        if len(rows) == 0:
+            return pd.DataFrame()
+
+        series, timestamps, value_columns, values, positions, created = zip(*rows)
+        series_cache = {}
+        records = []
+        for s, value_column, value, position, c in zip(series, value_columns, values, positions, created):
+            attributes = series_cache.get(s)
+            if attributes is None:
+                attributes = series_cache[s] = json.loads(s)
+            record = {'dataset': dataset, 'createddatetime': c}
+            record.update(attributes)
+            record['position'] = position
+            record[value_column] = value
+            records.append(record)
+
+        long_df = pd.DataFrame(records)
+        long_df.index = pd.DatetimeIndex(np.array(timestamps, dtype='datetime64[ns]'), name='timestamp').tz_localize('UTC').tz_convert(tz)
+
+        return long_df
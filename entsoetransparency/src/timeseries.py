@@ -0,0 +1,282 @@
+# Vectorized expansion of parsed TimeSeries Periods into timestamped points.
+# Timestamps are start + (position - 1) * resolution, computed with numpy datetime64 arithmetic on all points at once.
+
+import functools
+import itertools
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# Columns holding one value per point of a Period. A Period may have values in some of them only, ex. quantity and price rows mixed in one frame.
+VALUE_COLUMNS = ['quantity', 'price.amount']
+
+# Other Point value tags are named like these, ex. secondaryquantity or imbalance_price.amount, lowered as parsed.
+VALUE_REGEX = re.compile(r'(quantity|\.amount)$')
+
+# Curve types where points equal to previous point are left out, and are forward filled on expansion.
+VARIABLE_SIZED_BLOCK_CURVETYPES = ['a03', 'variable sized block']
+
+PERIOD_TIMEFORMAT = '%Y-%m-%dT%H:%MZ'
+
+RESOLUTION_REGEX = re.compile(r'^P(?:(\d+)Y)?(?:(\d+)M)?(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+
+@functools.lru_cache(maxsize=None)
+def parse_resolution(resolution):
+    '''Returns iso8601 duration resolution as (months, timedelta64[s]), ex. "PT15M" -> (0, 900s), "P1M" -> (1, 0s). None if not a duration.'''
+
+    match = RESOLUTION_REGEX.match(str(resolution).strip())
+    if match is None or not any(match.groups()):
+        return None
+
+    years, months, weeks, days, hours, minutes, seconds = [int(x) if x else 0 for x in match.groups()]
+    td = np.timedelta64(((weeks * 7 + days) * 24 + hours) * 3600 + minutes * 60 + seconds, 's')
+
+    return years * 12 + months, td
+
+
+def _scalar(value, last=False):
+    '''Returns first (or last) value of list, value itself if not list.'''
+    if isinstance(value, (list, tuple, np.ndarray)):
+        if len(value) == 0:
+            return None
+        return value[-1] if last else value[0]
+    return value
+
+
+def _points_list(value):
+    '''Returns point values as list, empty list if missing.'''
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return value
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    return [value]
+
+
+def is_value_column(column):
+    '''Returns True if column holds Point values, one of VALUE_COLUMNS or named like them (see VALUE_REGEX).'''
+    return column in VALUE_COLUMNS or (isinstance(column, str) and VALUE_REGEX.search(column) is not None)
+
+
+def value_columns(columns):
+    '''Returns Point value columns in columns, VALUE_COLUMNS first.'''
+    return [x for x in VALUE_COLUMNS if x in columns] + [x for x in columns if x not in VALUE_COLUMNS and is_value_column(x)]
+
+
+def _value_columns(df):
+    '''Returns Point value columns of df, warns if df has positions but no value column, as its points can not be expanded.'''
+
+    columns = value_columns(list(df.columns))
+    if len(columns) == 0 and 'position' in df.columns and len(df) > 0:
+        warnings.warn(f'No point value column (quantity, *.amount) found in columns {list(df.columns)}, points are not expanded.', stacklevel=3)
+
+    return columns
+
+
+def _to_datetime64(values):
+    '''Returns period time strings as datetime64[ns] array, NaT if missing.'''
+    return pd.to_datetime(pd.Series(values, dtype=object), format=PERIOD_TIMEFORMAT, errors='coerce').values
+
+
+def _period_points(df, value_columns, errors=None):
+    '''
+    Returns points of each Period (counts), and concatenated point arrays (positions, dict of values of each value column).
+    Points are the positions of the Period, or its values if without positions, value columns without values in the Period are NaN.
+    Periods with positions but no values, or with a value count other than their point count, are malformed: they get no points,
+    and are appended to errors as (row, reason).
+    '''
+
+    n_rows = len(df)
+    positions_lists = [_points_list(x) for x in df['position']] if 'position' in df.columns else [[]] * n_rows
+    values_lists = {column: [_points_list(x) for x in df[column]] for column in value_columns}
+
+    counts = np.zeros(n_rows, dtype=np.int64)
+    for idx in range(n_rows):
+        lengths = [len(values_lists[column][idx]) for column in value_columns]
+        count = len(positions_lists[idx]) or max(lengths, default=0)
+
+        reason = None
+        if count > 0 and max(lengths, default=0) == 0:
+            reason = f'Period has {count} positions but no {" or ".join(value_columns) or "value"} values'
+        for column, length in zip(value_columns, lengths):
+            if reason is None and length not in (0, count):
+                reason = f'Period has {count} positions but {length} {column} values'
+
+        if reason is None:
+            counts[idx] = count
+        elif errors is not None:
+            errors.append((df.index[idx], reason))
+
+    # Positions as given, else 1..n in Periods without positions.
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    positions = np.arange(counts.sum(), dtype=np.int64) - np.repeat(offsets, counts) + 1
+    for idx in np.flatnonzero(counts):
+        if len(positions_lists[idx]) > 0:
+            positions[offsets[idx]:offsets[idx] + counts[idx]] = np.asarray(positions_lists[idx], dtype=np.int64)
+
+    # Values of points, NaN in Periods without values of column.
+    values = {}
+    for column in value_columns:
+        points = (x if len(x) == count else itertools.repeat(np.nan, count) for x, count in zip(values_lists[column], counts))
+        values[column] = np.array(list(itertools.chain.from_iterable(points)), dtype=float)
+
+    return counts, positions, values
+
+
+def _period_arrays(df, value_columns, errors=None):
+    '''
+    Returns per Period arrays (counts, starts, ends, months, steps, curvetypes) and concatenated point arrays (positions, dict of values).
+    Step is resolution, or (end - start) / points if Period has no resolution. Malformed Periods have no points (see _period_points()).
+    '''
+
+    counts, positions, values = _period_points(df, value_columns, errors)
+
+    starts = _to_datetime64([_scalar(x) for x in df['start']])
+    ends = _to_datetime64([_scalar(x, last=True) for x in df['end']]) if 'end' in df.columns else np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    # Step of each Period from resolution, calendar resolutions in months.
+    months = np.zeros(len(df), dtype=np.int64)
+    steps = np.full(len(df), np.timedelta64('NaT'), dtype='timedelta64[ns]')
+    if 'resolution' in df.columns:
+        for idx, resolution in enumerate(df['resolution']):
+            parsed = parse_resolution(_scalar(resolution))
+            if parsed is not None:
+                months[idx], steps[idx] = parsed
+
+    # Without resolution, evenly spaced points between start and end.
+    missing = np.isnat(steps) & (months == 0) & (counts > 0)
+    steps[missing] = (ends[missing] - starts[missing]) / counts[missing]
+
+    if 'curvetype' in df.columns:
+        curvetypes = np.array([str(_scalar(x)).lower() in VARIABLE_SIZED_BLOCK_CURVETYPES for x in df['curvetype']], dtype=bool)
+    else:
+        curvetypes = np.zeros(len(df), dtype=bool)
+
+    return counts, starts, ends, months, steps, curvetypes, positions, values
+
+
+def _timestamps(rows, positions, starts, months, steps):
+    '''Returns datetime64[ns] timestamps of points, start + (position - 1) * resolution.'''
+
+    k = positions - 1
+    timestamps = starts[rows] + k * steps[rows]
+
+    # Calendar resolutions step months from start, keeping day of month (clipped to month length) and time of day.
+    calendar = months[rows] > 0
+    if calendar.any():
+        start = starts[rows][calendar]
+        start_month = start.astype('datetime64[M]')
+        start_day = start.astype('datetime64[D]')
+        month = start_month + (k[calendar] * months[rows][calendar]).astype('timedelta64[M]')
+        month_days = (month + 1).astype('datetime64[D]') - month.astype('datetime64[D]')
+        day = np.minimum(start_day - start_month.astype('datetime64[D]'), month_days - 1)
+        timestamps[calendar] = (month.astype('datetime64[D]') + day).astype('datetime64[ns]') + (start - start_day.astype('datetime64[ns]'))
+
+    return timestamps
+
+
+def period_timestamps(df, errors=None):
+    '''
+    Returns list of datetime64[ns] arrays, timestamps of each point in each row (Period) of df. None for rows without points.
+    Malformed Periods (see _period_points()) are None, and appended to errors as (row, reason) if errors is a list.
+    '''
+
+    value_columns = _value_columns(df)
+    if len(value_columns) == 0 or 'start' not in df.columns or len(df) == 0:
+        return [None] * len(df)
+
+    counts, starts, _, months, steps, _, positions, _ = _period_arrays(df, value_columns, errors)
+    rows = np.repeat(np.arange(len(df)), counts)
+    timestamps = _timestamps(rows, positions, starts, months, steps)
+
+    split = np.split(timestamps, np.cumsum(counts)[:-1])
+
+    return [ts if count > 0 else None for ts, count in zip(split, counts)]
+
+
+def expand_periods(df, tz='UTC', errors=None):
+    '''
+    Expand rows of parsed Periods into long-format DataFrame, one row per point.
+
+    :Inputs:
+        -df: DataFrame with one row per Period, with start, resolution/end, position and value columns (quantity, price.amount, see is_value_column()).
+        -tz: Timezone of returned DatetimeIndex.
+        -errors: List malformed Periods are appended to as (row, reason), row is index label of df. Malformed Periods are skipped.
+
+    :Outputs:
+        -df: Period columns repeated for each point, with position and value columns, indexed by tz-aware DatetimeIndex "timestamp".
+            Value columns without values in a Period are NaN. Points left out of variable sized block (A03) Periods are forward filled.
+    '''
+
+    value_columns = _value_columns(df)
+    if len(value_columns) == 0 or 'start' not in df.columns or len(df) == 0:
+        return pd.DataFrame()
+
+    labels = df.index
+    df = df.reset_index(drop=True)
+    row_errors = []
+    counts, starts, ends, months, steps, curvetypes, positions, values = _period_arrays(df, value_columns, row_errors)
+    if errors is not None:
+        errors.extend((labels[idx], reason) for idx, reason in row_errors)
+    rows = np.repeat(np.arange(len(df)), counts)
+
+    # Variable sized block Periods with known length are expanded to all positions, and forward filled.
+    n_full = np.zeros(len(df), dtype=np.int64)
+    fill = curvetypes & (months == 0) & ~np.isnat(ends) & ~np.isnat(steps) & (counts > 0)
+    if fill.any():
+        n_full[fill] = (ends[fill] - starts[fill]) // steps[fill]
+        fill &= n_full > 0
+
+    if fill.any():
+
+        # Points of Periods without filling.
+        keep = ~fill[rows]
+
+        # Full position grid of filled Periods.
+        fill_rows = np.flatnonzero(fill)
+        fill_counts = n_full[fill_rows]
+        fill_offsets = np.concatenate([[0], np.cumsum(fill_counts)[:-1]])
+        grid_rows = np.repeat(fill_rows, fill_counts)
+        grid_positions = np.arange(fill_counts.sum()) - np.repeat(fill_offsets, fill_counts) + 1
+
+        # Place given points in grid, points out of grid are dropped.
+        offset_of_row = np.zeros(len(df), dtype=np.int64)
+        offset_of_row[fill_rows] = fill_offsets
+        given = fill[rows] & (positions >= 1) & (positions <= n_full[rows])
+        idx = offset_of_row[rows[given]] + positions[given] - 1
+        present = np.zeros(len(grid_rows), dtype=bool)
+        present[idx] = True
+
+        # Forward fill within Period, first position of each Period is never filled from previous Period.
+        present[fill_offsets] = True
+        last = np.maximum.accumulate(np.where(present, np.arange(len(grid_rows)), 0))
+        grid_values = {}
+        for column, column_values in values.items():
+            grid_values[column] = np.full(len(grid_rows), np.nan)
+            grid_values[column][idx] = column_values[given]
+            grid_values[column] = grid_values[column][last]
+
+        # Combine, keeping order of Periods.
+        rows = np.concatenate([rows[keep], grid_rows])
+        positions = np.concatenate([positions[keep], grid_positions])
+        order = np.argsort(rows, kind='stable')
+        rows, positions = rows[order], positions[order]
+        values = {column: np.concatenate([column_values[keep], grid_values[column]])[order] for column, column_values in values.items()}
+
+    timestamps = _timestamps(rows, positions, starts, months, steps)
+
+    # Period columns, single values unwrapped from lists.
+    period_columns = [x for x in df.columns if x not in value_columns + ['position', 'timestamp']]
+    period_df = df[period_columns].copy()
+    for column in period_columns:
+        period_df[column] = [x[0] if isinstance(x, list) and len(x) == 1 else x for x in period_df[column]]
+    long_df = period_df.take(rows).reset_index(drop=True)
+    long_df['position'] = positions
+    for column in value_columns:
+        long_df[column] = values[column]
+    long_df.index = pd.DatetimeIndex(timestamps, name='timestamp').tz_localize('UTC').tz_convert(tz)
+
+    return long_df
@@ -0,0 +1,45 @@
+# Parallel parse of zipped multi-document responses, members parsed as raw bytes in a process pool.
+# Workers build the parameters index once, and members are decompressed one at a time as workers free up.
+
+import collections
+import itertools
+
+from .parameters_index import ParametersIndex
+from .parsers import DOCNAMES, TAGSNAMES, parse_response_records
+
+
+# Archives with fewer members are parsed serially, pool overhead outweighs gain.
+PARALLEL_MIN_MEMBERS = 8
+
+# Parameters index of pool worker, built by initializer.
+_worker_index = None
+
+
+def init_worker(parameters):
+    '''Process pool initializer, builds parameters index of worker.'''
+    global _worker_index
+    _worker_index = ParametersIndex(parameters)
+
+
+def parse_member(content, docnames=DOCNAMES, tagsnames=TAGSNAMES):
+    '''Parse zip member xml bytes in pool worker into records. Returns records, reason (None if not bad response).'''
+    index = _worker_index
+    return parse_response_records(content, remap=index.remap, docnames=docnames, tagsnames=tagsnames, remap_tag=index.types_for_tag)
+
+
+def iter_members(zipf):
+    '''Yields raw bytes of each member of zipfile, decompressed one at a time.'''
+    for name in zipf.namelist():
+        yield zipf.read(name)
+
+
+def bounded_map(executor, fn, iterable, window):
+    '''Like executor.map, results in order, but at most window items submitted ahead so inputs are not all held in memory.'''
+
+    iterable = iter(iterable)
+    futures = collections.deque(executor.submit(fn, x) for x in itertools.islice(iterable, window))
+    while len(futures) > 0:
+        result = futures.popleft().result()
+        for x in itertools.islice(iterable, 1):
+            futures.append(executor.submit(fn, x))
+        yield result
@@ -0,0 +1,228 @@
+# Local stand-in of the entso-e transparency api, for load and scaling tests without calls to the real platform.
+# Serves synthetic documents of fixtures.py on /api?securityToken=...&documentType=..., as built by client._construct_api_call_url,
+# with configurable latency, acknowledgement reason documents, emulated 429s and rate limit bans.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/api_server.py [--port 8080] [--latency 0.2] [--calls-per-minute 400] [--max-days A75=7]
+# then point a client at it with client.api_url = 'http://127.0.0.1:8080/api?'.
+
+import argparse
+import collections
+import datetime
+import functools
+import http.server
+import random
+import threading
+import time
+import urllib.parse
+
+from fixtures import make_acknowledgement, make_document, make_zip_bundle
+
+
+TIMEFORMAT = '%Y%m%d%H%M'
+
+# Document types answered with zip archives of outage documents, and with documents of each fixture kind.
+ZIP_DOCUMENT_TYPES = ['A76', 'A77', 'A78', 'A80']
+DOCUMENT_TYPE_KINDS = {'A44': 'publication', 'A09': 'transmission', 'A11': 'transmission', 'A61': 'transmission'}
+
+
+@functools.lru_cache(maxsize=256)
+def _document(document_type, start, days, n_series):
+    '''Returns cached response body of document type, days long from start time string.'''
+
+    start = datetime.datetime.strptime(start, TIMEFORMAT)
+    if document_type in ZIP_DOCUMENT_TYPES:
+        return make_zip_bundle(days, n_series=n_series, resolution='PT60M', start=start), 'application/zip'
+
+    kind = DOCUMENT_TYPE_KINDS.get(document_type, 'gl')
+    resolution = 'PT60M' if kind == 'publication' else 'PT15M'
+    return make_document(kind, n_series=n_series, resolution=resolution, n_periods=days, start=start), 'text/xml'
+
+
+class StandInServer():
+    '''
+    Threaded http server emulating the api, run in background thread with start() and stop().
+
+    :Inputs:
+        -latency: Seconds before response headers are sent, time to first byte.
+        -jitter: Fraction of latency randomized.
+        -calls_per_minute: Calls of a security token in any 60 s before it is banned, None for no limit.
+        -ban_seconds: Seconds a banned token gets 429 with Retry-After, the real api bans for 10 minutes.
+        -max_days: Dict of documentType to max days of a request window, longer windows get an "allowed: N days" reason.
+        -error_rate: Fraction of calls answered 503, emulating platform outages.
+        -no_data_rate: Fraction of calls answered with "No matching data found" reason.
+        -n_series: TimeSeries in each document.
+    '''
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, jitter=0.2, calls_per_minute=400, ban_seconds=600, max_days=None,
+                 error_rate=0., no_data_rate=0., n_series=4, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls_per_minute = calls_per_minute
+        self.ban_seconds = ban_seconds
+        self.max_days = max_days or {}
+        self.error_rate = error_rate
+        self.no_data_rate = no_data_rate
+        self.n_series = n_series
+
+        # Random draws, calls and stats are shared by handler threads, guarded by _lock.
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls = collections.defaultdict(collections.deque)
+        self._banned = {}
+        self.stats = collections.Counter()
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def api_url(self):
+        '''Returns api url of server, as client.api_url.'''
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/api?'
+
+    def start(self):
+        '''Serves in background thread. Returns api url.'''
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.api_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, body, content_type, headers = server.respond(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _draw(self):
+        '''Returns next random number in [0, 1).'''
+        with self._lock:
+            return self._random.random()
+
+    def counts(self):
+        '''Returns copy of stats, consistent while handler threads are counting.'''
+        with self._lock:
+            return collections.Counter(self.stats)
+
+    def _rate_limited(self, token, now):
+        '''Counts call of token, returns seconds of ban if token is banned or exceeds calls_per_minute, else None.'''
+
+        with self._lock:
+            until = self._banned.get(token)
+            if until is not None and now < until:
+                return until - now
+
+            calls = self._calls[token]
+            calls.append(now)
+            while calls[0] <= now - 60:
+                calls.popleft()
+
+            if self.calls_per_minute is not None and len(calls) > self.calls_per_minute:
+                self._banned[token] = now + self.ban_seconds
+                self.stats['bans'] += 1
+                return self.ban_seconds
+
+        return None
+
+    def respond(self, path):
+        '''Returns status, body, content type and headers of response to request path.'''
+
+        self._count('requests')
+        time.sleep(self.latency * (1 - self.jitter * self._draw()))
+
+        url = urllib.parse.urlsplit(path)
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+        token = query.pop('securityToken', None)
+
+        if url.path.rstrip('/') != '/api':
+            return self._status(404, b'Not found')
+        if token is None:
+            return self._status(401, b'<html><body><h1>Unauthorized</h1></body></html>', 'text/html')
+
+        ban = self._rate_limited(token, time.monotonic())
+        if ban is not None:
+            return self._status(429, b'Max allowed requests per minute from each unique IP is 400', 'text/plain', {'Retry-After': str(int(ban) + 1)})
+
+        if self._draw() < self.error_rate:
+            return self._status(503, b'Service unavailable', 'text/plain', {'Retry-After': '1'})
+
+        # Bad requests are answered with acknowledgement documents, as the api does.
+        document_type = query.get('documentType')
+        try:
+            start = datetime.datetime.strptime(query['periodStart'], TIMEFORMAT)
+            end = datetime.datetime.strptime(query['periodEnd'], TIMEFORMAT)
+        except (KeyError, ValueError):
+            return self._reason('Mandatory parameter periodStart or periodEnd is missing or invalid.')
+
+        days = max(int((end - start).total_seconds() // 86400), 1)
+        max_days = self.max_days.get(document_type)
+        if max_days is not None and days > max_days:
+            return self._reason(f'The amount of requested data exceeds allowed limit. Max allowed: {max_days} D, requested: {days} D.')
+
+        if self._draw() < self.no_data_rate:
+            return self._reason('No matching data found for Data item and interval.')
+
+        body, content_type = _document(document_type, start.strftime(TIMEFORMAT), days, self.n_series)
+        self._count(200)
+        return 200, body, content_type, {}
+
+    def _status(self, status, body, content_type='text/plain', headers=None):
+        self._count(status)
+        return status, body, content_type, headers or {}
+
+    def _reason(self, text):
+        self._count('reasons')
+        return 200, make_acknowledgement(text), 'text/xml', {}
+
+
+def main():
+    '''Run stand-in server until interrupted.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds to first byte of each response.')
+    parser.add_argument('--calls-per-minute', type=int, default=400, help='Calls of a token in 60 s before ban.')
+    parser.add_argument('--ban-seconds', type=float, default=600, help='Seconds of ban.')
+    parser.add_argument('--max-days', nargs='*', default=[], help='Max window days of document types, as documentType=days.')
+    parser.add_argument('--error-rate', type=float, default=0., help='Fraction of calls answered 503.')
+    parser.add_argument('--no-data-rate', type=float, default=0., help='Fraction of calls answered with no data reason.')
+    parser.add_argument('--series', type=int, default=4, help='TimeSeries in each document.')
+    args = parser.parse_args()
+
+    max_days = {k: int(v) for k, v in (x.split('=') for x in args.max_days)}
+    server = StandInServer(args.host, args.port, args.latency, calls_per_minute=args.calls_per_minute, ban_seconds=args.ban_seconds,
+                           max_days=max_days, error_rate=args.error_rate, no_data_rate=args.no_data_rate, n_series=args.series)
+    print(f'Serving at {server.api_url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+
+    main()
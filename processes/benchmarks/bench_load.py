@@ -0,0 +1,110 @@
+# Load harness driving get_data against the local api stand-in at 1..N workers, reporting throughput and tail latency.
+# Default request is 1 year of 15 minute data for 5 areas in monthly windows, at the real api rate limit.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_load.py [--workers 1 2 4 8] [--latency 0.2] [--calls-per-minute 399] [--max-days A75=7]
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+from api_server import StandInServer
+from bench_pipeline import DATASETS, window_limits, windows
+from fixtures import load_parameters
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+
+def percentile(values, q):
+    '''Returns q percentile of values by nearest rank, None if empty.'''
+    if len(values) == 0:
+        return None
+    values = sorted(values)
+    return values[min(int(q / 100 * len(values)), len(values) - 1)]
+
+
+def make_load_client(api_url, calls_per_minute=399, limits_path=None, window_days=None):
+    '''
+    Returns client with fixture parameters calling api_url, with http call latencies recorded in client.latencies.
+    Requests are made in windows of at most window_days, or smaller limits learned from server reasons.
+    '''
+    from entsoetransparency import EntsoeTransparencyClient
+    from src.ratelimiter import TokenBucket
+
+    client = EntsoeTransparencyClient(api_key='load-test', lazy=True, rate_limiter=TokenBucket(calls=calls_per_minute, period=60, burst=10),
+                                      window_limits=window_limits(window_days, limits_path))
+    client.parameters = load_parameters()
+    client.datasets = DATASETS
+    client.api_url = api_url
+
+    # Latency of each http call, from request to downloaded body.
+    client.latencies = []
+    lock = threading.Lock()
+    get = client.session.get
+
+    def timed_get(*args, **kwargs):
+        t0 = time.perf_counter()
+        response = get(*args, **kwargs)
+        t = time.perf_counter() - t0
+        with lock:
+            client.latencies.append(t)
+        return response
+
+    client.session.get = timed_get
+
+    return client
+
+
+def main():
+    '''Print load benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='max_workers of get_data to time.')
+    parser.add_argument('--areas', nargs='+', default=['NO1', 'NO2', 'SE3', 'DE-LU', 'FR'], help='Areas requested.')
+    parser.add_argument('--days', type=int, default=365, help='Days requested.')
+    parser.add_argument('--window-days', type=int, default=30, help='Days in each request window.')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds to first byte of server responses.')
+    parser.add_argument('--calls-per-minute', type=int, default=399, help='Client rate limit.')
+    parser.add_argument('--server-calls-per-minute', type=int, default=400, help='Server calls before ban.')
+    parser.add_argument('--ban-seconds', type=float, default=10, help='Seconds of server ban.')
+    parser.add_argument('--max-days', nargs='*', default=[], help='Max window days of document types, as documentType=days.')
+    parser.add_argument('--error-rate', type=float, default=0., help='Fraction of calls answered 503.')
+    parser.add_argument('--series', type=int, default=4, help='TimeSeries in each response.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    warnings.simplefilter('ignore', FutureWarning)
+
+    max_days = {k: int(v) for k, v in (x.split('=') for x in args.max_days)}
+    start_end = windows(args.days, args.window_days)
+    print(f'{len(args.areas)} areas x {len(start_end)} windows, latency {args.latency} s, client limit {args.calls_per_minute}/min')
+    print(f'{"workers":>7} {"s":>8} {"calls":>6} {"calls/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"max ms":>8} {"rows":>6}  server')
+
+    for workers in args.workers:
+        # Fresh server and learned limits each run, so bans and limits of one run do not carry over.
+        server = StandInServer(latency=args.latency, calls_per_minute=args.server_calls_per_minute, ban_seconds=args.ban_seconds,
+                               max_days=max_days, error_rate=args.error_rate, n_series=args.series)
+        api_url = server.start()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            client = make_load_client(api_url, args.calls_per_minute, os.path.join(tmp, 'window_limits.json'), window_days=args.window_days)
+            t0 = time.perf_counter()
+            # Copies, get_data fixes its input lists in place.
+            df = client.get_data('actual generation', list(args.areas), list(start_end), msg=[], max_workers=workers)
+            t = time.perf_counter() - t0
+
+        server.stop()
+        latencies = client.latencies
+        stats = ' '.join(f'{k}={v}' for k, v in sorted(server.counts().items(), key=lambda x: str(x[0])))
+        p = [percentile(latencies, q) * 1000 for q in (50, 95, 99, 100)]
+        print(f'{workers:>7} {t:8.2f} {len(latencies):>6} {len(latencies) / t:8.2f} {p[0]:8.0f} {p[1]:8.0f} {p[2]:8.0f} {p[3]:8.0f} {len(df):>6}  {stats}')
+
+
+if __name__ == "__main__":
+
+    main()
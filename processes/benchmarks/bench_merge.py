@@ -0,0 +1,114 @@
+# Benchmark of merging equal rows of response DataFrame, grouped merge against previous pairwise iterrows merge.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_merge.py [--rows 10000 100000] [--series 500] [--legacy-rows 500]
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import warnings
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+EXTENDS = ['parameters', 'createddatetime', 'quantity', 'position', 'timestamp', 'start', 'end']
+
+
+def make_periods_df(n_rows=10000, n_series=500, n_points=24):
+    '''Returns synthetic DataFrame of parsed Periods, n_rows Periods of n_series TimeSeries, like _request_data output.'''
+    import numpy as np
+    import pandas as pd
+
+    fmt = '%Y-%m-%dT%H:%MZ'
+    start = datetime.datetime(2022, 1, 1)
+    rows = []
+    for i in range(n_rows):
+        series = i % n_series
+        p_start = start + datetime.timedelta(days=i // n_series)
+        rows.append({
+            'dataset': 'Actual Generation per Production Type 16.1.B&C',
+            'success': True,
+            'parameters': f"{{'periodStart': '{p_start.strftime('%Y%m%d')}0000'}}",
+            'reason': '',
+            'type': 'Actual generation per type',
+            'createddatetime': '2022-01-05T00:00:00Z',
+            'inbiddingzone_domain.mrid': [f'AREA{series // 20}'],
+            'businesstype': ['Production'],
+            'psrtype': [f'B{series % 20:02d}'],
+            'start': [p_start.strftime(fmt)],
+            'end': [(p_start + datetime.timedelta(days=1)).strftime(fmt)],
+            'resolution': ['PT60M'],
+            'quantity': [str(x) for x in range(n_points)],
+            'position': [str(x + 1) for x in range(n_points)],
+            'timestamp': np.datetime64(p_start, 'ns') + np.arange(n_points) * np.timedelta64(1, 'h'),
+            })
+
+    return pd.DataFrame(rows)
+
+
+def merge_extend_equal_rows_iterrows(o_df, extends):
+    '''Previous pairwise merge of client._merge_extend_equal_rows, each row compared against all merged rows.'''
+    import numpy as np
+    import pandas as pd
+
+    extends = [e for e in extends if e in o_df.columns]
+    o_df = o_df.reset_index(drop=True)
+    n_df = pd.DataFrame(o_df.iloc[0]).T.reset_index(drop=True)
+    for o_idx in range(1, len(o_df)):
+        add_flag = True
+        for n_idx in range(len(n_df)):
+            if (o_df.iloc[o_idx].drop(extends).astype(str) == n_df.iloc[n_idx].drop(extends).astype(str)).all():
+                add_flag = False
+                for exd in extends:
+                    if 'start' in exd or 'end' in exd:
+                        n_df.at[n_idx, exd] = min(n_df.at[n_idx, exd], o_df.at[o_idx, exd]) if 'start' in exd else max(n_df.at[n_idx, exd], o_df.at[o_idx, exd])
+                    elif isinstance(n_df.at[n_idx, exd], np.ndarray):
+                        n_df.at[n_idx, exd] = np.concatenate([n_df.at[n_idx, exd], o_df.at[o_idx, exd]])
+                    else:
+                        if not isinstance(n_df.at[n_idx, exd], list):
+                            n_df.at[n_idx, exd] = [n_df.at[n_idx, exd]]
+                        n_df.at[n_idx, exd].extend(o_df.at[o_idx, exd] if isinstance(o_df.at[o_idx, exd], list) else [o_df.at[o_idx, exd]])
+                break
+        if add_flag:
+            n_df = pd.concat([n_df, o_df.iloc[[o_idx]]]).reset_index(drop=True)
+
+    return n_df
+
+
+def main():
+    '''Print merge benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='Row counts to merge.')
+    parser.add_argument('--series', type=int, default=500, help='TimeSeries, rows after merge.')
+    parser.add_argument('--legacy-rows', type=int, default=0, help='Also time previous pairwise merge at this row count.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    from src.merge import merge_extend_equal_rows
+
+    warnings.simplefilter('ignore', FutureWarning)
+
+    for n_rows in args.rows:
+        df = make_periods_df(n_rows, min(args.series, n_rows))
+        t0 = time.perf_counter()
+        merged = merge_extend_equal_rows(df, extends=EXTENDS)
+        t = time.perf_counter() - t0
+        print(f'grouped merge   {n_rows:>8} rows -> {len(merged):>6} rows {t * 1000:10.1f} ms')
+
+    if args.legacy_rows > 0:
+        df = make_periods_df(args.legacy_rows, min(args.series, args.legacy_rows))
+        t0 = time.perf_counter()
+        merged = merge_extend_equal_rows(df, extends=EXTENDS)
+        t_new = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        legacy = merge_extend_equal_rows_iterrows(df, extends=EXTENDS)
+        t_old = time.perf_counter() - t0
+        print(f'iterrows merge  {args.legacy_rows:>8} rows -> {len(legacy):>6} rows {t_old * 1000:10.1f} ms  (grouped {t_new * 1000:.1f} ms, {t_old / t_new:.0f}x)')
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,149 @@
+# Benchmark of response parsing, streaming lxml iterparse parser against previous BeautifulSoup parser.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_parse.py [--series 200] [--periods 1] [--points 96] [--repeat 3]
+
+import argparse
+import datetime
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from fixtures import load_parameters
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+NS = 'urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0'
+
+
+def make_gl_document(n_series=200, n_periods=1, n_points=96, start=datetime.datetime(2022, 1, 1)):
+    '''Returns synthetic GL_MarketDocument xml bytes, with n_series TimeSeries of n_periods daily PT15M Periods.'''
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<GL_MarketDocument xmlns="{NS}">',
+        '\t<mRID>bench</mRID>',
+        '\t<revisionNumber>1</revisionNumber>',
+        '\t<type>A75</type>',
+        '\t<process.processType>A16</process.processType>',
+        '\t<createdDateTime>2022-01-05T00:00:00Z</createdDateTime>',
+        ]
+    fmt = '%Y-%m-%dT%H:%MZ'
+    for s in range(n_series):
+        lines += [
+            '\t<TimeSeries>',
+            f'\t\t<mRID>{s + 1}</mRID>',
+            '\t\t<businessType>A01</businessType>',
+            '\t\t<objectAggregation>A08</objectAggregation>',
+            '\t\t<inBiddingZone_Domain.mRID codingScheme="A01">10YNO-1--------2</inBiddingZone_Domain.mRID>',
+            '\t\t<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>',
+            '\t\t<curveType>A01</curveType>',
+            '\t\t<MktPSRType>',
+            f'\t\t\t<psrType>B{1 + s % 20:02d}</psrType>',
+            '\t\t</MktPSRType>',
+            ]
+        for p in range(n_periods):
+            p_start = start + datetime.timedelta(days=p)
+            p_end = p_start + datetime.timedelta(days=1)
+            lines += [
+                '\t\t<Period>',
+                '\t\t\t<timeInterval>',
+                f'\t\t\t\t<start>{p_start.strftime(fmt)}</start>',
+                f'\t\t\t\t<end>{p_end.strftime(fmt)}</end>',
+                '\t\t\t</timeInterval>',
+                '\t\t\t<resolution>PT15M</resolution>',
+                ]
+            for i in range(n_points):
+                lines += ['\t\t\t<Point>', f'\t\t\t\t<position>{i + 1}</position>', f'\t\t\t\t<quantity>{(s * 7 + i * 13) % 997}</quantity>', '\t\t\t</Point>']
+            lines += ['\t\t</Period>']
+        lines += ['\t</TimeSeries>']
+    lines += ['</GL_MarketDocument>']
+
+    return '\n'.join(lines).encode('utf-8')
+
+
+def response_xml_to_df_bs4(client, response, docnames=['type', 'created', 'domain'], tagsnames=['domain', 'resource', 'type', 'start', 'end', 'resolution', 'quantity', 'amount', 'name', 'voltage', 'nominalp']):
+    '''Previous BeautifulSoup parser of client._response_xml_to_df, one row per TimeSeries.'''
+    import warnings
+    import bs4
+    import pandas as pd
+
+    warnings.filterwarnings('ignore', category=bs4.XMLParsedAsHTMLWarning)
+    soup = bs4.BeautifulSoup(response, 'lxml')
+    body = soup.find_all('body')[0]
+    if body.find('reason') is not None and len(body.find_all('text')) > 0:
+        return pd.DataFrame([body.find_all('text')[0].string], columns=['reason'])
+
+    docdict = {}
+    doctag = body
+    for dname in docnames:
+        doctag = doctag.find_next(re.compile(dname))
+        if doctag is not None:
+            docdict[doctag.name] = client._remap_codes2meanings(doctag.string, doctag.name)
+
+    rows = []
+    for ts in body.find_all('timeseries'):
+        a = docdict.copy()
+        a.update(client._add_tags2dict({}, ts, tagsnames))
+        rows.append(a)
+
+    return pd.DataFrame(rows)
+
+
+def timed(function, repeat):
+    '''Returns result, best wall time in s and peak traced memory in MB of function().'''
+
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = function()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    return result, best, peak
+
+
+def main():
+    '''Print parse benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--series', type=int, default=200, help='TimeSeries in document.')
+    parser.add_argument('--periods', type=int, default=1, help='Periods in each TimeSeries.')
+    parser.add_argument('--points', type=int, default=96, help='Points in each Period.')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeats, best time is reported.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    from entsoetransparency import EntsoeTransparencyClient
+    from src.parsers import TAGSNAMES
+
+    # Client with fixture parameters, no network.
+    client = EntsoeTransparencyClient(lazy=True)
+    client.parameters = load_parameters()
+
+    xml = make_gl_document(args.series, args.periods, args.points)
+    print(f'document: {len(xml) / 1e6:.1f} MB, {args.series} TimeSeries x {args.periods} Periods x {args.points} Points')
+
+    df_new, t_new, mem_new = timed(lambda: client._response_xml_to_df(xml), args.repeat)
+    df_old, t_old, mem_old = timed(lambda: response_xml_to_df_bs4(client, xml, tagsnames=TAGSNAMES), args.repeat)
+
+    print(f'{"bs4 (previous)":<20} {t_old * 1000:10.1f} ms {mem_old:8.1f} MB peak')
+    print(f'{"lxml iterparse":<20} {t_new * 1000:10.1f} ms {mem_new:8.1f} MB peak  ({t_old / t_new:.1f}x)')
+
+    # With single Period TimeSeries both parsers give one equal row per TimeSeries.
+    print(f'columns equal: {df_new.columns.tolist() == df_old.columns.tolist()}')
+    if args.periods == 1:
+        print(f'frames equal: {df_new.equals(df_old)}')
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,100 @@
+# Benchmark of get_data request pipeline, time and peak memory, on a faked api returning synthetic documents.
+# Default request is 1 year of 15 minute data for 5 areas, in monthly windows.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_pipeline.py [--areas NO1 NO2 SE3 DE-LU FR] [--days 365] [--window-days 30] [--series 4]
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+from bench_parse import make_gl_document
+from fixtures import load_parameters
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+DATASETS = {
+    'names': ['Actual Generation per Production Type 16.1.B&C'],
+    'get_mandatorys': [['documentType', 'processType', 'in_Domain', 'periodStart', 'periodEnd']],
+    'get_constants': [['documentType=A75', 'processType=A16']],
+    }
+
+
+def window_limits(window_days=None, path=None):
+    '''
+    Returns WindowLimits with default limit of window_days, so adjacent windows of that length are not coalesced into longer calls.
+    Api default limit if window_days is None.
+    '''
+    from src.chunking import DEFAULT_WINDOW_LIMIT, WindowLimits
+    return WindowLimits(path=path, default=datetime.timedelta(days=window_days) if window_days is not None else DEFAULT_WINDOW_LIMIT)
+
+
+def make_offline_client(n_series=4, call_api=None, window_days=None):
+    '''
+    Returns client with fixture parameters, whose api calls return synthetic GL_MarketDocuments covering the requested window.
+    Requests are made in windows of at most window_days.
+    '''
+    import requests
+    from entsoetransparency import EntsoeTransparencyClient
+
+    client = EntsoeTransparencyClient(api_key='offline', lazy=True, window_limits=window_limits(window_days))
+    client.parameters = load_parameters()
+    client.datasets = DATASETS
+
+    def fake_call_api(url=None, parameters_dict=None, msg=False):
+        '''Returns response with daily 15 minute Periods from periodStart to periodEnd.'''
+        start = datetime.datetime.strptime(parameters_dict['periodStart'], '%Y%m%d%H%M')
+        end = datetime.datetime.strptime(parameters_dict['periodEnd'], '%Y%m%d%H%M')
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = 'utf-8'
+        response._content = make_gl_document(n_series, max((end - start).days, 1), 96, start=start)
+        return response, 'offline'
+
+    client._call_api = call_api or fake_call_api
+
+    return client
+
+
+def windows(days=365, window_days=30, start=datetime.datetime(2022, 1, 1)):
+    '''Returns list of (start, end) request windows covering days, on the client window grid of window_days so each window is one call.'''
+    from src.chunking import TIMEFORMAT, split_window
+
+    end = start + datetime.timedelta(days=days)
+    return split_window((start.strftime(TIMEFORMAT), end.strftime(TIMEFORMAT)), datetime.timedelta(days=window_days))
+
+
+def main():
+    '''Print pipeline benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--areas', nargs='+', default=['NO1', 'NO2', 'SE3', 'DE-LU', 'FR'], help='Areas requested.')
+    parser.add_argument('--days', type=int, default=365, help='Days requested.')
+    parser.add_argument('--window-days', type=int, default=30, help='Days in each request window.')
+    parser.add_argument('--series', type=int, default=4, help='TimeSeries in each response.')
+    parser.add_argument('--long', action='store_true', help='Return long format.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    client = make_offline_client(args.series, window_days=args.window_days)
+    start_end = windows(args.days, args.window_days)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    df = client.get_data('actual generation', args.areas, start_end, msg=[], long=args.long)
+    t = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    size = df.memory_usage(deep=True).sum() / 1e6
+    print(f'{len(args.areas)} areas x {len(start_end)} windows, {args.days} days of PT15M, {args.series} TimeSeries per response')
+    print(f'get_data: {t:.2f} s, result {df.shape} {size:.1f} MB, peak traced {peak:.1f} MB ({peak / size:.1f}x result)')
+
+
+if __name__ == "__main__":
+
+    main()
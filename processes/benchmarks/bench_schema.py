@@ -0,0 +1,66 @@
+# Benchmark of result memory per dataset kind: long format object columns against typed (float64 and float32) long format.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_schema.py [--scale 1]
+
+import argparse
+import os
+import sys
+import warnings
+
+from bench_suite import SCENARIOS
+from fixtures import load_parameters, make_document, make_zip_bundle
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+
+def response_df(client, name, spec, scale=1):
+    '''Returns requested df of scenario, as ._request_data output before fixing.'''
+    import io
+    import zipfile
+    import pandas as pd
+
+    spec = dict(spec)
+    n_documents = spec.pop('n_documents', None)
+    spec['n_series'] = max(int(spec['n_series'] * scale), 1)
+    kind = spec.pop('kind')
+
+    if n_documents is not None:
+        records = client._zipfile2records(zipfile.ZipFile(io.BytesIO(make_zip_bundle(n_documents, kind, **spec))))
+    else:
+        records = client._response_xml_to_records(make_document(kind, **spec))[0]
+
+    return pd.DataFrame([client._response_record(name, {'documentType': kind}, x) for x in records])
+
+
+def main():
+    '''Print schema memory benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1, help='Multiplier of TimeSeries in each scenario.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    from entsoetransparency import EntsoeTransparencyClient
+
+    warnings.simplefilter('ignore', FutureWarning)
+
+    client = EntsoeTransparencyClient(api_key='offline', lazy=True)
+    client.parameters = load_parameters()
+
+    def mb(df):
+        return (df.memory_usage(deep=True).sum() + df.index.memory_usage(deep=True)) / 1e6
+
+    print(f'{"scenario":<12} {"points":>8} {"long MB":>9} {"typed MB":>9} {"float32 MB":>11} {"reduction":>10}')
+    for name, spec in SCENARIOS.items():
+        df = response_df(client, name, spec, args.scale)
+        long = client._fix_response_df(df.copy(), long=True)
+        typed = client._fix_response_df(df.copy(), typed=True)
+        typed32 = client._fix_response_df(df.copy(), typed=True, float_dtype='float32')
+        print(f'{name:<12} {len(long):>8} {mb(long):9.2f} {mb(typed):9.2f} {mb(typed32):11.2f} {mb(long) / mb(typed32):9.1f}x')
+
+
+if __name__ == "__main__":
+
+    main()
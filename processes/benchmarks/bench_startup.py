@@ -0,0 +1,86 @@
+# Benchmark of module import time and client startup time.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_startup.py [--statics-path PATH] [--eager]
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+
+def import_times(module='entsoetransparency', top=10):
+    '''Run "python -X importtime -c 'import module'", return total import time and heaviest imports in ms.'''
+
+    # Import in fresh interpreter, importtime report is written to stderr.
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=MODULE_DIR, capture_output=True, text=True, check=True)
+
+    # Parse lines on format "import time: self [us] | cumulative | imported package".
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+
+    # Total is cumulative time of requested module, its direct imports are indented one level (two spaces).
+    total_ms = [cumulative for name, _, cumulative in imports if name.strip() == module][-1] / 1000
+    direct = [(name.strip(), cumulative / 1000) for name, _, cumulative in imports if name.startswith('  ') and not name.startswith('   ')]
+    direct.sort(key=lambda x: x[1], reverse=True)
+
+    return total_ms, direct[:top]
+
+
+def client_startup_times(statics_path=None, eager=False):
+    '''Time client construction and first access of parameters, in ms.'''
+
+    sys.path.insert(0, MODULE_DIR)
+    from entsoetransparency import EntsoeTransparencyClient
+    from src.statics_snapshot import DEFAULT_SNAPSHOT_PATH
+
+    kwargs = {'statics_path': statics_path or DEFAULT_SNAPSHOT_PATH}
+    times = {}
+
+    # Lazy construction loads nothing.
+    t0 = time.perf_counter()
+    client = EntsoeTransparencyClient(lazy=True, **kwargs)
+    times['lazy __init__'] = (time.perf_counter() - t0) * 1000
+
+    # First access of parameters loads statics snapshot.
+    t0 = time.perf_counter()
+    client.parameters
+    times['lazy first .parameters'] = (time.perf_counter() - t0) * 1000
+
+    # Eager construction loads statics and areas in parallel, needs network for areas.
+    if eager:
+        t0 = time.perf_counter()
+        EntsoeTransparencyClient(lazy=False, **kwargs)
+        times['eager __init__'] = (time.perf_counter() - t0) * 1000
+
+    return times
+
+
+def main():
+    '''Print import and startup benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statics-path', default=None, help='Statics snapshot to load from.')
+    parser.add_argument('--eager', action='store_true', help='Also time eager client construction (needs network).')
+    args = parser.parse_args()
+
+    total_ms, toplevel = import_times()
+    print(f'import entsoetransparency: {total_ms:.1f} ms')
+    for name, ms in toplevel:
+        print(f'  {name:<30} {ms:8.1f} ms')
+
+    for name, ms in client_startup_times(statics_path=args.statics_path, eager=args.eager).items():
+        print(f'{name:<30} {ms:8.1f} ms')
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,193 @@
+# Offline benchmark suite of response pipeline stages, on synthetic documents of fixtures.py.
+# Each stage of each scenario is timed separately, with throughput in points/s, peak traced allocations and peak RSS.
+# Results can be saved as baseline and later runs compared against it, exiting 1 on regressions.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_suite.py [--scenarios prices generation flows outages] [--scale 1] [--repeat 3]
+#   python processes/benchmarks/bench_suite.py --save-baseline baseline.json
+#   python processes/benchmarks/bench_suite.py --compare baseline.json [--tolerance 0.25]
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import warnings
+import zipfile
+
+from fixtures import count_points, load_parameters, make_document, make_zip_bundle
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+# Document kind and sizes of each scenario, n_series is multiplied by --scale.
+SCENARIOS = {
+    'prices': {'kind': 'publication', 'n_series': 10, 'resolution': 'PT60M', 'period_days': 1, 'n_periods': 31},
+    'generation': {'kind': 'gl', 'n_series': 40, 'resolution': 'PT15M', 'period_days': 1, 'n_periods': 7},
+    'flows': {'kind': 'transmission', 'n_series': 20, 'resolution': 'PT60M', 'period_days': 1, 'n_periods': 30},
+    'outages': {'kind': 'unavailability', 'n_series': 2, 'resolution': 'PT60M', 'period_days': 7, 'n_periods': 1, 'n_documents': 100},
+    }
+
+EXTENDS = ['parameters', 'createddatetime', 'quantity', 'price.amount', 'position', 'timestamp', 'start', 'end']
+
+
+def read_peak_rss():
+    '''Returns peak RSS of process in MB, since last reset_peak_rss where supported.'''
+
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # Peak over process lifetime, kB on linux and bytes on macos.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if platform.system() == 'Darwin' else peak / 1024
+
+
+def reset_peak_rss():
+    '''Resets peak RSS to current RSS, linux only. Returns True if reset.'''
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def measure(function, repeat=3):
+    '''Returns result, best wall time in s, peak traced allocations in MB and peak RSS in MB of function().'''
+
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = function()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+
+    # Peak RSS of a separate untraced run, tracemalloc adds its own memory.
+    del result
+    gc.collect()
+    reset_peak_rss()
+    result = function()
+    rss = read_peak_rss()
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    alloc = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    return result, best, alloc, rss
+
+
+def run_scenario(client, name, spec, scale=1, repeat=3):
+    '''Returns list of stage results of scenario, each dict of stage, points, seconds, points_per_s, alloc_mb and rss_mb.'''
+    import pandas as pd
+    from src.timeseries import expand_periods, period_timestamps
+
+    spec = dict(spec)
+    n_documents = spec.pop('n_documents', None)
+    spec['n_series'] = max(int(spec['n_series'] * scale), 1)
+    points = count_points(**spec) * (n_documents or 1)
+    kind = spec.pop('kind')
+    parameters_dict = {'documentType': kind}
+
+    stages = []
+
+    def add(stage, function):
+        result, seconds, alloc, rss = measure(function, repeat)
+        stages.append({'scenario': name, 'stage': stage, 'points': points, 'seconds': seconds, 'points_per_s': points / seconds, 'alloc_mb': alloc, 'rss_mb': rss})
+        return result
+
+    # Parse, zipped bundle of documents for outages, single document otherwise.
+    if n_documents is not None:
+        content = make_zip_bundle(n_documents, kind, **spec)
+        records = add('zip', lambda: client._zipfile2records(zipfile.ZipFile(io.BytesIO(content))))
+    else:
+        content = make_document(kind, **spec)
+        records = add('parse', lambda: client._response_xml_to_records(content)[0])
+
+    records = [client._response_record(name, parameters_dict, x) for x in records]
+    df = add('frame', lambda: pd.DataFrame(records))
+    timestamps = add('timestamps', lambda: period_timestamps(df))
+    add('seq2sets', lambda: [client._seq2sets(s[0], e[0], q) for s, e, q in zip(df['start'], df['end'], df['position'])])
+
+    df = df.assign(timestamp=timestamps)
+    extends = [x for x in EXTENDS if x in df.columns]
+    add('merge', lambda: client._merge_extend_equal_rows(df, extends=extends))
+    add('expand', lambda: expand_periods(df.drop(columns=['timestamp'])))
+
+    return stages
+
+
+def compare(results, baseline, tolerance=0.25):
+    '''Returns list of regression messages of results against baseline, throughput or allocations worse than tolerance.'''
+
+    base = {(x['scenario'], x['stage']): x for x in baseline['results']}
+    regressions = []
+    for x in results:
+        b = base.get((x['scenario'], x['stage']))
+        if b is None:
+            continue
+        if x['points_per_s'] < b['points_per_s'] * (1 - tolerance):
+            regressions.append(f"{x['scenario']}/{x['stage']}: {x['points_per_s']:,.0f} points/s, baseline {b['points_per_s']:,.0f}")
+        if x['alloc_mb'] > b['alloc_mb'] * (1 + tolerance) + 0.1:
+            regressions.append(f"{x['scenario']}/{x['stage']}: {x['alloc_mb']:.1f} MB allocated, baseline {b['alloc_mb']:.1f}")
+
+    return regressions
+
+
+def main():
+    '''Print benchmark suite, save or compare baseline.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS), help='Scenarios to run.')
+    parser.add_argument('--scale', type=float, default=1, help='Multiplier of TimeSeries in each scenario.')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeats, best time is reported.')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Save results as baseline json.')
+    parser.add_argument('--compare', metavar='PATH', help='Compare results against baseline json, exit 1 on regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Fraction of baseline throughput or allocations tolerated before regression.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    from entsoetransparency import EntsoeTransparencyClient
+
+    warnings.simplefilter('ignore', FutureWarning)
+
+    # Client with fixture parameters, no network.
+    client = EntsoeTransparencyClient(api_key='offline', lazy=True)
+    client.parameters = load_parameters()
+
+    results = []
+    print(f'{"scenario":<12} {"stage":<12} {"points":>9} {"ms":>10} {"points/s":>14} {"alloc MB":>9} {"rss MB":>8}')
+    for name in args.scenarios:
+        for x in run_scenario(client, name, SCENARIOS[name], args.scale, args.repeat):
+            results.append(x)
+            print(f"{x['scenario']:<12} {x['stage']:<12} {x['points']:>9} {x['seconds'] * 1000:10.1f} {x['points_per_s']:14,.0f} {x['alloc_mb']:9.1f} {x['rss_mb']:8.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'scale': args.scale, 'results': results}, f, indent=1)
+        print(f'Saved baseline to {args.save_baseline}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if len(regressions) > 0:
+            print('Regressions:\n' + '\n'.join(regressions))
+            sys.exit(1)
+        print('No regressions.')
+
+
+if __name__ == "__main__":
+
+    main()
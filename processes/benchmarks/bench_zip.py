@@ -0,0 +1,72 @@
+# Benchmark of zipped multi-document response parsing, serial against process pool of zip_workers.
+#
+# Usage, from repository root:
+#   python processes/benchmarks/bench_zip.py [--documents 300] [--series 20] [--workers 1 2 4 0]
+
+import argparse
+import datetime
+import io
+import os
+import sys
+import time
+import zipfile
+
+from bench_parse import make_gl_document
+from fixtures import load_parameters
+
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'entsoetransparency')
+
+
+def make_zip_response(n_documents=300, n_series=20):
+    '''Returns zip archive bytes of n_documents synthetic GL_MarketDocuments, like outage dataset responses.'''
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for i in range(n_documents):
+            zipf.writestr(f'document_{i}.xml', make_gl_document(n_series, 1, 96, start=datetime.datetime(2022, 1, 1) + datetime.timedelta(days=i)))
+
+    return buffer.getvalue()
+
+
+def main():
+    '''Print zip parse benchmark.'''
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=300, help='Documents in archive.')
+    parser.add_argument('--series', type=int, default=20, help='TimeSeries in each document.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 0], help='zip_workers to time, 0 is cpu count.')
+    args = parser.parse_args()
+
+    sys.path.insert(0, MODULE_DIR)
+    from entsoetransparency import EntsoeTransparencyClient
+
+    content = make_zip_response(args.documents, args.series)
+    parameters = load_parameters()
+    print(f'{args.documents} documents x {args.series} TimeSeries, archive {len(content) / 1e6:.1f} MB, {os.cpu_count()} cpus')
+
+    reference = None
+    t_serial = None
+    for workers in args.workers:
+        client = EntsoeTransparencyClient(api_key='offline', lazy=True, zip_workers=workers or None)
+        client.parameters = parameters
+
+        # Warm up pool, workers and index are built once per client.
+        client._zipfile2records(zipfile.ZipFile(io.BytesIO(make_zip_response(8, 1))))
+
+        t0 = time.perf_counter()
+        records = client._zipfile2records(zipfile.ZipFile(io.BytesIO(content)))
+        t = time.perf_counter() - t0
+
+        if reference is None:
+            reference = records
+        t_serial = t_serial or t
+        print(f'zip_workers={workers or "cpu count":<10} {t:8.2f} s  {t_serial / t:5.1f}x  records {len(records)}  equal {records == reference}')
+
+        if client._zip_pool is not None:
+            client._zip_pool.shutdown()
+
+
+if __name__ == "__main__":
+
+    main()
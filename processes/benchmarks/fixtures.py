@@ -0,0 +1,158 @@
+# Synthetic entso-e api response documents for offline benchmarks and the local api stand-in.
+# Documents follow the layout of real responses, sized by series count, resolution and period length.
+
+import datetime
+import gzip
+import io
+import json
+import os
+import random
+import zipfile
+
+
+PERIOD_TIMEFORMAT = '%Y-%m-%dT%H:%MZ'
+
+# Code tables of the api guide (Appendix A) as recorded in notebook.ipynb, the parameters of offline benchmark clients.
+PARAMETERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parameters.json.gz')
+
+# Root tag, namespace, document type and value tag of each document kind.
+DOCUMENT_KINDS = {
+    'publication': ('Publication_MarketDocument', 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0', 'A44', 'price.amount'),
+    'gl': ('GL_MarketDocument', 'urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0', 'A75', 'quantity'),
+    'transmission': ('TransmissionNetwork_MarketDocument', 'urn:iec62325.351:tc57wg16:451-6:transmissionnetworkdocument:3:0', 'A11', 'quantity'),
+    'unavailability': ('Unavailability_MarketDocument', 'urn:iec62325.351:tc57wg16:451-6:outagedocument:3:0', 'A80', 'quantity'),
+    }
+
+ACKNOWLEDGEMENT_NS = 'urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0'
+
+AREAS = ['10YNO-1--------2', '10YNO-2--------T', '10Y1001A1001A46L', '10Y1001A1001A82H', '10YFR-RTE------C']
+
+RESOLUTION_MINUTES = {'PT15M': 15, 'PT30M': 30, 'PT60M': 60, 'P1D': 24*60}
+
+
+def load_parameters(path=PARAMETERS_PATH):
+    '''Returns parameters (code tables) for client.parameters of benchmarks, without api guide or network.'''
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def points_per_period(resolution='PT15M', period_days=1):
+    '''Returns number of points in Period of period_days at resolution.'''
+    return period_days * 24 * 60 // RESOLUTION_MINUTES[resolution]
+
+
+def make_document(kind='gl', n_series=20, resolution='PT15M', period_days=1, n_periods=1, start=datetime.datetime(2022, 1, 1), areas=None, seed=0):
+    '''
+    Returns synthetic market document xml bytes of kind in DOCUMENT_KINDS.
+
+    :Inputs:
+        -n_series: TimeSeries in document, spread over areas and psr types.
+        -resolution: Period resolution in RESOLUTION_MINUTES.
+        -period_days: Days in each Period.
+        -n_periods: Consecutive Periods of each TimeSeries.
+    '''
+
+    root, ns, doc_type, value_tag = DOCUMENT_KINDS[kind]
+    areas = areas or AREAS
+    rng = random.Random(seed)
+    n_points = points_per_period(resolution, period_days)
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<{root} xmlns="{ns}">',
+        f'\t<mRID>{kind}-{seed}</mRID>',
+        '\t<revisionNumber>1</revisionNumber>',
+        f'\t<type>{doc_type}</type>',
+        '\t<process.processType>A16</process.processType>',
+        '\t<createdDateTime>2022-01-05T00:00:00Z</createdDateTime>',
+        ]
+
+    for s in range(n_series):
+        in_area = areas[s % len(areas)]
+        out_area = areas[(s + 1) % len(areas)]
+        lines += ['\t<TimeSeries>', f'\t\t<mRID>{s + 1}</mRID>', '\t\t<businessType>A01</businessType>']
+
+        if kind == 'gl':
+            lines += [
+                f'\t\t<inBiddingZone_Domain.mRID codingScheme="A01">{in_area}</inBiddingZone_Domain.mRID>',
+                '\t\t<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>',
+                '\t\t<curveType>A01</curveType>',
+                f'\t\t<MktPSRType>\n\t\t\t<psrType>B{1 + s % 20:02d}</psrType>\n\t\t</MktPSRType>',
+                ]
+        elif kind == 'publication':
+            lines += [
+                f'\t\t<in_Domain.mRID codingScheme="A01">{in_area}</in_Domain.mRID>',
+                f'\t\t<out_Domain.mRID codingScheme="A01">{in_area}</out_Domain.mRID>',
+                '\t\t<currency_Unit.name>EUR</currency_Unit.name>',
+                '\t\t<price_Measure_Unit.name>MWH</price_Measure_Unit.name>',
+                '\t\t<curveType>A01</curveType>',
+                ]
+        elif kind == 'transmission':
+            lines += [
+                f'\t\t<in_Domain.mRID codingScheme="A01">{in_area}</in_Domain.mRID>',
+                f'\t\t<out_Domain.mRID codingScheme="A01">{out_area}</out_Domain.mRID>',
+                '\t\t<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>',
+                '\t\t<curveType>A01</curveType>',
+                ]
+        else:
+            lines += [
+                f'\t\t<biddingZone_Domain.mRID codingScheme="A01">{in_area}</biddingZone_Domain.mRID>',
+                f'\t\t<start_DateAndOrTime.date>{start.strftime("%Y-%m-%d")}</start_DateAndOrTime.date>',
+                '\t\t<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>',
+                '\t\t<curveType>A03</curveType>',
+                f'\t\t<production_RegisteredResource.mRID codingScheme="A01">{s:016d}</production_RegisteredResource.mRID>',
+                f'\t\t<production_RegisteredResource.name>UNIT {s}</production_RegisteredResource.name>',
+                f'\t\t<production_RegisteredResource.pSRType.psrType>B{1 + s % 20:02d}</production_RegisteredResource.pSRType.psrType>',
+                f'\t\t<production_RegisteredResource.pSRType.powerSystemResources.nominalP unit="MAW">{100 + s}</production_RegisteredResource.pSRType.powerSystemResources.nominalP>',
+                ]
+
+        period_tag = 'Available_Period' if kind == 'unavailability' else 'Period'
+        for p in range(n_periods):
+            p_start = start + datetime.timedelta(days=p * period_days)
+            p_end = p_start + datetime.timedelta(days=period_days)
+            lines += [
+                f'\t\t<{period_tag}>',
+                f'\t\t\t<timeInterval>\n\t\t\t\t<start>{p_start.strftime(PERIOD_TIMEFORMAT)}</start>\n\t\t\t\t<end>{p_end.strftime(PERIOD_TIMEFORMAT)}</end>\n\t\t\t</timeInterval>',
+                f'\t\t\t<resolution>{resolution}</resolution>',
+                ]
+            for i in range(n_points):
+                value = f'{rng.uniform(-50, 300):.2f}' if kind == 'publication' else str(rng.randint(0, 1000))
+                lines.append(f'\t\t\t<Point>\n\t\t\t\t<position>{i + 1}</position>\n\t\t\t\t<{value_tag}>{value}</{value_tag}>\n\t\t\t</Point>')
+            lines.append(f'\t\t</{period_tag}>')
+
+        lines.append('\t</TimeSeries>')
+    lines.append(f'</{root}>')
+
+    return '\n'.join(lines).encode('utf-8')
+
+
+def make_zip_bundle(n_documents=300, kind='unavailability', **kwargs):
+    '''Returns zip archive bytes of n_documents synthetic documents, like outage dataset responses.'''
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for i in range(n_documents):
+            zipf.writestr(f'{kind}_{i:05d}.xml', make_document(kind, seed=i, **kwargs))
+
+    return buffer.getvalue()
+
+
+def make_acknowledgement(text, code='999'):
+    '''Returns Acknowledgement_MarketDocument xml bytes with bad response reason text.'''
+
+    return '\n'.join([
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<Acknowledgement_MarketDocument xmlns="{ACKNOWLEDGEMENT_NS}">',
+        '\t<mRID>ack</mRID>',
+        '\t<createdDateTime>2022-01-05T00:00:00Z</createdDateTime>',
+        '\t<Reason>',
+        f'\t\t<code>{code}</code>',
+        f'\t\t<text>{text}</text>',
+        '\t</Reason>',
+        '</Acknowledgement_MarketDocument>',
+        ]).encode('utf-8')
+
+
+def count_points(kind='gl', n_series=20, resolution='PT15M', period_days=1, n_periods=1):
+    '''Returns number of points in document made with same inputs.'''
+    return n_series * n_periods * points_per_period(resolution, period_days)
@@ -1,6 +1,23 @@
 # Webscrapter for getting updated data for use from api guide url.
 
+from entsoetransparency.src.get_api_statics import get_api_statics
+from entsoetransparency.src.statics_snapshot import BUNDLED_SNAPSHOT_PATH
+
+
 def webscrape_url_apiguide(savepath=''):
     '''Webscraper function for getting updated api statics from guide url and save to file.'''
 
-    
\ No newline at end of file
+    # Default to the statics snapshot bundled with the package.
+    if len(savepath) == 0:
+        savepath = BUNDLED_SNAPSHOT_PATH
+
+    datasets, parameters = get_api_statics(savepath=savepath)
+
+    print(f'Saved {len(datasets["names"])} datasets and {len(parameters)} parameter types to {savepath}')
+
+    return datasets, parameters
+
+
+if __name__ == "__main__":
+
+    webscrape_url_apiguide()
@@ -0,0 +1,40 @@
+# Tests of the area adjacency index, from the bundled interconnector table and from touching area geometries.
+
+import pytest
+
+from entsoetransparency.src.adjacency import AreaAdjacency, load_interconnectors, touching_pairs
+
+
+NO1, NO2, SE3 = '10YNO-1--------2', '10YNO-2--------T', '10Y1001A1001A46L'
+
+
+def test_adjacency_is_symmetric():
+    adjacency = AreaAdjacency([('A', 'B'), ('B', 'C'), ('C', 'C')])
+
+    assert adjacency.neighbours('B') == ['A', 'C']
+    assert adjacency.neighbours('A') == ['B']
+    assert adjacency.neighbours('D') == []
+    assert 'C' in adjacency and len(adjacency) == 3
+
+
+def test_from_sources_keeps_borders_of_known_codes():
+    assert (NO1, NO2) in load_interconnectors()
+
+    adjacency = AreaAdjacency.from_sources([NO1, NO2, SE3])
+    assert adjacency.neighbours(NO1) == sorted([NO2, SE3])
+    assert all(x in [NO1, NO2, SE3] for code in [NO1, NO2, SE3] for x in adjacency.neighbours(code))
+
+
+def test_touching_geometries_skip_nested_areas():
+    geopandas = pytest.importorskip('geopandas')
+    from shapely.geometry import box
+
+    # a and b share an edge, c is far away, d lies inside a as a bidding zone inside a control area.
+    areas = geopandas.GeoDataFrame({'code': ['a', 'b', 'c', 'd']},
+                                   geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1), box(5, 5, 6, 6), box(0.2, 0.2, 0.6, 0.6)])
+
+    assert sorted(touching_pairs(areas, {'a', 'b', 'c', 'd'})) == [('a', 'b')]
+    assert touching_pairs(areas, {'x'}) == []
+
+    adjacency = AreaAdjacency.from_sources(['a', 'b', 'c'], areas=areas)
+    assert adjacency.neighbours('a') == ['b'] and adjacency.neighbours('c') == []
@@ -0,0 +1,56 @@
+# Tests of request windows split on the fixed window grid.
+
+import datetime
+
+import pytest
+
+from entsoetransparency.src.chunking import YEAR, WindowLimits, default_window_limits_path, split_window
+
+
+DAY = datetime.timedelta(days=1)
+
+
+def test_overlapping_requests_share_interior_windows():
+    first = split_window(('202201010930', '202203151200'), 7*DAY)
+    second = split_window(('202201040000', '202203200000'), 7*DAY)
+
+    # Interior windows of first within the span of second are windows of second too.
+    interior = [window for window in first[1:-1] if window[0] >= second[0][0] and window[-1] <= second[-1][-1]]
+    assert len(interior) == 9
+    assert set(interior) <= set(second)
+    assert first[0][0] == '202201010000' and first[-1][-1] == '202203160000'
+
+
+def test_windows_are_on_utc_days_and_within_limit():
+    windows = split_window(('202201011315', '202201101400'), 3*DAY)
+    bounds = [datetime.datetime.strptime(t, '%Y%m%d%H%M') for window in windows for t in window]
+
+    assert all(t.hour == 0 and t.minute == 0 for t in bounds)
+    assert all(bounds[idx + 1] - bounds[idx] <= 3*DAY for idx in range(0, len(bounds), 2))
+    assert [window[0] for window in windows[1:]] == [window[-1] for window in windows[:-1]]
+
+
+def test_year_limit_steps_calendar_years():
+    assert split_window(('202006010000', '202302010000'), YEAR) == [
+        ('202006010000', '202101010000'), ('202101010000', '202201010000'), ('202201010000', '202301010000'), ('202301010000', '202302010000')]
+
+
+def test_non_positive_limit_raises():
+    with pytest.raises(ValueError):
+        split_window(('202201010000', '202201020000'), datetime.timedelta(0))
+
+
+def test_window_limits_write_only_to_given_path(tmp_path):
+    assert WindowLimits().learn('documentType=A75', 'Max allowed: 1 D, requested: 3 D') == DAY
+
+    path = tmp_path / 'window_limits.json'
+    limits = WindowLimits(path=str(path))
+    assert not path.exists()
+
+    limits.learn('documentType=A75', 'Max allowed: 1 D, requested: 3 D')
+    assert WindowLimits(path=str(path)).get('documentType=A75') == DAY
+    assert WindowLimits(path=str(path)).get('documentType=A44') == limits.default
+
+
+def test_default_path_follows_cache_home(cache_home):
+    assert default_window_limits_path().startswith(str(cache_home))
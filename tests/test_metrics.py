@@ -0,0 +1,53 @@
+# Tests of stage metrics, span callbacks and Prometheus export.
+
+import pytest
+
+from entsoetransparency.src.metrics import Metrics
+
+
+def test_stage_spans_and_errors():
+    metrics = Metrics()
+    events = []
+    metrics.add_span_callback(lambda event, span: events.append((event, span.name, span.status)))
+
+    with metrics.stage('parse', responses=2) as span:
+        span.set_attribute('points', 10)
+    with pytest.raises(ValueError):
+        with metrics.stage('parse'):
+            raise ValueError('bad')
+
+    assert events == [('start', 'parse', 'ok'), ('end', 'parse', 'ok'), ('start', 'parse', 'ok'), ('end', 'parse', 'error')]
+    assert span.attributes == {'responses': 2, 'points': 10} and span.duration >= 0
+    assert metrics.value('stage_seconds', stage='parse') == 2
+    assert metrics.value('stage_errors_total', stage='parse') == 1
+
+
+def test_counters_and_summary():
+    metrics = Metrics()
+    metrics.inc('http_responses_total', status=200)
+    metrics.inc('http_responses_total', 2, status=200)
+    metrics.record_stage('http_ttfb', 0.5)
+    metrics.record_stage('http_ttfb', 1.5)
+    metrics.record_stage('parse', 0.1)
+
+    assert metrics.value('http_responses_total', status=200) == 3
+    assert metrics.value('http_responses_total', status=429) == 0
+    assert list(metrics.summary()) == ['http_ttfb', 'parse']
+    assert metrics.summary()['http_ttfb'] == {'count': 2, 'seconds': 2., 'mean': 1.}
+
+    metrics.reset()
+    assert metrics.summary() == {}
+
+
+def test_prometheus_histogram_is_cumulative():
+    metrics = Metrics(buckets=(0.1, 1.))
+    metrics.inc('retries_total')
+    for seconds in [0.05, 0.5, 5.]:
+        metrics.observe('stage_seconds', seconds, stage='zip "x"')
+
+    lines = metrics.to_prometheus().splitlines()
+    assert '# TYPE entsoetransparency_retries_total counter' in lines
+    assert 'entsoetransparency_retries_total 1' in lines
+    assert [line.rsplit(' ', 1)[1] for line in lines if '_bucket' in line] == ['1', '2', '3']
+    assert 'entsoetransparency_stage_seconds_bucket{stage="zip \\"x\\"",le="+Inf"} 3' in lines
+    assert 'entsoetransparency_stage_seconds_count{stage="zip \\"x\\""} 3' in lines
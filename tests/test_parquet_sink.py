@@ -0,0 +1,49 @@
+# Tests of the hive partition layout of the Parquet sink, and of reading partitions back.
+
+import os
+
+import pandas as pd
+import pytest
+
+from entsoetransparency.src.parquet_sink import ParquetSink, area_column
+
+pytest.importorskip('pyarrow')
+
+
+def long_frame(start='2022-01-31 22:00', periods=4, area='10Y1001A1001A82H'):
+    '''Returns long format df of hourly quantity points of one area from start.'''
+    index = pd.date_range(start, periods=periods, freq='h', tz='UTC', name='timestamp')
+    return pd.DataFrame({'dataset': 'Actual Load', 'success': True, 'reason': '', 'outBiddingZone_Domain.mRID': area,
+                         'position': range(1, periods + 1), 'quantity': [float(x) for x in range(periods)]}, index=index)
+
+
+def test_area_column_prefers_in_domain():
+    assert area_column(['out_Domain.mRID', 'in_Domain.mRID']) == 'in_Domain.mRID'
+    assert area_column(['quantity']) is None
+
+
+def test_partition_layout(tmp_path):
+    sink = ParquetSink(str(tmp_path / 'sink'))
+    paths = sink.write(long_frame())
+
+    # One file per dataset, area and month, partition values uri encoded.
+    directories = sorted(os.path.relpath(os.path.dirname(path), sink.root) for path in paths)
+    assert directories == [os.path.join('dataset=Actual%20Load', 'area=10Y1001A1001A82H', 'month=2022-01'),
+                           os.path.join('dataset=Actual%20Load', 'area=10Y1001A1001A82H', 'month=2022-02')]
+    assert all(os.path.basename(path).startswith('part-') and path.endswith('.parquet') for path in paths)
+    assert not any(name.endswith('.tmp') for _, _, files in os.walk(sink.root) for name in files)
+
+
+def test_read_filters_partitions_and_time(tmp_path):
+    sink = ParquetSink(str(tmp_path / 'sink'))
+    sink.write(long_frame())
+    sink.write(long_frame(area='10YNO-1--------2'))
+
+    df = sink.read(dataset='Actual Load', areas='10YNO-1--------2', start='2022-01-31 23:00', end='2022-02-01 01:00')
+    assert df.index.tolist() == list(pd.date_range('2022-01-31 23:00', periods=2, freq='h', tz='UTC'))
+    assert df['quantity'].tolist() == [1., 2.]
+    assert set(df['area'].astype(str)) == {'10YNO-1--------2'}
+    assert 'success' not in df.columns and str(df['position'].dtype) == 'int32'
+
+    assert len(sink.read(dataset='Day-ahead Prices')) == 0
+    assert len(ParquetSink(str(tmp_path / 'empty')).read()) == 0
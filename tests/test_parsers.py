@@ -0,0 +1,37 @@
+# Tests of response classification and parsing of market and acknowledgement documents.
+
+from entsoetransparency.src.parsers import classify_response, parse_acknowledgement, parse_response_records
+
+
+ACKNOWLEDGEMENT = (b'<?xml version="1.0" encoding="UTF-8"?><Acknowledgement_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0">'
+                   b'<mRID>1</mRID><Reason><code>999</code><text>No matching data found for Data item and interval.</text></Reason>'
+                   b'</Acknowledgement_MarketDocument>')
+
+
+def outage_document():
+    '''Returns Unavailability_MarketDocument xml bytes of one TimeSeries with a Reason, as outage documents have.'''
+    return ('<Unavailability_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-6:outagedocument:3:0"><type>A80</type><TimeSeries>'
+            '<businessType>A53</businessType><Available_Period><timeInterval><start>2022-01-01T00:00Z</start><end>2022-01-02T00:00Z</end></timeInterval>'
+            '<resolution>PT60M</resolution><Point><position>1</position><quantity>250</quantity></Point></Available_Period>'
+            '<Reason><code>B18</code><text>Planned maintenance</text></Reason></TimeSeries></Unavailability_MarketDocument>').encode('utf-8')
+
+
+def test_classify_response():
+    assert classify_response(ACKNOWLEDGEMENT) == ('acknowledgement', 'acknowledgement_marketdocument')
+    assert classify_response(outage_document()) == ('document', 'unavailability_marketdocument')
+    assert classify_response(b'PK\x03\x04...') == ('zip', None)
+    assert classify_response(b'<html><body>Bad gateway</body></html>') == ('unknown', 'html')
+    assert classify_response(b'') == ('unknown', None)
+
+
+def test_acknowledgement_reason():
+    assert parse_acknowledgement(ACKNOWLEDGEMENT) == 'No matching data found for Data item and interval.'
+    assert parse_response_records(ACKNOWLEDGEMENT) == ([], 'No matching data found for Data item and interval.')
+
+
+def test_timeseries_reason_is_not_a_bad_response():
+    records, reason = parse_response_records(outage_document())
+
+    assert reason is None
+    assert len(records) == 1
+    assert records[0]['quantity'] == ['250']
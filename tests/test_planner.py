@@ -0,0 +1,49 @@
+# Tests of runtime estimates of request plans, and of deduplicated plans of get_data dry runs.
+
+import importlib
+
+import pytest
+
+from entsoetransparency.src.chunking import WindowLimits
+from entsoetransparency.src.planner import RequestPlan, estimate_seconds
+from entsoetransparency.src.ratelimiter import TokenBucket
+
+
+def test_estimate_bound_by_rate_or_latency():
+    limiter = TokenBucket(calls=61, period=60, burst=1)
+
+    # Calls beyond burst wait for refill at 1 call per second, unless latency over workers is slower.
+    assert estimate_seconds(11, limiter, max_workers=10, call_seconds=0.5) == 10.
+    assert estimate_seconds(11, limiter, max_workers=1, call_seconds=2.) == 22.
+    assert estimate_seconds(11, None, max_workers=11, call_seconds=2.) == 2.
+
+
+def test_plan_calls_exclude_cached():
+    tasks = [('Actual Load', {}, ['A'], ('202201010000', '202201020000')), ('Actual Load', {}, ['B'], ('202201010000', '202201020000'))]
+    plan = RequestPlan(tasks, [{}, {}], cached=[1])
+
+    assert (len(plan), plan.calls) == (2, 1)
+    assert plan.to_frame()['cached'].tolist() == [False, True]
+    assert '1 api calls, 1 cached' in repr(plan)
+
+
+@pytest.fixture
+def client(client_module, tmp_path):
+    '''Returns client with fixture parameters and the generation dataset of benchmarks, without api calls.'''
+    client = client_module.EntsoeTransparencyClient(api_key='x', lazy=True, window_limits=WindowLimits())
+    client.parameters = importlib.import_module('fixtures').load_parameters()
+    client.datasets = importlib.import_module('bench_pipeline').DATASETS
+    client._call_api = None
+    return client
+
+
+def test_dry_run_deduplicates_areas_and_coalesces_windows(client):
+    windows = [('202201010000', '202201150000'), ('202201100000', '202201200000'), ('202201200000', '202201250000')]
+    plan = client.get_data(['actual generation', 'actual generation'], ['NO1', 'NO2', 'NO1'], windows, dry_run=True, msg=[])
+
+    # One request per area of coalesced window, requests of repeated dataset are removed as duplicates.
+    assert plan.calls == len(plan) == 2
+    assert plan.coalesced == 2
+    assert plan.duplicates == 2
+    assert sorted(from_to[0] for from_to in plan.to_frame()['from_to']) == ['10YNO-1--------2', '10YNO-2--------T']
+    assert plan.to_frame()[['start', 'end']].drop_duplicates().values.tolist() == [['202201010000', '202201250000']]
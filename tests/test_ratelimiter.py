@@ -0,0 +1,90 @@
+# Tests of token bucket waits, and of the file token bucket sharing one budget between processes.
+
+import asyncio
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from entsoetransparency.src.ratelimiter import FileTokenBucket, TokenBucket
+
+
+class FakeClock():
+    '''Clock advanced by sleep, so waits are checked without sleeping.'''
+
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_burst_then_calls_spaced_at_refill_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(calls=4, period=2, burst=2, clock=clock, sleep=lambda seconds: None)
+
+    # Burst goes through back-to-back, later callers wait in order of arrival.
+    assert [bucket.acquire() for _ in range(4)] == [0., 0., 1., 2.]
+
+    # Tokens refill while idle, up to burst.
+    clock.now = 10.
+    assert [bucket.acquire() for _ in range(3)] == [0., 0., 1.]
+
+
+def test_calls_in_any_period_within_limit():
+    clock = FakeClock()
+    bucket = TokenBucket(calls=10, period=6, burst=4, clock=clock, sleep=clock.sleep)
+
+    times = []
+    for _ in range(40):
+        bucket.acquire()
+        times.append(clock.now)
+
+    assert all(sum(1 for t in times if start <= t < start + 6) <= 10 for start in times)
+    assert bucket.utilisation() <= 1.
+
+
+def test_acquire_async_shares_budget():
+    clock = FakeClock()
+    bucket = TokenBucket(calls=3, period=2, burst=1, clock=clock, sleep=lambda seconds: None)
+
+    assert bucket.acquire() == 0.
+    assert asyncio.run(bucket.acquire_async()) == pytest.approx(1.)
+
+
+def test_burst_must_be_below_calls():
+    with pytest.raises(ValueError):
+        TokenBucket(calls=5, burst=5)
+
+
+def _acquire_file_bucket(path, n):
+    '''Takes n tokens of file bucket without sleeping, run in a separate process.'''
+    bucket = FileTokenBucket(path=path, calls=11, period=10, burst=1, sleep=lambda seconds: None)
+    for _ in range(n):
+        bucket.acquire()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='Processes are forked.')
+def test_file_bucket_budget_shared_by_processes(tmp_path):
+    path = str(tmp_path / 'ratelimit.json')
+
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_acquire_file_bucket, args=(path, 3)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+    assert all(process.exitcode == 0 for process in processes)
+
+    # All calls of both processes are reserved one refill apart, one budget not one per process.
+    with open(path) as f:
+        log = sorted(json.load(f)['log'])
+    assert len(log) == 6
+    assert all(b - a == pytest.approx(1., abs=1e-3) for a, b in zip(log, log[1:]))
+
+    bucket = FileTokenBucket(path=path, calls=11, period=10, burst=1)
+    assert bucket.utilisation() == pytest.approx(6 / 11)
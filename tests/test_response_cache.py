@@ -0,0 +1,63 @@
+# Tests of response cache keys, expiry of recent windows and eviction of least recently used responses.
+
+import os
+import time
+
+import pytest
+
+from entsoetransparency.src import response_cache
+from entsoetransparency.src.response_cache import ResponseCache, parameters_key
+
+
+OLD = {'documentType': 'A75', 'periodStart': '202001010000', 'periodEnd': '202001020000'}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    '''Patches time.time() read by cache to a settable clock, starting now.'''
+    now = [time.time()]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_key_ignores_token_and_parameter_order():
+    assert parameters_key({'securityToken': 'a', **OLD}) == parameters_key(dict(reversed(list(OLD.items()))))
+    assert parameters_key(OLD) != parameters_key({**OLD, 'periodEnd': '202001030000'})
+
+
+def test_old_windows_immutable_recent_windows_expire(tmp_path, clock):
+    cache = ResponseCache(path=str(tmp_path / 'responses.sqlite'), recent_ttl=60)
+    recent = {**OLD, 'periodEnd': time.strftime('%Y%m%d%H%M', time.gmtime(clock[0]))}
+    assert cache.expires(OLD) is None
+    assert cache.expires(recent) == clock[0] + 60
+
+    cache.put(OLD, b'<old/>')
+    cache.put(recent, b'<recent/>')
+    assert cache.get(recent) == b'<recent/>'
+
+    # Only recent window expires, and is deleted when read.
+    clock[0] += 61
+    assert cache.get(OLD) == b'<old/>'
+    assert not cache.contains(recent)
+    assert cache.get(recent) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expired'], stats['entries']) == (2, 1, 1, 1)
+
+
+def test_least_recently_used_evicted_beyond_max_bytes(tmp_path, clock):
+    cache = ResponseCache(path=str(tmp_path / 'responses.sqlite'), max_bytes=2500)
+    windows = [{**OLD, 'in_Domain': str(idx)} for idx in range(3)]
+
+    # Random bodies do not compress, each is about 1000 bytes stored.
+    for window in windows[:2]:
+        cache.put(window, os.urandom(1000))
+        clock[0] += 1
+
+    # Reading first makes second least recently used, evicted by third.
+    cache.get(windows[0])
+    clock[0] += 1
+    cache.put(windows[2], os.urandom(1000))
+
+    assert [cache.contains(window) for window in windows] == [True, False, True]
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= 2500
@@ -0,0 +1,102 @@
+# Tests of retry backoff and circuit breaker state changes, and of client api calls against the stand-in api server.
+
+import email.utils
+import importlib
+
+import pytest
+
+from entsoetransparency.src.ratelimiter import TokenBucket
+from entsoetransparency.src.retry import CircuitBreaker, RetryPolicy, retry_after_seconds
+
+
+QUERY = 'securityToken=x&documentType=A65&processType=A16&outBiddingZone_Domain=10YNO-1--------2&periodStart=202201010000&periodEnd=202201020000'
+
+
+def test_retry_after_seconds_and_http_date():
+    assert retry_after_seconds('120') == 120.
+    assert retry_after_seconds(email.utils.formatdate(1000 + 30, usegmt=True), now=1000) == 30.
+    assert retry_after_seconds(email.utils.formatdate(1000 - 30, usegmt=True), now=1000) == 0.
+    assert retry_after_seconds('soon') is None and retry_after_seconds(None) is None
+
+
+def test_delay_doubles_with_jitter_and_honors_retry_after():
+    policy = RetryPolicy(backoff=1., max_backoff=10., jitter=0.5)
+
+    for attempt, full in enumerate([1., 2., 4., 8., 10., 10.]):
+        assert full * 0.5 <= policy.delay(attempt) <= full
+
+    # Retry-After only of 429 and 503, capped at max_backoff.
+    assert policy.delay(0, status=429, retry_after='3') == 3.
+    assert policy.delay(0, status=503, retry_after='600') == 10.
+    assert policy.delay(0, status=500, retry_after='3') <= 1.
+
+
+def test_circuit_breaker_opens_half_opens_and_closes():
+    now = [0.]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10., clock=lambda: now[0])
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.wait_time() == 0.
+
+    breaker.record_failure()
+    assert breaker.state == 'open' and breaker.wait_time() == 10.
+
+    now[0] = 10.
+    assert breaker.state == 'half-open' and breaker.wait_time() == 0.
+
+    # Failure while half-open reopens, success closes.
+    breaker.record_failure()
+    assert breaker.state == 'open' and breaker.wait_time() == 10.
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.failures == 0
+
+
+@pytest.fixture
+def stand_in(client_module):
+    '''Returns function starting StandInServer() of benchmarks with given options, and a client calling it. Servers are stopped after test.'''
+    api_server = importlib.import_module('api_server')
+
+    servers = []
+
+    def start(retry_policy, circuit_breaker=None, **options):
+        server = api_server.StandInServer(latency=0., **options)
+        server.start()
+        servers.append(server)
+        client = client_module.EntsoeTransparencyClient(api_key='x', lazy=True, rate_limiter=TokenBucket(calls=1000, burst=100),
+                                                        retry_policy=retry_policy, circuit_breaker=circuit_breaker)
+        client.api_url = server.api_url
+        return server, client
+
+    yield start
+
+    for server in servers:
+        server.stop()
+
+
+def test_transient_errors_retried_until_success(stand_in):
+    server, client = stand_in(RetryPolicy(max_retries=10, backoff=0.001, max_backoff=0.001), error_rate=0.5, seed=1)
+
+    responses = [client._call_api(url=client.api_url + QUERY)[0] for _ in range(5)]
+
+    counts = server.counts()
+    assert [response.status_code for response in responses] == [200] * 5
+    assert counts[200] == 5 and counts[503] > 0
+    assert counts['requests'] == 5 + counts[503]
+    assert client.circuit_breaker.state == 'closed'
+
+
+def test_ban_fails_after_retries_and_opens_circuit(stand_in):
+    server, client = stand_in(RetryPolicy(max_retries=3, backoff=0.001, max_backoff=0.001), CircuitBreaker(failure_threshold=4, reset_timeout=60.),
+                              calls_per_minute=2, ban_seconds=60)
+    failed = importlib.import_module('src.retry').RequestFailed
+
+    for _ in range(2):
+        assert client._call_api(url=client.api_url + QUERY)[0].status_code == 200
+
+    # Third call in a minute bans the token, 429 is retried then fails, and opens circuit for other callers.
+    with pytest.raises(failed) as info:
+        client._call_api(url=client.api_url + QUERY)
+    assert (info.value.status, info.value.attempts) == (429, 4)
+    assert server.counts()['bans'] == 1 and server.counts()[429] == 4
+    assert client.circuit_breaker.state == 'open'
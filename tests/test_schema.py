@@ -0,0 +1,49 @@
+# Tests of typed long format frames and the shared code table of code column categories.
+
+import pandas as pd
+import pytest
+
+from entsoetransparency.src.parameters_index import ParametersIndex
+from entsoetransparency.src.schema import CodeTable, coerce_numeric, typed_frame
+
+
+PARAMETERS = {'BusinessType': {'A01': 'Production', 'A04': 'Consumption'}, 'Areas': {'10YNO-1--------2': 'NO1'}}
+
+
+def long_frame(business_types, start='2022-01-01'):
+    '''Returns long format df of hourly points of business types from start.'''
+    index = pd.date_range(start, periods=len(business_types), freq='h', tz='Europe/Oslo', name='timestamp')
+    return pd.DataFrame({'success': [True] * len(business_types), 'businesstype': business_types, 'start': '2022-01-01T00:00Z',
+                         'position': range(1, len(business_types) + 1), 'quantity': ['1.5'] * len(business_types)}, index=index)
+
+
+def test_coerce_numeric():
+    assert str(coerce_numeric(pd.Series(['1', '2'])).dtype) == 'int64'
+    assert str(coerce_numeric(pd.Series(['1.5', None])).dtype) == 'float64'
+    assert coerce_numeric(pd.Series(['1', 'A01'])).tolist() == ['1', 'A01']
+
+
+def test_typed_frame_columns():
+    df = typed_frame(long_frame(['Production', 'Consumption']), float_dtype='float32')
+
+    assert {column: str(dtype) for column, dtype in df.dtypes.items()} == {
+        'success': 'bool', 'businesstype': 'category', 'start': 'datetime64[ns, UTC]', 'position': 'int32', 'quantity': 'float32'}
+    assert str(df.index.tz) == 'UTC'
+
+    with pytest.raises(ValueError):
+        typed_frame(long_frame(['Production']), float_dtype='float16')
+
+
+def test_code_table_grows_and_frames_concatenate():
+    table = CodeTable(ParametersIndex(PARAMETERS))
+    assert table.categories('businesstype') == ['Production', 'A01', 'Consumption', 'A04']
+    assert table.categories('position') is None
+
+    first = typed_frame(long_frame(['Production']), code_table=table)
+    second = typed_frame(long_frame(['Unknown type', 'Consumption'], start='2022-01-02'), code_table=table)
+
+    # Unknown codes are added to the table, earlier categories keep their order.
+    assert list(second['businesstype'].cat.categories) == ['Production', 'A01', 'Consumption', 'A04', 'Unknown type']
+    df = table.concat([first, second])
+    assert isinstance(df['businesstype'].dtype, pd.CategoricalDtype)
+    assert df['businesstype'].tolist() == ['Production', 'Unknown type', 'Consumption']
@@ -0,0 +1,27 @@
+# Tests of the pooled session and resizing its connection pool.
+
+from entsoetransparency.src.session import DEFAULT_POOL_SIZE, make_session, mount_pool
+
+
+def test_session_pool_and_headers():
+    session = make_session()
+
+    assert session.pool_size == DEFAULT_POOL_SIZE
+    assert session.adapters['https://'] is session.adapters['http://']
+    assert session.adapters['https://']._pool_maxsize == DEFAULT_POOL_SIZE
+    assert 'gzip' in session.headers['Accept-Encoding']
+
+
+def test_mount_pool_closes_replaced_adapter():
+    session = make_session()
+    old = session.adapters['https://']
+    closed = []
+    old.close = lambda: closed.append(old)
+
+    mount_pool(session, 32)
+
+    # Shared http and https adapter is closed once.
+    assert closed == [old]
+    assert session.pool_size == 32
+    assert session.adapters['https://'] is not old
+    assert session.adapters['https://']._pool_maxsize == 32
@@ -0,0 +1,60 @@
+# Tests of windows missing in the time-series store, and of merging revised points.
+
+import datetime
+import time
+
+import pandas as pd
+
+from entsoetransparency.src.store import TimeSeriesStore, subtract_intervals
+
+
+def long_frame(values, start='2022-01-01', business_type='A01'):
+    '''Returns long format df of hourly quantity values of one series from start.'''
+    index = pd.date_range(start, periods=len(values), freq='h', tz='UTC', name='timestamp')
+    return pd.DataFrame({'dataset': 'Actual Load', 'businesstype': business_type, 'resolution': 'PT60M',
+                         'position': range(1, len(values) + 1), 'quantity': values}, index=index)
+
+
+def test_subtract_intervals():
+    assert subtract_intervals(0, 10, [(2, 4), (3, 6), (8, 12)]) == [(0, 2), (6, 8)]
+    assert subtract_intervals(0, 10, [(-5, 20)]) == []
+    assert subtract_intervals(0, 10, []) == [(0, 10)]
+
+
+def test_missing_gaps_between_fetched_windows(tmp_path):
+    store = TimeSeriesStore(path=str(tmp_path / 'store.sqlite'))
+    fetched = time.time()
+    store.add_coverage('Actual Load', '10YNO-1--------2', None, ('202201030000', '202201050000'), fetched=fetched)
+    store.add_coverage('Actual Load', '10YNO-1--------2', None, ('202201070000', '202201080000'), fetched=fetched)
+
+    # Request bounds are widened to UTC days, other areas have no coverage.
+    assert store.missing('Actual Load', '10YNO-1--------2', None, ('202201011200', '202201091200')) == [
+        ('202201010000', '202201030000'), ('202201050000', '202201070000'), ('202201080000', '202201100000')]
+    assert store.missing('Actual Load', '10YNO-2--------T', None, ('202201030000', '202201050000')) == [('202201030000', '202201050000')]
+
+
+def test_recent_windows_missing_until_past_revisable_days(tmp_path):
+    store = TimeSeriesStore(path=str(tmp_path / 'store.sqlite'))
+    end = datetime.datetime(2022, 1, 10)
+    fetched = end.replace(tzinfo=datetime.timezone.utc).timestamp()
+    store.add_coverage('Actual Load', 'A', None, ('202201010000', '202201100000'), fetched=fetched)
+
+    assert store.missing('Actual Load', 'A', None, ('202201010000', '202201100000'), revisable_days=3) == [('202201010000', '202201100000')]
+    assert store.missing('Actual Load', 'A', None, ('202201010000', '202201100000'), revisable_days=0) == []
+
+    # Refetch covering older coverage replaces it.
+    store.add_coverage('Actual Load', 'A', None, ('202201010000', '202201100000'), fetched=fetched + 5*24*3600)
+    assert store.missing('Actual Load', 'A', None, ('202201010000', '202201100000'), revisable_days=3) == []
+
+
+def test_merge_replaces_revised_points(tmp_path):
+    store = TimeSeriesStore(path=str(tmp_path / 'store.sqlite'))
+    assert store.merge('Actual Load', 'A', None, long_frame([1., 2., 3.])) == 3
+    assert store.merge('Actual Load', 'A', None, long_frame([20., 30.], start='2022-01-01 01:00')) == 2
+    store.merge('Actual Load', 'A', None, long_frame([5.], business_type='A02'))
+
+    df = store.read('Actual Load', 'A', None, ('202201010000', '202201020000'))
+    assert df[df['businesstype'] == 'A01']['quantity'].tolist() == [1., 20., 30.]
+    assert df[df['businesstype'] == 'A02']['quantity'].tolist() == [5.]
+    assert df.index.is_monotonic_increasing and str(df.index.tz) == 'UTC'
+    assert len(store.read('Actual Load', 'B', None, ('202201010000', '202201020000'))) == 0
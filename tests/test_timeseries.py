@@ -0,0 +1,78 @@
+# Tests of parsed Period points expanded into timestamped points.
+
+import pandas as pd
+import pytest
+
+from entsoetransparency.src.parsers import parse_response_records
+from entsoetransparency.src.timeseries import expand_periods, period_timestamps
+
+
+def publication_document(prices):
+    '''Returns Publication_MarketDocument xml bytes of one hourly Period of prices at positions 1..n.'''
+    points = ''.join(f'<Point><position>{idx + 1}</position><price.amount>{price}</price.amount></Point>' for idx, price in enumerate(prices))
+    return ('<Publication_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0"><type>A44</type><TimeSeries><Period>'
+            f'<timeInterval><start>2022-01-01T00:00Z</start><end>2022-01-01T{len(prices):02d}:00Z</end></timeInterval>'
+            f'<resolution>PT60M</resolution>{points}</Period></TimeSeries></Publication_MarketDocument>').encode('utf-8')
+
+
+def test_repeated_prices_keep_their_positions():
+    records, reason = parse_response_records(publication_document([10, 10, 12, 10]))
+    assert reason is None
+    assert records[0]['price.amount'] == ['10', '10', '12', '10']
+
+    df = expand_periods(pd.DataFrame(records))
+    assert df['price.amount'].tolist() == [10., 10., 12., 10.]
+    assert df.index.hour.tolist() == [0, 1, 2, 3]
+
+
+def test_position_and_value_count_mismatch_is_skipped():
+    records, _ = parse_response_records(publication_document([10, 11, 12]))
+    good, _ = parse_response_records(publication_document([20, 21]))
+    records[0]['price.amount'] = records[0]['price.amount'][:2]
+
+    errors = []
+    df = expand_periods(pd.DataFrame(records + good), errors=errors)
+    assert df['price.amount'].tolist() == [20., 21.]
+    assert errors == [(0, 'Period has 3 positions but 2 price.amount values')]
+
+    timestamps = period_timestamps(pd.DataFrame(records + good), errors=[])
+    assert timestamps[0] is None and len(timestamps[1]) == 2
+
+
+def test_mixed_quantity_and_price_frame():
+    prices, _ = parse_response_records(publication_document([10, 11]))
+    quantities = [{'start': ['2022-01-01T00:00Z'], 'end': ['2022-01-01T03:00Z'], 'resolution': ['PT60M'], 'position': ['1', '2', '3'], 'quantity': ['5', '6', '7']}]
+    malformed = [{'start': ['2022-01-01T00:00Z'], 'resolution': ['PT60M'], 'position': ['1', '2'], 'quantity': []}]
+    frame = pd.DataFrame(quantities + prices + malformed)
+
+    errors = []
+    timestamps = period_timestamps(frame, errors=errors)
+    assert [len(x) for x in timestamps[:2]] == [3, 2] and timestamps[2] is None
+    assert errors == [(2, 'Period has 2 positions but no quantity or price.amount values')]
+
+    df = expand_periods(frame)
+    assert df['quantity'].tolist()[:3] == [5., 6., 7.] and df['quantity'].isna().tolist()[3:] == [True, True]
+    assert df['price.amount'].isna().tolist()[:3] == [True] * 3 and df['price.amount'].tolist()[3:] == [10., 11.]
+    assert df.index.hour.tolist() == [0, 1, 2, 0, 1]
+
+
+def test_other_point_value_tags_are_expanded():
+    points = ''.join(f'<Point><position>{idx + 1}</position><imbalance_Price.amount>{price}</imbalance_Price.amount>'
+                     f'<imbalance_Price.category>A04</imbalance_Price.category></Point>' for idx, price in enumerate([5, 5, 7]))
+    document = ('<Balancing_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-6:balancingdocument:4:4"><type>A85</type><TimeSeries><Period>'
+                '<timeInterval><start>2022-01-01T00:00Z</start><end>2022-01-01T00:45Z</end></timeInterval>'
+                f'<resolution>PT15M</resolution>{points}</Period></TimeSeries></Balancing_MarketDocument>').encode('utf-8')
+
+    records, _ = parse_response_records(document)
+    assert records[0]['imbalance_price.amount'] == ['5', '5', '7']
+
+    df = expand_periods(pd.DataFrame(records))
+    assert df['imbalance_price.amount'].tolist() == [5., 5., 7.]
+    assert df.index.minute.tolist() == [0, 15, 30]
+
+
+def test_points_without_value_column_warn():
+    frame = pd.DataFrame([{'start': ['2022-01-01T00:00Z'], 'resolution': ['PT60M'], 'position': ['1', '2'], 'flow': ['in', 'out']}])
+
+    with pytest.warns(UserWarning, match='No point value column'):
+        assert len(expand_periods(frame)) == 0